@@ -7,400 +7,29 @@ Amaç: BIST hisselerini 1 aylık swing trade perspektifinden taramak,
 """
 
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import numpy as np
-import time
 import warnings
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import datetime
+
+from bist.charts import HISTORY, detail_figure, load_bars
+from bist.checkpoint import ScanCheckpoint, compact
+from bist.fetcher import DEFAULT_RATE, DEFAULT_WORKERS, ERROR, THROTTLED, FetchPool
+from bist.parallel import BACKEND_LABELS
+from bist.panel import (TEKNIK_CAP, TEMEL_CAP, WEEKLY_CAP, WEEKLY_MACD_SCORES,
+                        WEEKLY_TREND_SCORES)
+from bist.registry import SymbolRegistry, skipped_table, validate_symbols
+from bist.results import NA_REP, TIMEFRAME_COLUMNS
+from bist.scanner import run_scan, select_buy_list
+from bist.scheduler import is_alive, load_alerts, read_status, request_run, run_requested
+from bist.snapshots import EXPORT_FORMATS, Snapshot, SnapshotStore, diff_scores
+from bist.service import MarketDataService
+from bist.tables import PAGE_SIZES, query, style_page
+from bist.timeframes import MA_FAST, MA_SLOW, OFF, TIMEFRAME_LABELS, WEEKLY_MONTHLY
+from bist.universe import BIST_TICKERS, build_scan_list, parse_tickers
 
 warnings.filterwarnings("ignore")
 
-# ─────────────────────────────────────────────────────────────────────────────
-# BIST HİSSE LİSTESİ
-# Kaynak: BIST 500 bileşenleri (manuel liste – yfinance endeks listesi desteklemiyor)
-# .IS uzantısı yfinance için zorunlu
-# ─────────────────────────────────────────────────────────────────────────────
-BIST_TICKERS = [
-    "THYAO.IS","EREGL.IS","GARAN.IS","AKBNK.IS","YKBNK.IS","ISCTR.IS","KCHOL.IS",
-    "SASA.IS","BIMAS.IS","FROTO.IS","TUPRS.IS","ASELS.IS","TOASO.IS","PGSUS.IS",
-    "HALKB.IS","VAKBN.IS","TKFEN.IS","ENKAI.IS","KOZAL.IS","KRDMD.IS","PETKM.IS",
-    "TTKOM.IS","TAVHL.IS","OTKAR.IS","SAHOL.IS","ARCLK.IS","VESTL.IS","MGROS.IS",
-    "EKGYO.IS","ULKER.IS","TCELL.IS","SISE.IS","DOHOL.IS","AEFES.IS","LOGO.IS",
-    "MAVI.IS","NETAS.IS","KOZA1.IS","BRISA.IS","CCOLA.IS","IHLGM.IS","ALARK.IS",
-    "ZOREN.IS","AKSEN.IS","AYGAZ.IS","GOLTS.IS","TSKB.IS","KLNMA.IS","ISGYO.IS",
-]
-
-# Tekrar edenleri ve geçersizleri temizle
-BIST_TICKERS = list(dict.fromkeys(BIST_TICKERS))  # unique
-
-# ─────────────────────────────────────────────────────────────────────────────
-# YARDIMCI FONKSİYONLAR
-# ─────────────────────────────────────────────────────────────────────────────
-
-def calculate_rsi(series: pd.Series, period: int = 14) -> pd.Series:
-    """RSI hesapla (pandas_ta olmadan saf numpy/pandas ile)."""
-    delta = series.diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-    avg_gain = gain.ewm(alpha=1/period, min_periods=period).mean()
-    avg_loss = loss.ewm(alpha=1/period, min_periods=period).mean()
-    rs = avg_gain / avg_loss.replace(0, np.nan)
-    return 100 - (100 / (1 + rs))
-
-
-def calculate_macd(series: pd.Series, fast=12, slow=26, signal=9):
-    """MACD, Sinyal ve Histogram hesapla."""
-    ema_fast = series.ewm(span=fast, adjust=False).mean()
-    ema_slow = series.ewm(span=slow, adjust=False).mean()
-    macd_line = ema_fast - ema_slow
-    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
-    histogram = macd_line - signal_line
-    return macd_line, signal_line, histogram
-
-
-def calculate_atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
-    """ATR (Average True Range) hesapla."""
-    prev_close = close.shift(1)
-    tr = pd.concat([
-        high - low,
-        (high - prev_close).abs(),
-        (low - prev_close).abs()
-    ], axis=1).max(axis=1)
-    return tr.ewm(span=period, adjust=False).mean()
-
-
-# ─────────────────────────────────────────────────────────────────────────────
-# ANA PUANLAMA FONKSİYONU
-# ─────────────────────────────────────────────────────────────────────────────
-
-def score_ticker(ticker: str, sector_stats: dict) -> dict | None:
-    """
-    Bir hisse için temel + teknik analiz puanı hesapla.
-    Dönüş: dict (skor ve detaylar) ya da None (hata/yetersiz veri).
-    """
-    try:
-        # ── Veri İndir ──────────────────────────────────────────────────────
-        # 1 yıllık günlük veri (MA200 için yeterli)
-        raw = yf.download(ticker, period="1y", interval="1d",
-                          auto_adjust=True, progress=False)
-        if raw is None or len(raw) < 60:
-            return None
-
-        # MultiIndex sütunları düzleştir
-        if isinstance(raw.columns, pd.MultiIndex):
-            raw.columns = raw.columns.get_level_values(0)
-
-        raw = raw.dropna(subset=["Close", "High", "Low", "Volume"])
-        if len(raw) < 60:
-            return None
-
-        close = raw["Close"].squeeze()
-        high  = raw["High"].squeeze()
-        low   = raw["Low"].squeeze()
-        vol   = raw["Volume"].squeeze()
-
-        # ── Hareketli Ortalamalar ────────────────────────────────────────────
-        ma50  = close.rolling(50).mean()
-        ma200 = close.rolling(200).mean()
-        current_price = float(close.iloc[-1])
-        ma50_val  = float(ma50.iloc[-1])
-        ma200_val = float(ma200.iloc[-1]) if not np.isnan(ma200.iloc[-1]) else None
-
-        # ZORUNLU TREND FİLTRESİ: Fiyat MA50 VE MA200 üzerinde olmalı
-        # MA200 mevcut değilse (< 200 gün veri) sadece MA50 kontrolü yap
-        above_ma50  = current_price > ma50_val
-        above_ma200 = (ma200_val is None) or (current_price > ma200_val)
-
-        trend_ok = above_ma50 and above_ma200
-        if not trend_ok:
-            # Elendi – düşük skor döndür ama kaydı tut
-            return {
-                "Ticker": ticker, "Fiyat": round(current_price, 2),
-                "Toplam Skor": 0, "Temel Skor": 0, "Teknik Skor": 0,
-                "RSI": None, "MACD Sinyal": "-", "Hacim OK": False,
-                "MA50 Üzeri": above_ma50, "MA200 Üzeri": above_ma200,
-                "Elendi": "Trend Altı"
-            }
-
-        # ── RSI ─────────────────────────────────────────────────────────────
-        rsi_series = calculate_rsi(close, 14)
-        rsi_val = float(rsi_series.iloc[-1]) if not rsi_series.empty else 50.0
-
-        # ── MACD ─────────────────────────────────────────────────────────────
-        macd_line, signal_line, histogram = calculate_macd(close)
-        macd_val   = float(macd_line.iloc[-1])
-        signal_val = float(signal_line.iloc[-1])
-        hist_val   = float(histogram.iloc[-1])
-        hist_prev  = float(histogram.iloc[-2]) if len(histogram) > 1 else 0.0
-
-        # MACD crossover: önceki bar'da MACD < Signal, şimdi MACD > Signal
-        macd_cross = (float(macd_line.iloc[-2]) < float(signal_line.iloc[-2])) and (macd_val > signal_val)
-        # Histogram pozitif ve büyüyor
-        hist_growing = hist_val > 0 and hist_val > hist_prev
-
-        # ── Hacim ───────────────────────────────────────────────────────────
-        vol_5d  = float(vol.iloc[-5:].mean())
-        vol_20d = float(vol.iloc[-20:].mean())
-        volume_ok = vol_5d > vol_20d
-
-        # ── ATR (Volatilite) ─────────────────────────────────────────────────
-        atr_series = calculate_atr(high, low, close, 14)
-        atr_val = float(atr_series.iloc[-1])
-        atr_pct = (atr_val / current_price) * 100  # Fiyata göre % ATR
-
-        # ── Temel Analiz Verisi ──────────────────────────────────────────────
-        info = {}
-        try:
-            ticker_obj = yf.Ticker(ticker)
-            info = ticker_obj.info or {}
-        except Exception:
-            pass
-
-        pb_ratio = info.get("priceToBook", None)
-        pe_ratio = info.get("trailingPE", None) or info.get("forwardPE", None)
-        earnings_growth = info.get("earningsQuarterlyGrowth", None)  # Çeyreklik kar büyümesi
-        revenue_growth  = info.get("revenueGrowth", None)
-        sector = info.get("sector", "Unknown")
-
-        # ─────────────────────────────────────────────────────────────────────
-        # PUANLAMA
-        # ─────────────────────────────────────────────────────────────────────
-        temel_skor    = 0
-        teknik_skor   = 0
-        skor_detay    = {}
-
-        # ── 1. TEMEL ANALİZ (Maks 40) ────────────────────────────────────────
-
-        # 1a. PD/DD – Maks 15 Puan
-        # Sektör ortalaması yoksa sabit eşikler kullan
-        pb_skor = 0
-        if pb_ratio is not None and pb_ratio > 0:
-            sektör_pb_ort = sector_stats.get(sector, {}).get("pb_mean", 3.0)
-            if pb_ratio < sektör_pb_ort * 0.5:
-                pb_skor = 15     # Sektörün yarısından ucuz
-            elif pb_ratio < sektör_pb_ort * 0.75:
-                pb_skor = 12
-            elif pb_ratio < sektör_pb_ort:
-                pb_skor = 8
-            elif pb_ratio < sektör_pb_ort * 1.25:
-                pb_skor = 4
-            else:
-                pb_skor = 0
-        else:
-            pb_skor = 5  # Veri yok → nötr puan
-        skor_detay["PD/DD Skor"] = pb_skor
-        temel_skor += pb_skor
-
-        # 1b. F/K – Maks 15 Puan
-        pe_skor = 0
-        if pe_ratio is not None and pe_ratio > 0:
-            sektör_pe_ort = sector_stats.get(sector, {}).get("pe_mean", 15.0)
-            if pe_ratio < sektör_pe_ort * 0.5:
-                pe_skor = 15
-            elif pe_ratio < sektör_pe_ort * 0.75:
-                pe_skor = 12
-            elif pe_ratio < sektör_pe_ort:
-                pe_skor = 8
-            elif pe_ratio < sektör_pe_ort * 1.5:
-                pe_skor = 4
-            elif pe_ratio > 0:
-                pe_skor = 1
-        else:
-            pe_skor = 5  # Veri yok → nötr
-        skor_detay["F/K Skor"] = pe_skor
-        temel_skor += pe_skor
-
-        # 1c. Net Kar Büyümesi – Maks 10 Puan
-        eg_skor = 0
-        if earnings_growth is not None:
-            if earnings_growth > 0.50:
-                eg_skor = 10   # %50+ büyüme
-            elif earnings_growth > 0.25:
-                eg_skor = 8
-            elif earnings_growth > 0.10:
-                eg_skor = 6
-            elif earnings_growth > 0:
-                eg_skor = 4
-            else:
-                eg_skor = 0   # Kar düşüşü → puan yok
-        else:
-            # Gelir büyümesini yedek olarak kullan
-            if revenue_growth is not None and revenue_growth > 0.15:
-                eg_skor = 4
-            else:
-                eg_skor = 3   # Veri yok → düşük nötr
-        skor_detay["Kar Büyüme Skor"] = eg_skor
-        temel_skor += eg_skor
-
-        # ── 2. TEKNİK ANALİZ (Maks 60) ───────────────────────────────────────
-
-        # 2a. RSI – Maks 20 Puan
-        rsi_skor = 0
-        if rsi_val < 30:
-            rsi_skor = 2    # Aşırı satım ama trend kötü olabilir
-        elif rsi_val < 40:
-            rsi_skor = 8
-        elif rsi_val < 50:
-            rsi_skor = 12
-        elif rsi_val <= 60:
-            rsi_skor = 20   # Altın bölge: momentum var, henüz aşırı alım yok
-        elif rsi_val <= 70:
-            rsi_skor = 15   # Güçlü ama biraz fazla ısınmış
-        elif rsi_val <= 80:
-            rsi_skor = 7    # Aşırı alım bölgesi
-        else:
-            rsi_skor = 2    # Ekstrem aşırı alım
-        skor_detay["RSI Skor"] = rsi_skor
-        teknik_skor += rsi_skor
-
-        # 2b. MACD – Maks 20 Puan
-        macd_skor = 0
-        if macd_cross:
-            macd_skor = 20   # Tam crossover – en güçlü sinyal
-        elif hist_growing and macd_val > 0:
-            macd_skor = 16   # MACD pozitif ve histogram büyüyor
-        elif hist_growing and macd_val < 0:
-            macd_skor = 10   # Histogram büyüyor ama MACD hala negatif
-        elif hist_val > 0:
-            macd_skor = 8    # Histogram pozitif ama büyümüyor
-        elif macd_val > signal_val:
-            macd_skor = 5    # MACD sinyalin üzerinde ama histogram küçülüyor
-        else:
-            macd_skor = 0
-        skor_detay["MACD Skor"] = macd_skor
-        teknik_skor += macd_skor
-
-        # 2c. Hacim – Maks 10 Puan
-        hacim_skor = 0
-        if vol_5d > 0 and vol_20d > 0:
-            vol_ratio = vol_5d / vol_20d
-            if vol_ratio > 2.0:
-                hacim_skor = 10   # Hacim patlaması
-            elif vol_ratio > 1.5:
-                hacim_skor = 8
-            elif vol_ratio > 1.2:
-                hacim_skor = 6
-            elif vol_ratio > 1.0:
-                hacim_skor = 4
-            else:
-                hacim_skor = 0    # Hacim düşük → ilgi yok
-        skor_detay["Hacim Skor"] = hacim_skor
-        teknik_skor += hacim_skor
-
-        # 2d. ATR Volatilite – Maks 10 Puan
-        # Swing trade için ideal ATR: %1.5 – %4.5 arası
-        atr_skor = 0
-        if atr_pct < 0.8:
-            atr_skor = 1    # Çok hareketsiz, swing için fırsat yok
-        elif atr_pct < 1.5:
-            atr_skor = 4
-        elif atr_pct <= 3.0:
-            atr_skor = 10   # İdeal swing volatilitesi
-        elif atr_pct <= 4.5:
-            atr_skor = 7
-        elif atr_pct <= 6.0:
-            atr_skor = 4    # Biraz riskli ama kabul edilebilir
-        else:
-            atr_skor = 1    # Aşırı volatil = risk yüksek
-        skor_detay["ATR Skor"] = atr_skor
-        teknik_skor += atr_skor
-
-        # ── EKSTRA FAKTÖRLER (Bonus/Ceza) ────────────────────────────────────
-        # 2e. MA Üçlü Düzeni: MA50 > MA200 (Altın Çapraz yapısı) +5 Bonus
-        if ma200_val and ma50_val > ma200_val:
-            bonus = 5
-            skor_detay["MA Golden Cross Bonus"] = bonus
-            teknik_skor += bonus
-        else:
-            skor_detay["MA Golden Cross Bonus"] = 0
-
-        # 2f. Fiyatın MA50'ye Yakınlığı: MA50'nin %2-8 üzerinde ideal pozisyon
-        ma50_dist_pct = ((current_price - ma50_val) / ma50_val) * 100
-        if 2 <= ma50_dist_pct <= 8:
-            prox_bonus = 5
-        elif 8 < ma50_dist_pct <= 15:
-            prox_bonus = 2   # Biraz uzaklaşmış ama tamam
-        elif ma50_dist_pct > 15:
-            prox_bonus = 0   # Çok uzaklaşmış, geri çekilme riski
-        else:
-            prox_bonus = 3   # MA50'ye çok yakın ama üzerinde
-        skor_detay["MA50 Mesafe Bonus"] = prox_bonus
-        teknik_skor += prox_bonus
-
-        # ── SINIR KONTROLÜ ───────────────────────────────────────────────────
-        temel_skor  = min(temel_skor, 40)
-        teknik_skor = min(teknik_skor, 60)
-        toplam_skor = temel_skor + teknik_skor
-
-        # MACD sinyal etiketi
-        if macd_cross:
-            macd_label = "🔥 Crossover"
-        elif hist_growing:
-            macd_label = "📈 Hist. Büyüyor"
-        elif hist_val > 0:
-            macd_label = "✅ Pozitif"
-        else:
-            macd_label = "❌ Negatif"
-
-        return {
-            "Ticker":        ticker,
-            "Fiyat":         round(current_price, 2),
-            "Sektör":        sector,
-            "Toplam Skor":   round(toplam_skor, 1),
-            "Temel Skor":    round(temel_skor, 1),
-            "Teknik Skor":   round(teknik_skor, 1),
-            "RSI":           round(rsi_val, 1),
-            "MACD Sinyal":   macd_label,
-            "Hacim OK":      volume_ok,
-            "MA50 Üzeri":    above_ma50,
-            "MA200 Üzeri":   above_ma200,
-            "ATR%":          round(atr_pct, 2),
-            "PD/DD":         round(pb_ratio, 2) if pb_ratio else "N/A",
-            "F/K":           round(pe_ratio, 2) if pe_ratio else "N/A",
-            "Kar Büyümesi":  f"{earnings_growth*100:.1f}%" if earnings_growth else "N/A",
-            "Elendi":        None,
-            **skor_detay
-        }
-
-    except Exception as e:
-        return None
-
-
-# ─────────────────────────────────────────────────────────────────────────────
-# SEKTÖR İSTATİSTİKLERİ TOPLAMA
-# (İlk 80 hisseden hızlı sektör ortalamaları çek)
-# ─────────────────────────────────────────────────────────────────────────────
-
-@st.cache_data(ttl=3600)
-def build_sector_stats(sample_tickers: list) -> dict:
-    """
-    Sektör bazlı F/K ve PD/DD ortalamalarını örneklem hisselerden hesapla.
-    Cache'lenir (1 saat geçerli).
-    """
-    records = []
-    for tkr in sample_tickers[:80]:
-        try:
-            info = yf.Ticker(tkr).info or {}
-            records.append({
-                "sector": info.get("sector", "Unknown"),
-                "pb": info.get("priceToBook"),
-                "pe": info.get("trailingPE") or info.get("forwardPE"),
-            })
-            time.sleep(0.05)
-        except Exception:
-            continue
-
-    df = pd.DataFrame(records).dropna(subset=["sector"])
-    stats = {}
-    for sector, grp in df.groupby("sector"):
-        stats[sector] = {
-            "pb_mean": grp["pb"].dropna().mean() or 3.0,
-            "pe_mean": grp["pe"].dropna().mean() or 15.0,
-        }
-    return stats
-
 
 # ─────────────────────────────────────────────────────────────────────────────
 # STREAMLIT ARAYÜZÜ
@@ -419,6 +48,7 @@ st.markdown("""
 - 🔵 **%40** → Temel Analiz (PD/DD, F/K, Kar Büyümesi)  
 - 🟠 **%60** → Teknik Analiz (Trend, RSI, MACD, Hacim, ATR)  
 - ✅ **70+ puan** → AL Listesi | ⛔ Fiyat MA50/MA200 altında → Otomatik Eleme
+- 🗓️ İsteğe bağlı **Haftalık Onay** (10 puan, teknik payından): günlük barlardan örneklenen haftalık trend, RSI, MACD
 """)
 
 st.divider()
@@ -428,190 +58,298 @@ with st.sidebar:
     st.header("⚙️ Tarama Ayarları")
     min_score = st.slider("Minimum AL Skoru", 50, 90, 70, 5)
     max_tickers = st.slider("Taranacak Hisse Sayısı", 50, len(BIST_TICKERS), 300, 50)
-    delay = st.slider("İstekler Arası Gecikme (sn)", 0.1, 1.0, 0.3, 0.1,
-                      help="Çok hızlı gidince yfinance kısıtlayabilir")
+    rate = st.slider("Saniyedeki Maks. İstek", 1.0, 20.0, DEFAULT_RATE, 1.0,
+                     help="Tüm eşzamanlı isteklerin paylaştığı bütçe. Kısıtlamaya "
+                          "takılınca hız otomatik düşürülür ve istek tekrar denenir")
+    workers = st.slider("Eşzamanlı İstek", 1, 16, DEFAULT_WORKERS)
     show_eliminated = st.checkbox("Elenen Hisseleri de Göster", False)
+    fundamentals_ttl_h = st.slider("Temel Veri Önbellek Süresi (saat)", 1, 168, 24,
+                                   help="PD/DD, F/K gibi .info verileri bu süre boyunca yeniden çekilmez")
+    offline = st.checkbox("Sadece Yerel Veri (İndirme Yok)", False,
+                          help="Fiyatlar yerel depodan okunur, yeni bar indirilmez")
+    backend_label = st.selectbox(
+        "İndikatör Hesabı", list(BACKEND_LABELS.values()),
+        help="Tek süreç: kalıcı indikatör durumu yalnızca yeni barlarla ilerletilir. "
+             "Çok süreç: fiyat paneli paylaşımlı bellekte çekirdeklere bölünüp baştan "
+             "hesaplanır (çok büyük evrenler için)")
+    backend = {v: k for k, v in BACKEND_LABELS.items()}[backend_label]
+    timeframe_label = st.selectbox(
+        "Çoklu Zaman Dilimi", list(TIMEFRAME_LABELS.values()),
+        help="Haftalık / aylık barlar depodaki günlük barlardan örneklenir (ek indirme "
+             "yok). Haftalık onay açıkken teknik payın 10 puanı haftalık trend, RSI ve "
+             "MACD onayına ayrılır")
+    timeframes = {v: k for k, v in TIMEFRAME_LABELS.items()}[timeframe_label]
 
     st.divider()
     st.subheader("📋 Manuel Hisse Ekle")
     extra_raw = st.text_area("Ekstra hisseler (virgülle ayır)", "THYAO.IS, EREGL.IS")
-    extra_tickers = [t.strip().upper() for t in extra_raw.split(",") if t.strip()]
-
-    start_button = st.button("🚀 Taramayı Başlat", type="primary", use_container_width=True)
+    skip_invalid = st.checkbox("Geçersiz Sembolleri Atla", True,
+                               help="Veri vermeyen ya da 60 bardan kısa geçmişi olan semboller "
+                                    "yeniden deneme zamanına kadar taranmaz")
+
+    # Anlık görüntüye yazılan parametreler; aynı parametreler + aynı işlem günü
+    # yarım kalan taramayı kontrol noktasından sürdürür
+    scan_params = {
+        "max_tickers": max_tickers, "extra": extra_raw, "offline": offline,
+        "rate": rate, "workers": workers, "fundamentals_ttl_h": fundamentals_ttl_h,
+        "backend": backend, "skip_invalid": skip_invalid, "timeframes": timeframes,
+    }
+    checkpoints = ScanCheckpoint()
+    pending = checkpoints.pending(scan_params)
+    start_button = st.button("⏯️ Yarım Kalan Taramayı Sürdür" if pending else "🚀 Taramayı Başlat",
+                             type="primary", use_container_width=True)
+    if pending:
+        st.caption(f"Bu ayarlarla bugün başlayıp yarım kalan tarama var "
+                   f"({pending.get('prices', 0)} hissenin fiyatı hazır); "
+                   "kaldığı yerden devam eder.")
+
+    # Zamanlayıcı ayrı süreçte çalışır; tarama sekme kapansa da sürer
+    st.divider()
+    st.subheader("🕕 Gün Sonu Zamanlayıcı")
+    scheduler_status = read_status()
+    if is_alive(scheduler_status):
+        if scheduler_status["running"] or run_requested():
+            st.caption("⏳ Arka planda tarama sürüyor / sırada.")
+        else:
+            next_at = datetime.fromisoformat(scheduler_status["next_run"])
+            st.caption(f"Çalışıyor · sonraki tarama {next_at:%d.%m %H:%M} TSİ")
+        if scheduler_status.get("last_error"):
+            st.caption(f"⚠️ Son hata: {scheduler_status['last_error']}")
+        if st.button("⏱️ Arka Planda Şimdi Tara", use_container_width=True):
+            request_run()
+            st.toast("İstek zamanlayıcıya iletildi; bitince 'En Son Taramayı Yükle'.")
+    else:
+        st.caption("Çalışmıyor. Başlatmak için: `python -m bist.scheduler`")
 
 # Taranacak liste
-scan_list = list(dict.fromkeys(extra_tickers + BIST_TICKERS[:max_tickers]))
+extra_tickers = parse_tickers(extra_raw)
+scan_list = build_scan_list(max_tickers, extra_tickers)
+
+# Tarama sonuçları sürümlü anlık görüntüler olarak saklanır (oturum + disk);
+# widget değişiklikleri yalnızca görüntüyü yeniden süzer, taramayı tekrarlatmaz
+snapshot_store = SnapshotStore()
+st.session_state.setdefault("snapshots", {})
+
+
+@st.cache_resource
+def market_data() -> MarketDataService:
+    """
+    Sunucu süreci başına tek veri servisi: eşzamanlı oturumların aynı hisse
+    istekleri tek indirmede birleşir, okunan barlar bellekte paylaşılır.
+    """
+    return MarketDataService()
+
+
+def load_snapshot(sid: str) -> Snapshot:
+    """Görüntüyü oturumdan, yoksa diskten yükle."""
+    if sid not in st.session_state.snapshots:
+        st.session_state.snapshots[sid] = snapshot_store.load(sid)
+    return st.session_state.snapshots[sid]
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def ticker_figure(sid: str, ticker: str, as_of: datetime, period: str | None):
+    """Hisse detay grafiği; görüntü + hisse + geçmiş başına bir kez kurulur."""
+    bars = load_bars(market_data().store, ticker, as_of, period)
+    return None if bars is None else detail_figure(bars, title=ticker)
+
+
+AL_COLUMNS = [
+    "Ticker", "Fiyat", "Sektör", "Toplam Skor",
+    "Temel Skor", "Teknik Skor", "RSI", "MACD Sinyal",
+    "ATR%", "PD/DD", "F/K", "Kar Büyümesi",
+    "Hacim OK", "MA50 Üzeri", "MA200 Üzeri",
+    "Haftalık Onay", "Haftalık Trend", "Haftalık RSI", "Aylık Trend"
+]
+# Tarama sürerken gösterilen ara AL listesi satır sayısı
+LIVE_ROWS = 25
+
+# Tablolar sunucuda süzülüp sıralanır; tarayıcıya yalnızca görünen sayfa gider
+SORTABLE = ["Toplam Skor", "Temel Skor", "Teknik Skor", "Ticker", "Fiyat", "RSI", "ATR%",
+            "PD/DD", "F/K", "Kar Büyümesi", "Haftalık Onay", "Haftalık RSI"]
+
+
+def shown_columns(df: pd.DataFrame, columns: list) -> list:
+    """Tabloda olan sütunlar; çoklu zaman dilimi kapalı taramada boş sütunlar gizlenir."""
+    return [c for c in columns if c in df.columns
+            and not (c in TIMEFRAME_COLUMNS and df[c].isna().all())]
+
+
+def paged_table(df: pd.DataFrame, columns: list, key: str) -> None:
+    """Arama, sıralama ve sayfa seçimiyle tek sayfayı göster."""
+    c1, c2, c3, c4, c5 = st.columns([3, 2, 1, 1, 1])
+    search = c1.text_input("Ara (Ticker / Sektör)", key=f"{key}_search")
+    sort_by = c2.selectbox("Sırala", [c for c in SORTABLE if c in columns], key=f"{key}_sort")
+    ascending = c3.checkbox("Artan", False, key=f"{key}_asc")
+    page_size = c4.selectbox("Satır", PAGE_SIZES, index=1, key=f"{key}_size")
+    page_no = c5.number_input("Sayfa", min_value=1, value=1, step=1, key=f"{key}_page")
+
+    page = query(df[columns], search, sort_by, ascending, page_no, page_size)
+    st.dataframe(style_page(page.frame), use_container_width=True, hide_index=True)
+    shown = f"{page.start + 1}–{page.start + len(page.frame)}" if page.total else "0"
+    st.caption(f"Sayfa {page.page}/{page.pages} · {shown} / {page.total} satır")
+
+
+def top_cards(df_al: pd.DataFrame) -> None:
+    """AL listesinin en iyi 5 hissesi için detay kartları."""
+    top5 = df_al.head(5)
+    cols = st.columns(min(5, len(top5)))
+    for idx, (_, row) in enumerate(top5.iterrows()):
+        with cols[idx]:
+            score_emoji = "🥇" if idx == 0 else "🥈" if idx == 1 else "🥉" if idx == 2 else "⭐"
+            has_weekly = pd.notna(row.get("Haftalık Onay"))
+            teknik_cap = TEKNIK_CAP - WEEKLY_CAP if has_weekly else TEKNIK_CAP
+            weekly = (f"\n<b>Haftalık:</b> {row['Haftalık Onay']:.0f}/{WEEKLY_CAP} "
+                      f"{row['Haftalık Trend'] if pd.notna(row['Haftalık Trend']) else ''}<br>"
+                      if has_weekly else "")
+            st.markdown(f"""
+<div style="background:#1e2d3d;padding:16px;border-radius:10px;border-left:4px solid #4A90D9;">
+<h4>{score_emoji} {row['Ticker']}</h4>
+<b>Fiyat:</b> {row['Fiyat']:.2f} ₺<br>
+<b>Toplam Skor:</b> {row['Toplam Skor']:.0f}/100<br>
+<b>Temel:</b> {row['Temel Skor']:.0f}/{TEMEL_CAP}<br>
+<b>Teknik:</b> {row['Teknik Skor']:.0f}/{teknik_cap}<br>
+<b>RSI:</b> {row['RSI']:.1f}<br>
+<b>MACD:</b> {row['MACD Sinyal']}<br>
+<b>ATR%:</b> {row['ATR%']:.2f}<br>{weekly}
+<b>Sektör:</b> {row['Sektör'] if pd.notna(row['Sektör']) else NA_REP}
+</div>
+""", unsafe_allow_html=True)
+
+
+def export_buttons(sid: str, label: str, stem: str, columns: list | None = None,
+                   min_score: float | None = None) -> None:
+    """
+    Görüntüden CSV / Parquet indirme. Dosyalar yalnızca "hazırla" ile istenince
+    yazılır; eşik ya da sütunlar değişince yeniden istenir.
+    """
+    request = (sid, tuple(columns) if columns is not None else None, min_score)
+    state_key = f"{stem}_export"
+    cols = st.columns([1, 1, 4])
+    if st.session_state.get(state_key) != request:
+        cols[0].button(f"📦 {label} dışa aktarımını hazırla", key=f"{stem}_prepare",
+                       on_click=st.session_state.__setitem__, args=(state_key, request))
+        return
+    for col, fmt, mime in zip(cols[:2], EXPORT_FORMATS,
+                              ("text/csv", "application/octet-stream")):
+        path = snapshot_store.export(sid, fmt, columns, min_score)
+        with open(path, "rb") as f:
+            col.download_button(f"📥 {label} ({fmt.upper()})", data=f,
+                                file_name=f"{stem}_{sid}.{fmt}", mime=mime,
+                                key=f"{stem}_{fmt}")
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # TARAMA
 # ─────────────────────────────────────────────────────────────────────────────
 
 if start_button:
-    st.info(f"🔍 {len(scan_list)} hisse taranıyor... Bu işlem birkaç dakika sürebilir.")
-
-    # Önce sektör istatistiklerini oluştur
-    with st.spinner("Sektör ortalamaları hesaplanıyor..."):
-        sector_stats = build_sector_stats(scan_list)
+    registry = SymbolRegistry()
+    if extra_tickers and skip_invalid:
+        # Manuel semboller tarama öncesi tek toplu istekle doğrulanır
+        with st.spinner("Manuel semboller doğrulanıyor..."):
+            invalid = validate_symbols(extra_tickers, market_data().store, registry,
+                                       pool=FetchPool(rate=rate, max_workers=workers),
+                                       offline=offline)
+        if invalid:
+            st.warning(f"⚠️ {len(invalid)} manuel sembol geçersiz, taranmayacak: "
+                       + ", ".join(invalid))
 
-    results = []
-    progress_bar = st.progress(0, text="Tarama başlıyor...")
-    status_text  = st.empty()
-    error_count  = 0
-
-    for i, ticker in enumerate(scan_list):
-        status_text.text(f"⏳ Taranan: {ticker}  ({i+1}/{len(scan_list)})")
-        result = score_ticker(ticker, sector_stats)
-        if result:
-            results.append(result)
-        else:
-            error_count += 1
-        progress_bar.progress((i + 1) / len(scan_list),
-                               text=f"{i+1}/{len(scan_list)} tamamlandı")
-        time.sleep(delay)
+    st.info(f"🔍 {len(scan_list)} hisse taranıyor... Bu işlem birkaç dakika sürebilir.")
 
+    # Sektör tabanları tüm evren için temel veri önbelleğinde kalıcı tutulur;
+    # ayrı ısınma turu yok
+    fundamentals_ttl = fundamentals_ttl_h * 3600
+
+    progress_bar = st.progress(0, text="Fiyat verileri indiriliyor...")
+    stage_labels = {"download": "İndirme (parça)", "fundamentals": "Temel veri"}
+    live = st.empty()
+
+    def show_partial(results: pd.DataFrame, done: int, total: int) -> None:
+        """Tarama sürerken ara sonuçlar (run_scan en çok ~0.5 sn'de bir çağırır)."""
+        partial_al = select_buy_list(results, min_score)
+        with live.container():
+            lcol1, lcol2, lcol3 = st.columns(3)
+            lcol1.metric("✅ Puanlanan", f"{done}/{total}")
+            lcol2.metric("🚀 AL Listesi (ara)", len(partial_al))
+            lcol3.metric("🏅 En Yüksek Skor",
+                         f"{partial_al['Toplam Skor'].max():.0f}" if len(partial_al) else NA_REP)
+            st.dataframe(style_page(partial_al[shown_columns(partial_al, AL_COLUMNS)]
+                                    .head(LIVE_ROWS)),
+                         use_container_width=True, hide_index=True)
+            st.caption("⏳ Ara sonuç: fiyat parçaları ve temel veriler geldikçe güncellenir; "
+                       "sektör tabanları tarama sonunda yenilenir, skorlar az değişebilir.")
+            if len(partial_al):
+                top_cards(partial_al)
+
+    # Yerel depo yalnızca eksik/yeni barları indirir; tüm evren tek vektörel
+    # geçişte puanlanır, .info yalnızca trendi geçenler için çekilir
+    scan_run = checkpoints.run(scan_params)
+    report = run_scan(
+        scan_list, offline=offline, rate=rate, workers=workers,
+        fundamentals_ttl=fundamentals_ttl, backend=backend, timeframes=timeframes,
+        registry=registry, skip_invalid=skip_invalid,
+        store=market_data().store, fundamentals=market_data().fundamentals(fundamentals_ttl),
+        checkpoint=scan_run, partial_cb=show_partial,
+        progress_cb=lambda stage, done, total: progress_bar.progress(
+            done / total, text=f"{stage_labels[stage]}: {done}/{total}"),
+    )
     progress_bar.empty()
-    status_text.empty()
+    live.empty()
 
-    if not results:
+    if report.results.empty:
         st.error("Hiç sonuç alınamadı. İnternet bağlantınızı veya ticker listesini kontrol edin.")
         st.stop()
 
-    # DataFrame oluştur
-    df_all = pd.DataFrame(results)
-    df_all = df_all.sort_values("Toplam Skor", ascending=False).reset_index(drop=True)
-
-    # AL listesi (elenmemiş + min_score üzeri)
-    df_al = df_all[(df_all["Elendi"].isna()) & (df_all["Toplam Skor"] >= min_score)].copy()
-
-    # ── Özet Metrikleri ──────────────────────────────────────────────────────
-    st.divider()
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("🔍 Taranan", len(scan_list))
-    col2.metric("✅ Veri Alınan", len(df_all))
-    col3.metric("🚀 AL Listesi", len(df_al))
-    col4.metric("⚠️ Hata / Veri Yok", error_count)
+    # Sıkıştırma: sonuç anlık görüntüye yazılır, kontrol noktası silinir
+    snap = compact(scan_run, report, snapshot_store)
+    st.session_state.snapshots[snap.id] = snap
+    st.session_state.snapshot_label = snap.label   # yeni tarama görüntülenir
+    st.success("✅ Tarama tamamlandı!")
 
-    # ── AL LİSTESİ TABLOSU ───────────────────────────────────────────────────
-    st.subheader(f"🚀 AL Listesi ({min_score}+ Puan, Toplam: {len(df_al)} Hisse)")
 
-    if df_al.empty:
-        st.warning("Hiç hisse eşiği geçemedi. Skoru düşürmeyi deneyin.")
-    else:
-        display_cols = [
-            "Ticker", "Fiyat", "Sektör", "Toplam Skor",
-            "Temel Skor", "Teknik Skor", "RSI", "MACD Sinyal",
-            "ATR%", "PD/DD", "F/K", "Kar Büyümesi",
-            "Hacim OK", "MA50 Üzeri", "MA200 Üzeri"
-        ]
-        display_cols = [c for c in display_cols if c in df_al.columns]
-
-        def color_score(val):
-            if isinstance(val, (int, float)):
-                if val >= 80: return "background-color: #1a6b3c; color: white"
-                if val >= 70: return "background-color: #2d9e5f; color: white"
-                if val >= 60: return "background-color: #f4a83a"
-            return ""
-
-        styled = df_al[display_cols].style.applymap(
-            color_score, subset=["Toplam Skor"]
-        ).format({"Fiyat": "{:.2f}", "Toplam Skor": "{:.1f}",
-                  "Temel Skor": "{:.1f}", "Teknik Skor": "{:.1f}",
-                  "RSI": "{:.1f}", "ATR%": "{:.2f}%"})
-
-        st.dataframe(styled, use_container_width=True, height=500)
-
-        # CSV İndir
-        csv_data = df_al[display_cols].to_csv(index=False, encoding="utf-8-sig")
-        st.download_button(
-            "📥 AL Listesini CSV İndir",
-            data=csv_data,
-            file_name=f"bist_al_listesi_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-            mime="text/csv"
-        )
-
-    # ── TÜM SONUÇLAR TABLOSU ─────────────────────────────────────────────────
-    st.subheader("📊 Tüm Tarama Sonuçları")
-    if show_eliminated:
-        df_show = df_all
-    else:
-        df_show = df_all[df_all["Elendi"].isna()]
-
-    display_cols2 = [
-        "Ticker", "Fiyat", "Toplam Skor", "Temel Skor", "Teknik Skor",
-        "RSI", "MACD Sinyal", "ATR%", "Hacim OK", "MA50 Üzeri", "MA200 Üzeri", "Elendi"
-    ]
-    display_cols2 = [c for c in display_cols2 if c in df_show.columns]
-    st.dataframe(df_show[display_cols2], use_container_width=True, height=400)
-
-    # ── SKOR DAĞILIM GRAFİĞİ ─────────────────────────────────────────────────
-    st.subheader("📉 Skor Dağılımı")
-    df_chart = df_all[df_all["Elendi"].isna()].head(40)
-    if not df_chart.empty:
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            x=df_chart["Ticker"],
-            y=df_chart["Temel Skor"],
-            name="Temel Analiz",
-            marker_color="#4A90D9"
-        ))
-        fig.add_trace(go.Bar(
-            x=df_chart["Ticker"],
-            y=df_chart["Teknik Skor"],
-            name="Teknik Analiz",
-            marker_color="#F4A83A"
-        ))
-        fig.add_hline(y=min_score, line_dash="dash", line_color="red",
-                      annotation_text=f"AL Eşiği ({min_score})")
-        fig.update_layout(
-            barmode="stack",
-            title="Hisse Başına Temel + Teknik Skor (İlk 40)",
-            xaxis_tickangle=-45,
-            plot_bgcolor="#0E1117",
-            paper_bgcolor="#0E1117",
-            font_color="white",
-            height=450
-        )
-        st.plotly_chart(fig, use_container_width=True)
+with st.sidebar:
+    with st.expander("🗄️ Paylaşılan Veri Servisi"):
+        st.dataframe(market_data().stats_table().style.format({"İsabet %": "{:.0f}"}, na_rep="-"),
+                     use_container_width=True, hide_index=True)
+        st.caption("Sunucudaki tüm oturumlar için; birleşen = başka oturumun süren "
+                   "isteği beklendi")
 
-    # ── EN İYİ 5 HİSSE DETAY KARTI ───────────────────────────────────────────
-    if not df_al.empty:
-        st.subheader("🏆 En İyi 5 Hisse – Detay Kartları")
-        top5 = df_al.head(5)
-        cols = st.columns(min(5, len(top5)))
-        for idx, (_, row) in enumerate(top5.iterrows()):
-            with cols[idx]:
-                score_emoji = "🥇" if idx == 0 else "🥈" if idx == 1 else "🥉" if idx == 2 else "⭐"
-                st.markdown(f"""
-<div style="background:#1e2d3d;padding:16px;border-radius:10px;border-left:4px solid #4A90D9;">
-<h4>{score_emoji} {row['Ticker']}</h4>
-<b>Fiyat:</b> {row['Fiyat']} ₺<br>
-<b>Toplam Skor:</b> {row['Toplam Skor']}/100<br>
-<b>Temel:</b> {row['Temel Skor']}/40<br>
-<b>Teknik:</b> {row['Teknik Skor']}/60<br>
-<b>RSI:</b> {row.get('RSI','N/A')}<br>
-<b>MACD:</b> {row.get('MACD Sinyal','N/A')}<br>
-<b>ATR%:</b> {row.get('ATR%','N/A')}<br>
-<b>Sektör:</b> {row.get('Sektör','N/A')}
-</div>
-""", unsafe_allow_html=True)
 
-    st.success("✅ Tarama tamamlandı!")
-    st.caption(f"Son güncelleme: {datetime.now().strftime('%d.%m.%Y %H:%M:%S')}")
+# ─────────────────────────────────────────────────────────────────────────────
+# KAYITLI TARAMALAR
+# ─────────────────────────────────────────────────────────────────────────────
 
-else:
+snapshot_list = snapshot_store.list()
+if snapshot_list.empty:
     # Henüz tarama yapılmadı – bilgi ekranı
     st.info("⬅️ Sol panelden ayarları yapıp **Taramayı Başlat** butonuna basın.")
 
+    # Haftalık onay açıkken teknik tavanın WEEKLY_CAP puanı haftalık onaya ayrılır
+    teknik_cap = TEKNIK_CAP if timeframes == OFF else TEKNIK_CAP - WEEKLY_CAP
+    weekly_md = "" if timeframes == OFF else f"""
+### Haftalık Onay ({WEEKLY_CAP} Puan)
+Haftalık barlar depodaki günlük barlardan örneklenir (MA{MA_FAST} / MA{MA_SLOW});
+günlük teknik tavan {TEKNIK_CAP} → {teknik_cap}, toplam yine 100 üzerinden.
+
+| Kriter | Maks Puan | Mantık |
+|--------|-----------|--------|
+| Haftalık Trend | {WEEKLY_TREND_SCORES[0]} | Fiyat MA{MA_FAST} üzerinde ve MA{MA_FAST} > MA{MA_SLOW} = {WEEKLY_TREND_SCORES[0]}, yalnızca MA{MA_FAST} üzeri = {WEEKLY_TREND_SCORES[1]} |
+| Haftalık MACD | {WEEKLY_MACD_SCORES[0]} | Crossover ya da büyüyen pozitif histogram = {WEEKLY_MACD_SCORES[0]}, MACD > sinyal = {WEEKLY_MACD_SCORES[1]} |
+| Haftalık RSI | 3 | 50–70 arası = 3, 40–50 ya da 70–80 = 1 |
+""" + (f"\nAylık trend (MA{MA_FAST} üzeri / altı) yalnızca gösterilir, puana katılmaz.\n"
+       if timeframes == WEEKLY_MONTHLY else "")
+
     with st.expander("📖 Puanlama Sistemi Detayları"):
-        st.markdown("""
-### Temel Analiz (40 Puan)
+        st.markdown(f"""
+### Temel Analiz ({TEMEL_CAP} Puan)
 | Kriter | Maks Puan | Mantık |
 |--------|-----------|--------|
 | PD/DD  | 15 | Sektör ortalamasına göre ucuz olana daha yüksek puan |
 | F/K    | 15 | Makul F/K'ya yüksek puan, çok pahalıya 0 puan |
 | Kar Büyümesi | 10 | %50+ büyüme = tam puan, düşüş = 0 puan |
 
-### Teknik Analiz (60 Puan)
+### Teknik Analiz ({teknik_cap} Puan)
 | Kriter | Maks Puan | Mantık |
 |--------|-----------|--------|
 | Trend Filtresi | Zorunlu | MA50 ve MA200 altı → Otomatik eleme |
@@ -621,7 +359,209 @@ else:
 | ATR Volatilite | 10 | %1.5–%3 arası ideal swing volatilitesi |
 | MA Golden Cross | 5 bonus | MA50 > MA200 yapısı |
 | MA50 Mesafe | 5 bonus | Fiyat MA50'nin %2–8 üzerindeyse ideal |
-
+{weekly_md}
 ### AL Sinyali
 Toplam skor **70 ve üzeri** olan hisseler otomatik AL listesine alınır.
         """)
+    st.stop()
+
+labels = dict(zip(snapshot_list["id"], snapshot_list["label"]))
+ids_by_label = {v: k for k, v in labels.items()}
+# İlk açılışta ya da seçili görüntü silinmişse en yeni görüntülenir
+if st.session_state.get("snapshot_label") not in ids_by_label:
+    st.session_state.snapshot_label = snapshot_list["label"].iloc[0]
+with st.sidebar:
+    st.divider()
+    st.subheader("📂 Kayıtlı Taramalar")
+    # Zamanlayıcının yazdığı yeni görüntüler için (callback widget'tan önce çalışır)
+    st.button("🔄 En Son Taramayı Yükle", use_container_width=True,
+              on_click=lambda: st.session_state.update(
+                  snapshot_label=snapshot_store.list()["label"].iloc[0]))
+    chosen = st.selectbox("Görüntülenen tarama", list(ids_by_label), key="snapshot_label",
+                          help="En yeni başta; eski taramalar diskten yüklenir")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SONUÇLAR (seçili görüntü üzerinden; tarama tekrarlanmaz)
+# ─────────────────────────────────────────────────────────────────────────────
+
+snap = load_snapshot(ids_by_label[chosen])
+report = snap.report
+df_all = report.results
+error_count = report.errors
+
+st.caption(f"📂 Görüntülenen tarama: {snap.label}")
+
+# Zamanlayıcı taramalarında önceki görüntüye göre uyarılar
+alerts = load_alerts(snap.id)
+if alerts and (alerts["new_buy"] or alerts["new_crossover"]):
+    with st.expander(f"🔔 Uyarılar ({len(alerts['new_buy'])} yeni AL, "
+                     f"{len(alerts['new_crossover'])} yeni MACD kesişimi)", expanded=True):
+        acol1, acol2 = st.columns(2)
+        acol1.markdown(f"**AL eşiğini ({alerts['min_score']:g}+) yeni geçenler**")
+        acol1.dataframe(pd.DataFrame(alerts["new_buy"], columns=["Ticker", "Toplam Skor"]),
+                        use_container_width=True, hide_index=True)
+        acol2.markdown("**Yeni 🔥 MACD Crossover**")
+        acol2.dataframe(pd.DataFrame(alerts["new_crossover"], columns=["Ticker", "Toplam Skor"]),
+                        use_container_width=True, hide_index=True)
+
+# AL listesi (elenmemiş + min_score üzeri)
+df_al = select_buy_list(df_all, min_score)
+
+# ── Özet Metrikleri ──────────────────────────────────────────────────────
+st.divider()
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("🔍 Taranan", report.scanned)
+col2.metric("✅ Veri Alınan", len(df_all))
+col3.metric("🚀 AL Listesi", len(df_al))
+col4.metric("⚠️ Hata / Veri Yok", error_count)
+
+# Kısıtlanan semboller "veri yok"tan ayrı raporlanır: sonra tekrar denenebilir
+fetch_summary = report.fetch_summary
+if fetch_summary[THROTTLED] or fetch_summary[ERROR]:
+    st.warning(f"⏳ {fetch_summary[THROTTLED]} istek kısıtlandı, "
+               f"{fetch_summary[ERROR]} istek hata verdi (tekrar denemelere rağmen). "
+               "Bu hisseler için taramayı daha sonra yeniden çalıştırın.")
+
+# Sembol kaydınca atlananlar (veri yok / yetersiz bar; yeniden deneme zamanına kadar)
+if report.skipped:
+    with st.expander(f"⏭️ Atlanan Semboller ({len(report.skipped)})"):
+        st.dataframe(skipped_table(report.skipped), use_container_width=True, hide_index=True)
+        st.caption("Yeniden deneme zamanı geldiğinde otomatik taranır; hemen denemek için "
+                   "'Geçersiz Sembolleri Atla' seçeneğini kapatın.")
+
+# ── Tarama Fazları ───────────────────────────────────────────────────────
+phase_cols = st.columns(len(report.metrics.phases))
+for pcol, (_, phase) in zip(phase_cols, report.metrics.phase_summary().iterrows()):
+    pcol.metric(phase["Faz"], f"{phase['Giren']} → {phase['Geçen']}",
+                f"{phase['Süre (sn)']:.1f} sn", delta_color="off", help=phase["Not"] or None)
+
+# ── Tarama Ölçümleri ─────────────────────────────────────────────────────
+with st.expander("⏱️ Tarama Ölçümleri (aşama süreleri, hata sebepleri)"):
+    mcol1, mcol2 = st.columns([3, 2])
+    mcol1.dataframe(report.metrics.stage_summary().style.format(
+        {"Toplam (sn)": "{:.2f}", "p50 (ms)": "{:.1f}", "p95 (ms)": "{:.1f}",
+         "Maks (ms)": "{:.1f}"}, na_rep="-"),
+        use_container_width=True, hide_index=True)
+    failures = report.metrics.failure_counts()
+    if failures.empty:
+        mcol2.success("Hata kaydı yok.")
+    else:
+        mcol2.dataframe(failures, use_container_width=True, hide_index=True)
+    st.download_button(
+        "📥 Ölçümleri JSON İndir",
+        data=report.metrics.to_json(),
+        file_name=f"bist_tarama_olcum_{datetime.now().strftime('%Y%m%d_%H%M')}.json",
+        mime="application/json"
+    )
+
+# ── AL LİSTESİ TABLOSU ───────────────────────────────────────────────────
+st.subheader(f"🚀 AL Listesi ({min_score}+ Puan, Toplam: {len(df_al)} Hisse)")
+
+if df_al.empty:
+    st.warning("Hiç hisse eşiği geçemedi. Skoru düşürmeyi deneyin.")
+else:
+    display_cols = shown_columns(df_al, AL_COLUMNS)
+    paged_table(df_al, display_cols, "al")
+    export_buttons(snap.id, "AL Listesi", "bist_al_listesi", display_cols, min_score)
+
+# ── TÜM SONUÇLAR TABLOSU ─────────────────────────────────────────────────
+st.subheader("📊 Tüm Tarama Sonuçları")
+if show_eliminated:
+    df_show = df_all
+else:
+    df_show = df_all[df_all["Elendi"].isna()]
+
+display_cols2 = [
+    "Ticker", "Fiyat", "Toplam Skor", "Temel Skor", "Teknik Skor",
+    "RSI", "MACD Sinyal", "ATR%", "Hacim OK", "MA50 Üzeri", "MA200 Üzeri",
+    "Haftalık Onay", "Haftalık Trend", "Elendi"
+]
+display_cols2 = shown_columns(df_show, display_cols2)
+paged_table(df_show, display_cols2, "all")
+export_buttons(snap.id, "Tüm Sonuçlar", "bist_tarama")
+
+# ── HİSSE DETAYI ─────────────────────────────────────────────────────────
+# Grafik yalnızca hisse seçilince, yerel depodaki barlardan kurulur (indirme yok)
+st.subheader("🔎 Hisse Detayı")
+dcol1, dcol2 = st.columns([2, 3])
+detail_ticker = dcol1.selectbox("Hisse", df_show["Ticker"].astype(str).tolist(), index=None,
+                                placeholder="Grafik için hisse seçin")
+history_label = dcol2.radio("Geçmiş", list(HISTORY), horizontal=True,
+                            help="Tarama penceresinde indikatörlerin son değerleri "
+                                 "tablodakiyle aynıdır")
+if detail_ticker:
+    fig = ticker_figure(snap.id, detail_ticker, snap.created_at, HISTORY[history_label])
+    if fig is None:
+        st.warning(f"{detail_ticker} için yerel depoda bar yok.")
+    else:
+        st.plotly_chart(fig, use_container_width=True)
+
+# ── SKOR DAĞILIM GRAFİĞİ ─────────────────────────────────────────────────
+st.subheader("📉 Skor Dağılımı")
+df_chart = df_all[df_all["Elendi"].isna()].head(40)
+if not df_chart.empty:
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=df_chart["Ticker"],
+        y=df_chart["Temel Skor"],
+        name="Temel Analiz",
+        marker_color="#4A90D9"
+    ))
+    fig.add_trace(go.Bar(
+        x=df_chart["Ticker"],
+        y=df_chart["Teknik Skor"],
+        name="Teknik Analiz",
+        marker_color="#F4A83A"
+    ))
+    if df_chart["Haftalık Onay"].notna().any():
+        fig.add_trace(go.Bar(
+            x=df_chart["Ticker"],
+            y=df_chart["Haftalık Onay"],
+            name="Haftalık Onay",
+            marker_color="#2d9e5f"
+        ))
+    fig.add_hline(y=min_score, line_dash="dash", line_color="red",
+                  annotation_text=f"AL Eşiği ({min_score})")
+    fig.update_layout(
+        barmode="stack",
+        title="Hisse Başına Temel + Teknik Skor (İlk 40)",
+        xaxis_tickangle=-45,
+        plot_bgcolor="#0E1117",
+        paper_bgcolor="#0E1117",
+        font_color="white",
+        height=450
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+# ── EN İYİ 5 HİSSE DETAY KARTI ───────────────────────────────────────────
+if not df_al.empty:
+    st.subheader("🏆 En İyi 5 Hisse – Detay Kartları")
+    top_cards(df_al)
+
+# ── TARAMA KARŞILAŞTIRMA ─────────────────────────────────────────────────────
+# Yalnızca aynı zaman dilimi ayarıyla taranmış görüntüler (skor ölçeği aynı)
+modes = dict(zip(snapshot_list["id"], snapshot_list["timeframes"]))
+others = [sid for sid in labels if sid != snap.id]
+comparable = [sid for sid in others if modes[sid] == snap.report.timeframes]
+if others:
+    with st.expander("🔀 Başka Bir Taramayla Karşılaştır (skor farkları)"):
+        if not comparable:
+            st.caption(f"Karşılaştırılabilir tarama yok: skorlar yalnızca aynı zaman dilimi "
+                       f"ayarıyla ({TIMEFRAME_LABELS[snap.report.timeframes]}) yapılmış "
+                       f"taramalarla karşılaştırılır.")
+        else:
+            # Varsayılan: görüntülenenden bir önceki tarama
+            older = [sid for sid in comparable if sid < snap.id]
+            base_label = st.selectbox("Karşılaştırılan tarama",
+                                      [labels[sid] for sid in comparable],
+                                      index=comparable.index(older[0]) if older else 0)
+            base_id = ids_by_label[base_label]
+            diff = diff_scores(load_snapshot(base_id).report.results, df_all)
+            changed = diff[(diff["Δ Skor"].abs() > 0) | (diff["Değişim"] != "")]
+            st.caption(f"{len(changed)} hissede değişiklik ({labels[base_id]} → {snap.label})")
+            st.dataframe(changed.style.format(
+                {c: "{:+.1f}" for c in ("Δ Skor", "Δ Temel", "Δ Teknik")} |
+                {"Önceki Skor": "{:.1f}", "Yeni Skor": "{:.1f}"}, na_rep="-"),
+                use_container_width=True, hide_index=True, height=400)
+
+st.caption(f"Son güncelleme: {snap.created_at.strftime('%d.%m.%Y %H:%M:%S')}")
@@ -0,0 +1,3 @@
+"""
+BIST Swing Trade tarayıcısının Streamlit'ten bağımsız çekirdek modülleri.
+"""
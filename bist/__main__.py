@@ -0,0 +1,5 @@
+import sys
+
+from bist.cli import main
+
+sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Şirket Eylemleri ve Fiyat Düzeltmesi
+====================================
+Yahoo'nun düzeltilmiş serisi (auto_adjust=True) her temettü, bedelsiz ya da
+bölünmede geriye dönük değişir; düzeltilmiş barları saklayan bir depo bu
+yüzden sessizce bayatlar. Depo bunun yerine işlem gördüğü hâliyle ham
+barları ve eylemleri (bölünme / bedelsiz oranı, temettü) ayrı tutar;
+düzeltilmiş seri okunurken yerelde, vektörel türetilir.
+
+Her eylemin bir çarpanı vardır; bir barın düzeltme çarpanı, o bardan SONRAKİ
+tüm eylem çarpanlarının çarpımıdır (son ekli birikimli çarpım + searchsorted):
+
+    bölünme / bedelsiz (oran r):   fiyat × 1/r, hacim × r
+    temettü (D, önceki kapanış C): fiyat × (1 − D/C)   (Yahoo Adj Close ile aynı)
+
+Yahoo'nun auto_adjust=False barları bölünmelere göre yine düzeltilmiştir;
+ham fiyata dönüştürmek için bardan sonraki bölünme oranlarıyla çarpılır
+(to_raw). Yeni bir eylem geldiğinde yalnızca o hissenin çarpanları yeniden
+hesaplanır; ham geçmiş yeniden indirilmez.
+"""
+
+import numpy as np
+import pandas as pd
+
+SPLIT, DIVIDEND = "split", "dividend"
+# yf.download(actions=True) sütunları → eylem türü
+ACTION_COLUMNS = {"Stock Splits": SPLIT, "Dividends": DIVIDEND}
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+
+
+def extract_actions(df: pd.DataFrame) -> pd.DataFrame:
+    """İndirilen barlardaki eylem satırları: (date, kind, value); sıfırlar atılır."""
+    parts = []
+    for col, kind in ACTION_COLUMNS.items():
+        if col not in df:
+            continue
+        s = df[col].dropna()
+        s = s[s != 0]
+        parts.append(pd.DataFrame({"date": s.index, "kind": kind, "value": s.to_numpy(float)}))
+    if not parts:
+        return pd.DataFrame({"date": pd.DatetimeIndex([]), "kind": [], "value": []})
+    return pd.concat(parts, ignore_index=True)
+
+
+def factor_after(dates, event_dates, event_factors) -> np.ndarray:
+    """
+    Her tarih için, o tarihten sonraki (ex-date > tarih) eylem çarpanlarının
+    çarpımı. Eylemler tarih sırasında olmak zorunda değildir.
+    """
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    ev = np.asarray(event_dates, dtype="datetime64[ns]")
+    if not len(ev):
+        return np.ones(len(dates))
+    order = np.argsort(ev, kind="stable")
+    ev = ev[order]
+    f = np.asarray(event_factors, dtype=float)[order]
+    # suffix[k] = f[k] × f[k+1] × ... ; suffix[n] = 1
+    suffix = np.append(np.cumprod(f[::-1])[::-1], 1.0)
+    return suffix[np.searchsorted(ev, dates, side="right")]
+
+
+def to_raw(df: pd.DataFrame, splits: pd.DataFrame) -> pd.DataFrame:
+    """
+    Bölünmeye göre düzeltilmiş barları (auto_adjust=False) işlem gördüğü
+    hâline çevir. splits: bilinen tüm bölünmeler (date, value=oran).
+    """
+    if splits.empty:
+        return df
+    ratio = factor_after(df.index, splits["date"], splits["value"])
+    out = df.copy()
+    out[PRICE_COLUMNS] = df[PRICE_COLUMNS].mul(ratio, axis=0)
+    out["Volume"] = df["Volume"] / ratio
+    return out
+
+
+def dividend_factors(closes: pd.Series, dividends: pd.DataFrame) -> np.ndarray:
+    """
+    Temettü çarpanları 1 − D/C; C, ex-date'ten önceki son ham kapanış.
+    Önceki kapanışı depoda olmayan temettülerin çarpanı NaN (etkileyeceği bar yok).
+    """
+    dates = closes.index.to_numpy(dtype="datetime64[ns]")
+    pos = np.searchsorted(dates, dividends["date"].to_numpy(dtype="datetime64[ns]"),
+                          side="left") - 1
+    prev = np.where(pos >= 0, closes.to_numpy(float)[np.maximum(pos, 0)], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = 1 - dividends["value"].to_numpy(float) / prev
+    # Bozuk kayıtlar (temettü ≥ kapanış) seriyi sıfırlamasın
+    return np.where((f > 0) & (f <= 1), f, np.nan)
+
+
+def adjust(raw: pd.DataFrame, actions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ham barlardan düzeltilmiş barlar (auto_adjust=True karşılığı).
+    actions: (date, kind, value, factor); factor NaN olanlar atlanır.
+    """
+    if actions.empty:
+        return raw
+    act = actions[actions["factor"].notna()]
+    dates = raw.index
+    price = factor_after(dates, act["date"], act["factor"])
+    splits = act[act["kind"] == SPLIT]
+    volume = factor_after(dates, splits["date"], splits["value"])
+    out = raw.copy()
+    out[PRICE_COLUMNS] = raw[PRICE_COLUMNS].mul(price, axis=0)
+    out["Volume"] = raw["Volume"] * volume
+    return out
@@ -0,0 +1,242 @@
+"""
+Swing Skoru Geriye Dönük Testi
+==============================
+score_ticker'daki puanlamanın aynısını (bist.panel tabloları) her tarih ve her
+hisse için tek vektörel geçişte hesaplar; ileri 5/10/21 günlük getirileri skor
+kovalarına göre raporlar (ortalama, medyan, isabet oranı) ve AL listesinin
+devir hızını ölçer.
+
+Temel veriler geçmişe dönük (point-in-time) bilinmediği için nötr puanlanır:
+PD/DD 5, F/K 5, Kar Büyümesi 3 – score_ticker'ın "veri yok" davranışı.
+
+Komut satırı:
+    python -m bist.backtest --period 2y --threshold 70 -o backtest.json
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from bist.data import period_start
+from bist.panel import (MIN_BARS, PB_SECTOR_FALLBACK, PE_SECTOR_FALLBACK,
+                        TEKNIK_CAP, TEMEL_CAP, Panel, build_panel,
+                        compute_indicators, fundamental_scores,
+                        technical_scores, trend_filter)
+
+HORIZONS = (5, 10, 21)
+# Elenmeyen hisseler için skor kovaları [alt, üst)
+SCORE_BUCKETS = ((0, 50, "<50"), (50, 60, "50-59"), (60, 70, "60-69"),
+                 (70, 80, "70-79"), (80, 101, "80+"))
+ELIMINATED = "Elendi"
+# MA200 ısınması: değerlendirme penceresinden önce indirilecek ek geçmiş
+WARMUP_PERIOD = "1y"
+
+
+@dataclass
+class BacktestReport:
+    scores: pd.DataFrame        # (tarih × hisse) toplam skor; NaN = değerlendirilmedi
+    eliminated: pd.DataFrame    # (tarih × hisse) trend filtresine takıldı mı
+    buckets: pd.DataFrame       # kova × (gözlem, ort./medyan getiri, isabet) – her ufuk
+    threshold: pd.DataFrame     # AL sinyali vs tüm evren – her ufuk
+    turnover: dict              # AL listesi büyüklüğü, giriş sayısı, devir, elde tutma
+
+
+def history_components(panel: Panel, ind: dict | None = None) -> dict:
+    """
+    Her (bar, hisse) için skor ve eleme matrisleri (bar hizalı panel üzerinde).
+    Dönüş: {"score", "eliminated", "valid"} numpy dizileri.
+    """
+    ind = ind or compute_indicators(panel)
+    arr = {k: v.to_numpy() for k, v in ind.items()}
+    for k in ("macd", "signal", "hist"):
+        arr[f"{k}_prev"] = ind[k].shift(1).to_numpy()
+
+    above_ma50, above_ma200 = trend_filter(arr["price"], arr["ma50"], arr["ma200"])
+    tech = technical_scores(**arr)
+    fund = fundamental_scores(np.nan, np.nan, np.nan, np.nan,
+                              PB_SECTOR_FALLBACK, PE_SECTOR_FALLBACK)
+    score = np.minimum(fund["temel"], TEMEL_CAP) + np.minimum(tech["teknik"], TEKNIK_CAP)
+
+    eliminated = ~(above_ma50 & above_ma200)
+    # score_ticker < 60 barda sonuç vermez
+    valid = panel.close.notna().cumsum().to_numpy() >= MIN_BARS
+    score = np.where(eliminated, 0, score).astype(float)
+    score[~valid] = np.nan
+    return {"score": score, "eliminated": eliminated & valid, "valid": valid}
+
+
+def forward_returns(panel: Panel, horizons=HORIZONS) -> dict:
+    """{h: h işlem günü sonraki kapanışa göre getiri} (bar hizalı)."""
+    close = panel.close
+    return {h: (close.shift(-h) / close - 1).to_numpy() for h in horizons}
+
+
+def to_calendar(panel: Panel, values: np.ndarray) -> pd.DataFrame:
+    """Bar hizalı (bar × hisse) değerleri (tarih × hisse) takvimine taşı."""
+    dates = panel.dates.to_numpy()
+    calendar = pd.DatetimeIndex(np.unique(dates[~pd.isna(dates)]))
+    out = np.full((len(calendar), values.shape[1]), np.nan)
+    for j in range(values.shape[1]):
+        mask = ~pd.isna(dates[:, j])
+        out[calendar.get_indexer(dates[mask, j]), j] = values[mask, j]
+    return pd.DataFrame(out, index=calendar, columns=panel.tickers)
+
+
+def _bucket_labels(score: np.ndarray, eliminated: np.ndarray) -> np.ndarray:
+    labels = np.full(score.shape, "", dtype=object)
+    for lo, hi, name in SCORE_BUCKETS:
+        labels[(score >= lo) & (score < hi)] = name
+    labels[eliminated] = ELIMINATED
+    return labels
+
+
+def _return_stats(rets: np.ndarray) -> dict:
+    rets = rets[~np.isnan(rets)]
+    if not len(rets):
+        return {"n": 0, "mean": np.nan, "median": np.nan, "hit": np.nan}
+    return {"n": len(rets), "mean": rets.mean(), "median": np.median(rets),
+            "hit": (rets > 0).mean()}
+
+
+def summarize(comp: dict, fwd: dict, threshold: float) -> tuple:
+    """Kova tablosu ve eşik özet tablosu."""
+    labels = _bucket_labels(comp["score"], comp["eliminated"])
+    order = [ELIMINATED] + [name for *_, name in SCORE_BUCKETS]
+
+    rows = {}
+    for name in order:
+        sel = labels == name
+        row = {"Gözlem": int(sel.sum())}
+        for h, ret in fwd.items():
+            st = _return_stats(ret[sel])
+            row[f"Ort. {h}g %"] = st["mean"] * 100
+            row[f"Medyan {h}g %"] = st["median"] * 100
+            row[f"İsabet {h}g %"] = st["hit"] * 100
+        rows[name] = row
+    buckets = pd.DataFrame.from_dict(rows, orient="index")
+
+    al = comp["valid"] & ~comp["eliminated"] & (comp["score"] >= threshold)
+    thr_rows = {}
+    for h, ret in fwd.items():
+        sig, base = _return_stats(ret[al]), _return_stats(ret[comp["valid"]])
+        thr_rows[f"{h}g"] = {
+            "AL Sinyali": sig["n"],
+            "AL Ort. %": sig["mean"] * 100,
+            "AL İsabet %": sig["hit"] * 100,
+            "Evren Ort. %": base["mean"] * 100,
+            "Evren İsabet %": base["hit"] * 100,
+            "Fazla Getiri %": (sig["mean"] - base["mean"]) * 100,
+        }
+    return buckets, pd.DataFrame.from_dict(thr_rows, orient="index")
+
+
+def turnover_stats(al: pd.DataFrame) -> dict:
+    """AL listesi (tarih × hisse, bool) için günlük devir ve elde tutma süresi."""
+    al = al.fillna(False).astype(bool)
+    size = al.sum(axis=1)
+    entries = (al & ~al.shift(1, fill_value=False)).sum(axis=1).iloc[1:]
+    active = size.iloc[1:] > 0
+    daily = (entries[active] / size.iloc[1:][active]).mean() if active.any() else np.nan
+    total_entries = int(entries.sum())
+    return {
+        "Ort. Liste Büyüklüğü": float(size.mean()),
+        "Günlük Ort. Giriş": float(entries.mean()) if len(entries) else 0.0,
+        "Günlük Devir %": float(daily * 100),
+        "Ort. Elde Tutma (gün)": float(al.to_numpy().sum() / total_entries)
+                                 if total_entries else np.nan,
+    }
+
+
+def run_backtest(frames: dict, threshold: float = 70, horizons=HORIZONS,
+                 start: pd.Timestamp | None = None) -> BacktestReport:
+    """
+    {ticker: OHLCV} geçmişi üzerinde skoru her tarihte hesapla ve raporla.
+    start verilirse yalnızca o tarihten sonraki sinyaller değerlendirilir
+    (öncesi indikatör ısınması için kullanılır).
+    """
+    panel = build_panel(frames, align="bars")
+    comp = history_components(panel)
+    fwd = forward_returns(panel, horizons)
+
+    if start is not None:
+        in_window = (panel.dates >= pd.Timestamp(start)).to_numpy()
+        comp["valid"] &= in_window
+        comp["eliminated"] &= in_window
+        comp["score"] = np.where(in_window, comp["score"], np.nan)
+
+    buckets, thr = summarize(comp, fwd, threshold)
+    scores = to_calendar(panel, comp["score"])
+    eliminated = to_calendar(panel, comp["eliminated"].astype(float)) == 1
+    al = (scores >= threshold) & ~eliminated
+    if start is not None:
+        # Isınma günleri boş AL listesi sayılıp ortalamaları düşürmesin
+        al = al.loc[al.index >= pd.Timestamp(start)]
+    return BacktestReport(scores, eliminated, buckets, thr, turnover_stats(al))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# KOMUT SATIRI
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _add_period(a: str, b: str) -> str:
+    """'2y' + '1y' → '3y' (aynı birimde)."""
+    unit = "".join(ch for ch in a if not ch.isdigit())
+    if unit != "".join(ch for ch in b if not ch.isdigit()):
+        raise ValueError(f"Periyot birimleri uyuşmuyor: {a}, {b}")
+    return f"{int(a[:-len(unit)]) + int(b[:-len(unit)])}{unit}"
+
+
+def main(argv: list | None = None) -> int:
+    from bist.store import OHLCVStore
+    from bist.universe import BIST_TICKERS, build_scan_list
+
+    p = argparse.ArgumentParser(prog="python -m bist.backtest",
+                                description="Swing skoru geriye dönük testi")
+    p.add_argument("--period", default="2y", help="Değerlendirme penceresi (ör. 2y)")
+    p.add_argument("--threshold", type=float, default=70, help="AL eşiği")
+    p.add_argument("--max-tickers", type=int, default=len(BIST_TICKERS))
+    p.add_argument("--extra", default="", help="Ek hisseler, virgülle ayrılmış")
+    p.add_argument("--offline", action="store_true",
+                   help="İndirme yapma, yalnızca yerel depoyu kullan")
+    p.add_argument("--output", "-o", default=None,
+                   help="Kova ve eşik tablolarını JSON olarak yaz")
+    args = p.parse_args(argv)
+
+    tickers = build_scan_list(args.max_tickers, args.extra.split(","))
+    total = _add_period(args.period, WARMUP_PERIOD)
+    store = OHLCVStore()
+    frames = (store.read_many(tickers, period_start(total)) if args.offline
+              else store.update(tickers, period=total))
+    if not frames:
+        print("Fiyat verisi bulunamadı.", file=sys.stderr)
+        return 1
+
+    t0 = time.perf_counter()
+    report = run_backtest(frames, args.threshold, start=period_start(args.period))
+    elapsed = time.perf_counter() - t0
+
+    with pd.option_context("display.width", 200, "display.max_columns", 30,
+                           "display.float_format", "{:.2f}".format):
+        print(report.buckets)
+        print()
+        print(report.threshold)
+    print()
+    for k, v in report.turnover.items():
+        print(f"{k}: {v:.2f}")
+    print(f"\n{len(frames)} hisse, {elapsed:.2f} sn", file=sys.stderr)
+
+    if args.output:
+        pd.Series({
+            "buckets": report.buckets.reset_index(names="Kova").to_dict("records"),
+            "threshold": report.threshold.reset_index(names="Ufuk").to_dict("records"),
+            "turnover": report.turnover,
+        }).to_json(args.output, force_ascii=False, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Çevrimdışı Performans Ölçümü
+============================
+yf.download / yf.Ticker().info yerine deterministik sahte sağlayıcı
+(bist.fake.FakeProvider) kullanarak ağ olmadan ölçüm yapar:
+
+- score_ticker:        hisse başı referans puanlama (fiyat ve .info hazır)
+- build_sector_stats:  n hissenin .info'su önbelleğe yazılırken sektör toplamları
+- scan_cold:           boş depo + boş önbellekle tam run_scan
+- scan_warm:           aynı depo/önbellekle ikinci run_scan (ağ yok)
+- indicators_serial:   hizalı panelde latest_values (tek süreç)
+- indicators_process:  aynı panel, paylaşımlı bellekle --jobs işçi süreç;
+                       hızlanma (serial / process) çekirdek sayısıyla raporlanır
+
+Her ölçüm süre, verim (hisse/sn) ve tepe bellek (tracemalloc, ayrı geçişte)
+içerir; sonuçlar commit, tarih ve parametrelerle JSON satırları olarak
+eklenir, böylece commit'ler arası karşılaştırılabilir.
+
+Komut satırı:
+    python -m bist.bench --sizes 50 500 5000 --latency 0.01 --error-rate 0.02
+    python -m bist.bench --compare
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from bist.config import data_path
+from bist.fake import FakeProvider
+from bist.fetcher import FetchPool
+from bist.fundamentals import FundamentalsCache
+from bist.panel import build_panel, latest_values
+from bist.parallel import parallel_latest
+from bist.registry import SymbolRegistry
+from bist.scanner import build_sector_stats, run_scan, score_ticker
+from bist.state import IndicatorStateStore
+from bist.store import OHLCVStore
+
+DEFAULT_SIZES = (50, 500, 5000)
+DEFAULT_OUTPUT = "bench.jsonl"
+# Sahte sağlayıcıda istek bütçesi ölçümü domine etmesin
+BENCH_RATE = 1000.0
+CASES = ("score_ticker", "build_sector_stats", "scan_cold", "scan_warm",
+         "indicators_serial", "indicators_process")
+
+
+def fake_tickers(n: int) -> list:
+    return [f"FK{i:04d}.IS" for i in range(n)]
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, cwd=Path(__file__).resolve().parent, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ÖLÇÜM DURUMLARI
+# Her durum (hazırlık, ölçülen iş) döndürür; hazırlık süreye katılmaz.
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _case(name: str, tickers: list, provider: FakeProvider, workdir: Path, workers: int,
+          jobs: int | None = None):
+    store_path, info_path = workdir / "ohlcv.sqlite", workdir / "fundamentals.sqlite"
+
+    def caches():
+        return (OHLCVStore(store_path),
+                FundamentalsCache(info_path, fetcher=provider.info))
+
+    if name == "score_ticker":
+        raws = {t: provider.history(t, 260) for t in tickers}
+        _, fundamentals = caches()
+        fundamentals.fill(tickers, FetchPool(rate=BENCH_RATE, max_workers=workers))
+        return lambda: [score_ticker(t, {}, raws[t].copy(), fundamentals) for t in tickers]
+
+    if name == "build_sector_stats":
+        # Hata enjeksiyonsuz, aynı tohumlu sağlayıcıdan (hazırlık ölçülmez)
+        infos = {t: FakeProvider(seed=provider.seed).info(t) for t in tickers}
+        _, fundamentals = caches()
+        # Taramadaki gibi parça parça gelen .info'larla akışkan güncelleme
+        return lambda: ([fundamentals.put_many(dict(list(infos.items())[i:i + 50]))
+                         for i in range(0, len(tickers), 50)],
+                        build_sector_stats(fundamentals))
+
+    if name in ("indicators_serial", "indicators_process"):
+        panel = build_panel({t: provider.history(t) for t in tickers})
+        if name == "indicators_serial":
+            return lambda: latest_values(panel)
+        return lambda: parallel_latest(panel, jobs)
+
+    # Sahte seriler önceden üretilir; ölçülen süre yalnızca taramanındır
+    for t in tickers:
+        provider.history(t)
+
+    def scan():
+        store, fundamentals = caches()
+        return run_scan(tickers, rate=BENCH_RATE, workers=workers, store=store,
+                        fundamentals=fundamentals, provider=provider,
+                        indicator_state=IndicatorStateStore(workdir / "indicator_state.sqlite"),
+                        registry=SymbolRegistry(workdir / "symbols.sqlite"))
+
+    if name == "scan_cold":
+        return scan
+    if name == "scan_warm":
+        scan()
+        return scan
+    raise ValueError(f"Bilinmeyen ölçüm: {name}")
+
+
+def measure(name: str, n: int, provider_args: dict, workers: int = 8,
+            memory: bool = True, jobs: int | None = None) -> dict:
+    """Tek ölçüm: süre + verim; memory=True ise ayrı geçişte tepe bellek."""
+    tickers = fake_tickers(n)
+
+    def run(trace: bool):
+        with tempfile.TemporaryDirectory() as tmp:
+            provider = FakeProvider(**provider_args)
+            job = _case(name, tickers, provider, Path(tmp), workers, jobs)
+            if trace:
+                tracemalloc.start()
+            t0 = time.perf_counter()
+            try:
+                job()
+                elapsed = time.perf_counter() - t0
+                peak = tracemalloc.get_traced_memory()[1] if trace else None
+            finally:
+                if trace:
+                    tracemalloc.stop()
+            return elapsed, peak, dict(provider.calls)
+
+    elapsed, _, calls = run(False)
+    peak = run(True)[1] if memory else None
+    return {
+        "case": name,
+        "n": n,
+        "seconds": round(elapsed, 4),
+        "tickers_per_s": round(n / elapsed, 1) if elapsed else None,
+        "peak_mb": round(peak / 2**20, 1) if peak is not None else None,
+        "provider_calls": calls,
+    }
+
+
+def run_bench(sizes=DEFAULT_SIZES, cases=CASES, provider_args: dict | None = None,
+              workers: int = 8, memory: bool = True, jobs: int | None = None,
+              log=print) -> list:
+    provider_args = provider_args or {}
+    jobs = jobs or os.cpu_count() or 1
+    meta = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "provider": provider_args,
+        "workers": workers,
+        "jobs": jobs,
+        "cores": os.cpu_count(),
+    }
+    results = []
+    for n in sizes:
+        by_case = {}
+        for name in cases:
+            res = {**meta, **measure(name, n, provider_args, workers, memory, jobs)}
+            log(f"{name:<20} n={n:<6} {res['seconds']:>9.3f} sn  "
+                f"{res['tickers_per_s'] or 0:>9.1f} hisse/sn  "
+                f"{res['peak_mb'] if res['peak_mb'] is not None else '-':>7} MB")
+            results.append(res)
+            by_case[name] = res
+        serial, process = by_case.get("indicators_serial"), by_case.get("indicators_process")
+        if serial and process and process["seconds"]:
+            process["speedup"] = round(serial["seconds"] / process["seconds"], 2)
+            log(f"{'':<20} n={n:<6} hızlanma x{process['speedup']:.2f} "
+                f"({jobs} süreç, {meta['cores']} çekirdek)")
+    return results
+
+
+def append_results(results: list, path: str | Path) -> None:
+    with open(path, "a", encoding="utf-8") as fh:
+        for res in results:
+            fh.write(json.dumps(res, ensure_ascii=False) + "\n")
+
+
+def load_results(path: str | Path) -> pd.DataFrame:
+    path = Path(path)
+    if not path.exists():
+        return pd.DataFrame()
+    return pd.DataFrame([json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()
+                         if line.strip()])
+
+
+def compare(df: pd.DataFrame, metric: str = "seconds") -> pd.DataFrame:
+    """
+    (profil, ölçüm, n) × commit tablosu; her commit için son çalıştırma alınır.
+    Profil: sağlayıcı ayarları + iş parçacığı / süreç sayısı (yalnızca aynı
+    koşullar karşılaştırılır).
+    """
+    if df.empty:
+        return df
+    jobs = df["jobs"] if "jobs" in df else pd.Series(np.nan, index=df.index)
+    profile = [" ".join(f"{k}={v}" for k, v in sorted(p.items())) + f" workers={w}"
+               + (f" jobs={int(j)}" if pd.notna(j) else "")
+               for p, w, j in zip(df["provider"], df["workers"], jobs)]
+    df = df.assign(commit=df["commit"].fillna("?"), profile=profile)
+    last = df.sort_values("timestamp").groupby(["profile", "case", "n", "commit"]).last()
+    order = list(dict.fromkeys(df.sort_values("timestamp")["commit"]))
+    return last[metric].unstack("commit").reindex(columns=order)
+
+
+def main(argv: list | None = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m bist.bench",
+                                description="Ağsız, deterministik performans ölçümü")
+    p.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    p.add_argument("--cases", nargs="+", default=list(CASES), choices=CASES)
+    p.add_argument("--latency", type=float, default=0.0, help="Çağrı başı gecikme (sn)")
+    p.add_argument("--error-rate", type=float, default=0.0, help="Geçici hata olasılığı")
+    p.add_argument("--throttle-rate", type=float, default=0.0, help="429 olasılığı")
+    p.add_argument("--workers", type=int, default=8)
+    p.add_argument("--jobs", type=int, default=None,
+                   help="indicators_process için işçi süreç (varsayılan: çekirdek sayısı)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--no-memory", action="store_true", help="Bellek geçişini atla")
+    p.add_argument("--output", "-o", default=None,
+                   help=f"Sonuçların ekleneceği JSONL (varsayılan: veri dizini/{DEFAULT_OUTPUT})")
+    p.add_argument("--compare", action="store_true",
+                   help="Ölçüm yapmadan kayıtlı sonuçları commit'lere göre karşılaştır")
+    args = p.parse_args(argv)
+    output = args.output or data_path(DEFAULT_OUTPUT)
+
+    if not args.compare:
+        results = run_bench(args.sizes, args.cases, {
+            "latency": args.latency, "error_rate": args.error_rate,
+            "throttle_rate": args.throttle_rate, "seed": args.seed,
+        }, args.workers, memory=not args.no_memory, jobs=args.jobs)
+        append_results(results, output)
+
+    with pd.option_context("display.width", 200, "display.float_format", "{:.3f}".format):
+        print(compare(load_results(output)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
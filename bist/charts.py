@@ -0,0 +1,154 @@
+"""
+Hisse Detay Grafikleri
+======================
+Seçilen hisse için mum grafiği + MA50/MA200, RSI, MACD histogramı ve ATR%.
+Barlar yerel depodan okunur (ağ erişimi yok) ve anlık görüntünün tarihinde
+kesilir; indikatörler taramadaki fonksiyonlarla hesaplandığından tarama
+penceresinde son değerler sonuç tablosuyla aynıdır.
+
+Uzun geçmişler LTTB (Largest-Triangle-Three-Buckets) ile seyreltilir: her
+seri kendi şeklini koruyan en çok MAX_POINTS noktaya indirilir. Mumlar seçilen
+barlar arasındaki aralıklarda birleştirilir (ilk açılış, en yüksek, en düşük,
+seçili barın kapanışı), böylece tepe ve dipler kaybolmaz.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from bist.data import period_start
+from bist.indicators import calculate_atr, calculate_macd, calculate_rsi
+from bist.panel import PRICE_FIELDS
+
+MAX_POINTS = 400
+# Grafik geçmişi → depo periyodu (None = depodaki tüm barlar)
+HISTORY = {"Tarama Penceresi (1 Yıl)": "1y", "3 Yıl": "3y", "Tüm Depo": None}
+
+_BG = "#0E1117"
+
+
+def lttb(y, n_out: int, x=None) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: serinin görsel şeklini koruyan en çok
+    n_out noktanın sıralı indeksleri. NaN noktalar atlanır.
+    """
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if n_out >= n or n_out < 3:
+        return valid
+    xs = valid.astype(float) if x is None else np.asarray(x, dtype=float)[valid]
+    ys = y[valid]
+
+    # İlk ve son nokta sabit; aradaki n-2 nokta n_out-2 kovaya bölünür
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = xs[nlo:nhi].mean(), ys[nlo:nhi].mean()
+        area = np.abs((xs[a] - avg_x) * (ys[lo:hi] - ys[a])
+                      - (xs[a] - xs[lo:hi]) * (avg_y - ys[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return valid[out]
+
+
+def downsample_ohlc(bars: pd.DataFrame, idx: np.ndarray) -> pd.DataFrame:
+    """Barları seçili indekslerde biten aralıklara birleştir (OHLCV)."""
+    if len(idx) == len(bars):
+        return bars
+    segment = np.searchsorted(idx, np.arange(len(bars)))
+    g = bars.groupby(segment, sort=True)
+    out = pd.DataFrame({
+        "Open":   g["Open"].first(),
+        "High":   g["High"].max(),
+        "Low":    g["Low"].min(),
+        "Close":  bars["Close"].to_numpy()[idx],
+        "Volume": g["Volume"].sum(),
+    })
+    out.index = bars.index[idx]
+    return out
+
+
+def load_bars(store, ticker: str, as_of: pd.Timestamp,
+              period: str | None = "1y") -> pd.DataFrame | None:
+    """
+    Hissenin `as_of` gününe kadarki barları (depodan, ağ erişimi yok).
+    Eksik alanlı barlar taramadaki gibi atılır; eksik açılış kapanışla doldurulur.
+    """
+    as_of = pd.Timestamp(as_of).normalize()
+    start = period_start(period, as_of) if period else None
+    raw = store.read(ticker, start)
+    if raw is None:
+        return None
+    bars = raw.loc[:as_of].dropna(subset=PRICE_FIELDS)
+    if bars.empty:
+        return None
+    return bars.assign(Open=bars["Open"].fillna(bars["Close"]))
+
+
+def indicator_series(bars: pd.DataFrame) -> pd.DataFrame:
+    """Taramadaki indikatör fonksiyonlarıyla (tarih,) serileri."""
+    close = bars["Close"]
+    _, _, hist = calculate_macd(close)
+    return pd.DataFrame({
+        "ma50":  close.rolling(50).mean(),
+        "ma200": close.rolling(200).mean(),
+        "rsi":   calculate_rsi(close, 14),
+        "hist":  hist,
+        "atr_pct": calculate_atr(bars["High"], bars["Low"], close, 14) / close * 100,
+    }, index=bars.index)
+
+
+def _sampled(s: pd.Series, max_points: int) -> pd.Series:
+    return s.iloc[lttb(s.to_numpy(), max_points)]
+
+
+def detail_figure(bars: pd.DataFrame, title: str = "",
+                  max_points: int = MAX_POINTS) -> go.Figure:
+    """Mum + MA50/MA200, RSI, MACD histogramı ve ATR% alt grafikleri."""
+    ind = indicator_series(bars)
+    candles = downsample_ohlc(bars, lttb(bars["Close"].to_numpy(), max_points))
+
+    fig = make_subplots(rows=4, cols=1, shared_xaxes=True, vertical_spacing=0.03,
+                        row_heights=[0.52, 0.16, 0.16, 0.16],
+                        subplot_titles=(title, "RSI (14)", "MACD Histogram", "ATR %"))
+    fig.add_trace(go.Candlestick(
+        x=candles.index, open=candles["Open"], high=candles["High"],
+        low=candles["Low"], close=candles["Close"], name="Fiyat"), row=1, col=1)
+    for col, name, color in (("ma50", "MA50", "#F4A83A"), ("ma200", "MA200", "#4A90D9")):
+        s = _sampled(ind[col], max_points)
+        fig.add_trace(go.Scatter(x=s.index, y=s, name=name, mode="lines",
+                                 line=dict(color=color, width=1.5)), row=1, col=1)
+
+    rsi = _sampled(ind["rsi"], max_points)
+    fig.add_trace(go.Scatter(x=rsi.index, y=rsi, name="RSI", mode="lines",
+                             line=dict(color="#B37FEB", width=1.2)), row=2, col=1)
+    for level in (30, 70):
+        fig.add_hline(y=level, line_dash="dot", line_color="gray", row=2, col=1)
+
+    hist = _sampled(ind["hist"], max_points)
+    fig.add_trace(go.Bar(x=hist.index, y=hist, name="MACD Hist.",
+                         marker_color=np.where(hist >= 0, "#2d9e5f", "#d9534f")),
+                  row=3, col=1)
+
+    atr = _sampled(ind["atr_pct"], max_points)
+    fig.add_trace(go.Scatter(x=atr.index, y=atr, name="ATR%", mode="lines",
+                             line=dict(color="#5BC0DE", width=1.2)), row=4, col=1)
+
+    fig.update_xaxes(rangebreaks=[dict(bounds=["sat", "mon"])])
+    fig.update_layout(
+        xaxis_rangeslider_visible=False,
+        showlegend=True,
+        legend=dict(orientation="h", y=1.04),
+        plot_bgcolor=_BG,
+        paper_bgcolor=_BG,
+        font_color="white",
+        height=800,
+        margin=dict(t=60, b=20),
+    )
+    return fig
@@ -0,0 +1,147 @@
+"""
+Tarama Kontrol Noktaları
+========================
+Uzun bir tarama (300–500 hisse) tarayıcı yenilemesi, widget değişikliği ya
+da süreç yeniden başlaması ile yarıda kesilebilir. Kontrol noktası, taramanın
+ağ aşamalarında hisse bazında ilerlemeyi SQLite'a (DATA_DIR/checkpoints.sqlite)
+yazar; aynı parametreler ve aynı işlem günüyle yeniden başlatılan tarama
+tamamlanmış hisseleri atlayıp yalnızca kalanları işler.
+
+- Fiyat: depoya parça parça yazılan barlar; kontrol noktası hangi hisselerin
+  bu koşuda tamamlandığını (ok / veri yok) tutar. Kısıtlanan ya da hata alan
+  hisseler tamamlanmış sayılmaz, yeniden denenir.
+- Temel veri: .info'lar önbelleğe parça parça yazılır (FundamentalsCache).
+- Puanlama tüm evren için tek vektörel geçiştir (saniyeler); hisse bazında
+  kontrol noktası gerekmez.
+
+Sıkıştırma (compact): sonuç anlık görüntü olarak yazılır, kontrol noktası
+kayıtları silinir.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import closing
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from bist.config import ISTANBUL, data_path
+
+DEFAULT_DB = "checkpoints.sqlite"
+# Sonucu değiştirmeyen parametreler koşu anahtarına girmez
+RUNTIME_PARAMS = ("rate", "workers", "backend", "jobs")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    key          TEXT PRIMARY KEY,
+    params       TEXT NOT NULL,
+    trading_date TEXT NOT NULL,
+    started_at   REAL NOT NULL,
+    updated_at   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS done (
+    key    TEXT NOT NULL,
+    phase  TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (key, phase, ticker)
+) WITHOUT ROWID;
+"""
+
+
+def trading_date(now: datetime | None = None) -> date:
+    """İstanbul saatine göre işlem günü (hafta sonu → cuma). Tatiller atlanmaz."""
+    day = (now or datetime.now(ISTANBUL)).astimezone(ISTANBUL).date()
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+def run_key(params: dict, day: date) -> str:
+    """Parametreler (çalışma zamanı ayarları hariç) + işlem günü özeti."""
+    relevant = {k: v for k, v in sorted(params.items()) if k not in RUNTIME_PARAMS}
+    text = json.dumps([relevant, day.isoformat()], ensure_ascii=False, default=str)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+class ScanCheckpoint:
+    """Yarım kalan taramaların kalıcı ilerleme kaydı."""
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else data_path(DEFAULT_DB)
+        with closing(self._connect()) as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def run(self, params: dict, day: date | None = None) -> "ScanRun":
+        """Koşuyu başlat ya da aynı anahtarlı yarım koşuyu sürdür."""
+        day = day or trading_date()
+        key = run_key(params, day)
+        now = time.time()
+        with closing(self._connect()) as con, con:
+            # Önceki işlem günlerinin yarım koşuları artık geçersiz
+            stale = [k for (k,) in con.execute(
+                "SELECT key FROM runs WHERE trading_date < ?", (day.isoformat(),))]
+            con.executemany("DELETE FROM done WHERE key = ?", [(k,) for k in stale])
+            con.executemany("DELETE FROM runs WHERE key = ?", [(k,) for k in stale])
+            resumed = con.execute("SELECT 1 FROM runs WHERE key = ?", (key,)).fetchone()
+            con.execute("INSERT OR IGNORE INTO runs VALUES (?,?,?,?,?)",
+                        (key, json.dumps(params, ensure_ascii=False, default=str),
+                         day.isoformat(), now, now))
+        return ScanRun(self, key, params, day, resumed=bool(resumed))
+
+    def pending(self, params: dict, day: date | None = None) -> dict | None:
+        """Aynı parametrelerle yarım kalmış koşu varsa {"started_at", faz: hisse sayısı}."""
+        key = run_key(params, day or trading_date())
+        with closing(self._connect()) as con:
+            row = con.execute("SELECT started_at FROM runs WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            counts = dict(con.execute(
+                "SELECT phase, COUNT(*) FROM done WHERE key = ? GROUP BY phase", (key,)))
+        return {"started_at": row[0], **counts}
+
+
+class ScanRun:
+    """Tek bir tarama koşusu; run_scan(checkpoint=...) ile kullanılır."""
+
+    def __init__(self, checkpoint: ScanCheckpoint, key: str, params: dict, day: date,
+                 resumed: bool = False):
+        self.checkpoint = checkpoint
+        self.key = key
+        self.params = params
+        self.day = day
+        self.resumed = resumed
+
+    def done(self, phase: str) -> dict:
+        """Fazda tamamlanmış hisseler: {ticker: durum}."""
+        with closing(self.checkpoint._connect()) as con:
+            return dict(con.execute("SELECT ticker, status FROM done WHERE key = ? "
+                                    "AND phase = ?", (self.key, phase)))
+
+    def mark(self, phase: str, outcomes: dict) -> None:
+        """Hisseleri fazda tamamlandı olarak işaretle ({ticker: durum})."""
+        if not outcomes:
+            return
+        with closing(self.checkpoint._connect()) as con, con:
+            con.executemany("INSERT OR REPLACE INTO done VALUES (?,?,?,?)",
+                            [(self.key, phase, t, s) for t, s in outcomes.items()])
+            con.execute("UPDATE runs SET updated_at = ? WHERE key = ?",
+                        (time.time(), self.key))
+
+    def finish(self) -> None:
+        """Koşunun kayıtlarını sil (sonuç anlık görüntüye yazıldıktan sonra)."""
+        with closing(self.checkpoint._connect()) as con, con:
+            con.execute("DELETE FROM done WHERE key = ?", (self.key,))
+            con.execute("DELETE FROM runs WHERE key = ?", (self.key,))
+
+
+def compact(run: ScanRun, report, snapshots, params: dict | None = None):
+    """Sonucu anlık görüntü olarak yaz, ardından kontrol noktasını temizle."""
+    snap = snapshots.save(report, params if params is not None else run.params)
+    run.finish()
+    return snap
@@ -0,0 +1,130 @@
+"""
+Komut Satırı Arayüzü
+====================
+Streamlit olmadan tarama çalıştırır ve sonuçları dosyaya yazar (cron / sunucu).
+
+Örnek:
+    python -m bist --max-tickers 300 --min-score 70 \\
+        --extra "THYAO.IS, EREGL.IS" --output sonuc.parquet
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+
+from bist.fetcher import DEFAULT_RATE, DEFAULT_WORKERS, FetchPool
+from bist.parallel import BACKENDS, SERIAL
+from bist.registry import SymbolRegistry, skipped_table, validate_symbols
+from bist.scanner import ScanReport, run_scan, select_buy_list, write_results
+from bist.store import OHLCVStore
+from bist.timeframes import OFF, TIMEFRAMES
+from bist.universe import BIST_TICKERS, build_scan_list, parse_tickers
+
+
+def add_scan_args(p: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    """Tarama seçenekleri (CLI ve zamanlayıcı ortak)."""
+    p.add_argument("--min-score", type=float, default=70,
+                   help="AL listesi için minimum toplam skor (varsayılan: 70)")
+    p.add_argument("--max-tickers", type=int, default=len(BIST_TICKERS),
+                   help="BIST listesinden taranacak hisse sayısı")
+    p.add_argument("--extra", default="",
+                   help="Ek hisseler, virgülle ayrılmış (ör. 'THYAO.IS, EREGL.IS')")
+    p.add_argument("--offline", action="store_true",
+                   help="İndirme yapma, yalnızca yerel depodaki fiyatları kullan")
+    p.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                   help="Saniyedeki maksimum istek sayısı")
+    p.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                   help="Eşzamanlı istek sayısı")
+    p.add_argument("--fundamentals-ttl", type=float, default=24,
+                   help="Temel veri önbellek süresi (saat)")
+    p.add_argument("--full-recompute", action="store_true",
+                   help="Kalıcı indikatör durumunu kullanma, indikatörleri baştan hesapla")
+    p.add_argument("--backend", choices=BACKENDS, default=SERIAL,
+                   help="İndikatör hesabı: tek süreç (artımlı) ya da çok süreç "
+                        "(paylaşımlı bellek, baştan hesap)")
+    p.add_argument("--jobs", type=int, default=None,
+                   help="Çok süreçte işçi sayısı (varsayılan: çekirdek sayısı)")
+    p.add_argument("--timeframes", choices=TIMEFRAMES, default=OFF,
+                   help="Günlük barlardan haftalık onay (+ aylık trend) puanı "
+                        "(ek indirme yok; varsayılan: kapalı)")
+    p.add_argument("--retry-invalid", action="store_true",
+                   help="Sembol kaydındaki geçersiz / yetersiz veri veren hisseleri de tara")
+    return p
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="python -m bist",
+                                description="BIST swing trade taraması (arayüzsüz)")
+    add_scan_args(p)
+    p.add_argument("--output", "-o", default=None,
+                   help="Çıktı dosyası: .csv, .parquet ya da .json "
+                        "(varsayılan: bist_tarama_YYYYmmdd_HHMM.csv)")
+    p.add_argument("--only-al", action="store_true",
+                   help="Yalnızca AL listesini yaz (varsayılan: tüm sonuçlar)")
+    p.add_argument("--metrics", default=None,
+                   help="Aşama süreleri ve hata sebeplerini JSON dosyasına yaz")
+    return p
+
+
+def scan_params(args: argparse.Namespace) -> dict:
+    """Anlık görüntüye yazılan tarama parametreleri (arayüzle aynı anahtarlar)."""
+    return {
+        "max_tickers": args.max_tickers, "extra": args.extra, "offline": args.offline,
+        "rate": args.rate, "workers": args.workers,
+        "fundamentals_ttl_h": args.fundamentals_ttl, "backend": args.backend,
+        "skip_invalid": not args.retry_invalid, "timeframes": args.timeframes,
+    }
+
+
+def scan_from_args(args: argparse.Namespace, **scan_kwargs) -> ScanReport:
+    """
+    Manuel sembolleri doğrula ve taramayı çalıştır (uyarılar stderr'e).
+    scan_kwargs run_scan'e geçer (ör. checkpoint).
+    """
+    extras = parse_tickers(args.extra)
+    scan_list = build_scan_list(args.max_tickers, extras)
+
+    registry = SymbolRegistry()
+    if extras and not args.retry_invalid:
+        # Manuel semboller tarama öncesi tek toplu istekle doğrulanır
+        invalid = validate_symbols(extras, OHLCVStore(), registry,
+                                   pool=FetchPool(rate=args.rate, max_workers=args.workers),
+                                   offline=args.offline)
+        if invalid:
+            print("⚠️ Geçersiz manuel semboller (taranmayacak):\n"
+                  + skipped_table(invalid).to_string(index=False), file=sys.stderr)
+
+    print(f"🔍 {len(scan_list)} hisse taranıyor...", file=sys.stderr)
+    return run_scan(scan_list, offline=args.offline, rate=args.rate,
+                    workers=args.workers,
+                    fundamentals_ttl=args.fundamentals_ttl * 3600,
+                    incremental=not args.full_recompute,
+                    backend=args.backend, jobs=args.jobs, timeframes=args.timeframes,
+                    registry=registry, skip_invalid=not args.retry_invalid, **scan_kwargs)
+
+
+def main(argv: list | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    output = args.output or f"bist_tarama_{datetime.now().strftime('%Y%m%d_%H%M')}.csv"
+
+    t0 = time.perf_counter()
+    report = scan_from_args(args)
+
+    df_al = select_buy_list(report.results, args.min_score)
+    path = write_results(df_al if args.only_al else report.results, output)
+
+    print(f"✅ Veri alınan: {len(report.results)}  |  AL listesi: {len(df_al)}  |  "
+          f"Hata / veri yok: {report.errors}  |  {time.perf_counter() - t0:.1f} sn",
+          file=sys.stderr)
+    print(report.metrics.phase_summary().to_string(index=False, float_format="{:.2f}".format),
+          file=sys.stderr)
+    if report.skipped:
+        print(f"⏭️ {len(report.skipped)} sembol atlandı (--retry-invalid ile yeniden denenir):\n"
+              + skipped_table(report.skipped).to_string(index=False), file=sys.stderr)
+    if args.metrics:
+        report.metrics.to_json(args.metrics)
+        print(report.metrics.stage_summary().to_string(index=False, float_format="{:.2f}".format),
+              file=sys.stderr)
+    print(path)
+    return 0 if len(report.results) else 1
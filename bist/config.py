@@ -0,0 +1,22 @@
+"""
+Ortak yapılandırma: yerel veri dizini vb.
+"""
+
+import os
+from datetime import timedelta, timezone
+from pathlib import Path
+
+# Yerel önbellek / veri deposu dizini (Streamlit yeniden başlasa da kalıcı)
+DATA_DIR = Path(os.environ.get(
+    "BIST_DATA_DIR", Path(__file__).resolve().parent.parent / "data"
+))
+
+
+def data_path(name: str) -> Path:
+    """DATA_DIR altında bir dosya yolu döndür (dizin yoksa oluştur)."""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    return DATA_DIR / name
+
+
+# Borsa İstanbul saati: Türkiye 2016'dan beri yaz saati uygulamıyor, TSİ = UTC+3
+ISTANBUL = timezone(timedelta(hours=3), "TSİ")
@@ -0,0 +1,160 @@
+"""
+Fiyat Verisi İndirme
+====================
+Tüm tarama listesini birkaç toplu (çoklu sembol) yf.download isteğiyle çeker
+ve sonucu hisse başına OHLCV DataFrame'lerine ayırır. Böylece tarama süresi
+hisse sayısıyla değil, parça (chunk) sayısıyla ölçeklenir.
+
+İstekler bist.fetcher.FetchPool üzerinden gider: ortak istek bütçesi,
+kısıtlamada geri çekilme ve hisse bazında "veri yok" / "kısıtlandı" ayrımı.
+"""
+
+import threading
+from typing import Callable, Iterable
+
+import pandas as pd
+import yfinance as yf
+
+from bist.fetcher import OK, THROTTLED, FetchPool, ThrottledError, classify_message
+
+# Tek istekte indirilecek sembol sayısı
+CHUNK_SIZE = 50
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# yf.download modül düzeyindeki ortak sözlüklere (shared._DFS, _ERRORS) yazar;
+# eşzamanlı iki çağrı birbirinin sonucunu ezer. Parçalar sırayla indirilir,
+# parça içindeki semboller yfinance'in kendi iş parçacıklarıyla paralel çekilir.
+_YF_DOWNLOAD_LOCK = threading.Lock()
+
+
+def _chunks(items: list, size: int) -> Iterable[list]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def period_start(period: str, today: pd.Timestamp | None = None) -> pd.Timestamp:
+    """'1y', '6mo', '30d' gibi yfinance periyotlarını başlangıç tarihine çevir."""
+    today = (today or pd.Timestamp.today()).normalize()
+    if period.endswith("mo"):
+        return today - pd.DateOffset(months=int(period[:-2]))
+    if period.endswith("y"):
+        return today - pd.DateOffset(years=int(period[:-1]))
+    if period.endswith("d"):
+        return today - pd.DateOffset(days=int(period[:-1]))
+    raise ValueError(f"Desteklenmeyen periyot: {period}")
+
+
+def split_frames(raw: pd.DataFrame | None, tickers: list) -> dict:
+    """
+    Çoklu sembol yf.download çıktısını {ticker: OHLCV DataFrame} sözlüğüne ayır.
+    Verisi olmayan hisseler sözlükte yer almaz.
+    """
+    if raw is None or raw.empty:
+        return {}
+
+    frames = {}
+    if isinstance(raw.columns, pd.MultiIndex):
+        # group_by="ticker" → 0. seviye sembol, 1. seviye fiyat alanı
+        available = set(raw.columns.get_level_values(0))
+        for tkr in tickers:
+            if tkr not in available:
+                continue
+            df = raw[tkr]
+            if isinstance(df.columns, pd.MultiIndex):
+                df = df.droplevel(0, axis=1)
+            # Ortak takvim yüzünden eklenen boş satırları at
+            df = df.dropna(how="all")
+            if not df.empty:
+                frames[tkr] = df
+    elif len(tickers) == 1:
+        # Tek sembolde yfinance düz sütun döndürür
+        frames[tickers[0]] = raw.dropna(how="all")
+    return frames
+
+
+class YahooProvider:
+    """yfinance tabanlı piyasa verisi sağlayıcısı."""
+
+    def download(self, tickers: tuple, period: str = "1y",
+                 start: str | None = None) -> tuple:
+        """
+        Bir sembol parçasını indir. Barlar düzeltilmemiş (auto_adjust=False;
+        Yahoo bölünmelere göre yine düzeltir) ve eylem sütunlarıyla
+        (Dividends, Stock Splits) gelir; düzeltme yerelde yapılır (bist.actions).
+        Dönüş: ({ticker: OHLCV + eylemler}, {ticker: NO_DATA|THROTTLED|ERROR}).
+        Parçanın tamamı kısıtlandıysa ThrottledError fırlatır (parça tekrar denenir).
+        """
+        window = {"start": start} if start else {"period": period}
+        with _YF_DOWNLOAD_LOCK:
+            raw = yf.download(list(tickers), **window, interval="1d",
+                              auto_adjust=False, actions=True, group_by="ticker",
+                              threads=True, progress=False)
+            errors = dict(yf.shared._ERRORS)
+
+        frames = split_frames(raw, list(tickers))
+        failed = {t: classify_message(str(errors.get(t, "No data found")))
+                  for t in tickers if t not in frames}
+        if not frames and failed and all(s == THROTTLED for s in failed.values()):
+            raise ThrottledError(f"{len(failed)} sembolün tamamı kısıtlandı")
+        return frames, failed
+
+    def info(self, ticker: str) -> dict:
+        return yf.Ticker(ticker).info or {}
+
+
+def download_ohlcv(tickers: list, period: str = "1y",
+                   chunk_size: int = CHUNK_SIZE,
+                   progress_cb: Callable[[int, int], None] | None = None,
+                   start: str | None = None,
+                   pool: FetchPool | None = None, provider=None,
+                   chunk_cb: Callable[[dict], None] | None = None) -> dict:
+    """
+    Sembol listesini chunk_size'lık parçalar halinde toplu indir.
+    start verilirse period yerine o tarihten bugüne kadar olan barlar çekilir.
+    Dönüş: {ticker: OHLCV DataFrame}. Her sembolün son durumu (ok / no_data /
+    throttled / error) pool.outcomes'a yazılır. Parça içinde kısıtlanan
+    semboller sonraki turlarda geri çekilmeyle tekrar denenir.
+    chunk_cb({ticker: df}) her başarılı parça geldiğinde çağrılır (depoya
+    parça parça yazmak için; yarıda kalan indirme baştan başlamaz).
+    """
+    pool = pool or FetchPool()
+    provider = provider or YahooProvider()
+    pending = list(dict.fromkeys(tickers))
+    frames = {}
+
+    for rnd in range(pool.retries + 1):
+        retry = []
+
+        def _collect(chunk, res):
+            # Parça süresi sembollere eşit paylaştırılır
+            share = res.elapsed / len(chunk)
+            if not res.ok:
+                for tkr in chunk:
+                    pool.record(tkr, res.status, share)
+                return
+            got, failed = res.value
+            frames.update(got)
+            for tkr in got:
+                pool.record(tkr, OK, share)
+            for tkr, status in failed.items():
+                if status == THROTTLED:
+                    retry.append(tkr)
+                pool.record(tkr, status, share)
+            if chunk_cb and got:
+                chunk_cb(got)
+
+        chunks = [tuple(c) for c in _chunks(pending, chunk_size)]
+        pool.map(lambda c: provider.download(c, period=period, start=start),
+                 chunks, cost=len, record=False,
+                 progress_cb=progress_cb if rnd == 0 else None, result_cb=_collect)
+        pending = retry
+
+        if not pending:
+            break
+        if rnd < pool.retries:
+            pool.limiter.throttled(pool.backoff(rnd))
+
+    for tkr in pending:
+        pool.record(tkr, THROTTLED)
+    return frames
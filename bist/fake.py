@@ -0,0 +1,134 @@
+"""
+Sahte Piyasa Verisi Sağlayıcısı
+===============================
+YahooProvider ile aynı arayüzü (download / info) sunan, ağ kullanmayan yerel
+sağlayıcı. Gecikme, HTTP 429 kısıtlaması ve geçici hata enjekte edilebilir;
+veri çekme katmanı ve tarama bununla ağ olmadan denenebilir.
+"""
+
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from bist.data import period_start
+from bist.fetcher import ERROR, NO_DATA, THROTTLED, ThrottledError
+
+
+class FakeProvider:
+    """
+    Deterministik sentetik OHLCV ve .info üreten sağlayıcı.
+    latency:       her çağrıda beklenecek süre (sn)
+    throttle_rate: bir sembolün 429 ile reddedilme olasılığı
+    error_rate:    bir çağrının geçici bağlantı hatası verme olasılığı
+    missing:       hiç verisi olmayan (geçersiz) semboller
+    """
+
+    def __init__(self, latency: float = 0.0, throttle_rate: float = 0.0,
+                 error_rate: float = 0.0, missing: tuple = (),
+                 end: str | None = None, seed: int = 0):
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.missing = set(missing)
+        self.end = pd.Timestamp(end) if end else pd.Timestamp.today().normalize()
+        self.seed = seed
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self.calls = {"download": 0, "info": 0, THROTTLED: 0, ERROR: 0}
+        self._histories: dict = {}
+
+    # ── Yardımcılar ──────────────────────────────────────────────────────────
+
+    def _ticker_rng(self, ticker: str, salt: str = "") -> np.random.Generator:
+        return np.random.default_rng(zlib.crc32(f"{ticker}{salt}".encode()) + self.seed)
+
+    def _roll(self, prob: float) -> bool:
+        if prob <= 0:
+            return False
+        with self._lock:
+            return bool(self._rng.random() < prob)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.calls[key] += 1
+
+    def _inject_call_errors(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        if self._roll(self.error_rate):
+            self._count(ERROR)
+            raise ConnectionError("Sahte bağlantı hatası")
+
+    # ── Veri Üretimi ─────────────────────────────────────────────────────────
+
+    def history(self, ticker: str, bars: int = 600) -> pd.DataFrame:
+        """
+        Sembole özgü, her çağrıda aynı olan günlük OHLCV serisi.
+        Üretilen seri saklanır (ölçümlerde üretim maliyeti sayılmasın);
+        dönen DataFrame değiştirilmemelidir.
+        """
+        key = (ticker, bars)
+        if key not in self._histories:
+            self._histories[key] = self._generate(ticker, bars)
+        return self._histories[key]
+
+    def _generate(self, ticker: str, bars: int) -> pd.DataFrame:
+        rng = self._ticker_rng(ticker)
+        idx = pd.bdate_range(end=self.end, periods=bars, name="Date")
+        drift = rng.normal(0.0005, 0.001)
+        vol = rng.uniform(0.01, 0.03)
+        close = rng.uniform(5, 200) * np.exp(np.cumsum(rng.normal(drift, vol, bars)))
+        spread = rng.uniform(0, vol, (2, bars))
+        return pd.DataFrame({
+            "Open":   close * (1 + rng.normal(0, vol / 3, bars)),
+            "High":   close * (1 + spread[0]),
+            "Low":    close * (1 - spread[1]),
+            "Close":  close,
+            "Volume": rng.lognormal(13, 0.6, bars).round(),
+        }, index=idx)
+
+    # ── Sağlayıcı Arayüzü ────────────────────────────────────────────────────
+
+    def download(self, tickers: tuple, period: str = "1y",
+                 start: str | None = None) -> tuple:
+        self._count("download")
+        self._inject_call_errors()
+        begin = pd.Timestamp(start) if start else period_start(period, self.end)
+
+        frames, failed = {}, {}
+        for tkr in tickers:
+            if tkr in self.missing:
+                failed[tkr] = NO_DATA
+            elif self._roll(self.throttle_rate):
+                self._count(THROTTLED)
+                failed[tkr] = THROTTLED
+            else:
+                df = self.history(tkr)
+                frames[tkr] = df[df.index >= begin]
+
+        if not frames and failed and all(s == THROTTLED for s in failed.values()):
+            raise ThrottledError("429 Too Many Requests")
+        return frames, failed
+
+    def info(self, ticker: str) -> dict:
+        self._count("info")
+        self._inject_call_errors()
+        if ticker in self.missing:
+            return {}
+        if self._roll(self.throttle_rate):
+            self._count(THROTTLED)
+            raise ThrottledError("429 Too Many Requests")
+
+        rng = self._ticker_rng(ticker, "info")
+        return {
+            "sector": str(rng.choice(["Financial Services", "Industrials",
+                                      "Basic Materials", "Consumer Cyclical",
+                                      "Technology", "Energy"])),
+            "priceToBook": float(rng.uniform(0.3, 6.0)),
+            "trailingPE": float(rng.uniform(2.0, 40.0)),
+            "earningsQuarterlyGrowth": float(rng.normal(0.2, 0.4)),
+            "revenueGrowth": float(rng.normal(0.3, 0.3)),
+        }
@@ -0,0 +1,225 @@
+"""
+Eşzamanlı Veri Çekme Katmanı
+============================
+İş parçacığı havuzu + ortak token-bucket istek bütçesi + üstel geri çekilme.
+
+- TokenBucket: tüm iş parçacıklarının paylaştığı saniye başı istek bütçesi.
+  Kısıtlamaya (HTTP 429) takılınca hız yarıya iner ve herkes kısa bir süre
+  bekler; başarılı isteklerle hız kademeli olarak hedefe geri döner (AIMD).
+- FetchPool: her anahtar (sembol ya da sembol parçası) için isteği bütçe
+  dahilinde çalıştırır, kısıtlama ve geçici hatalarda jitter'lı üstel
+  geri çekilmeyle tekrar dener.
+- Sonuçlar "veri yok" ile "kısıtlandı, sonra tekrar dene"yi ayırt eder;
+  hiçbir hata sessizce yutulmaz.
+"""
+
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+# Sonuç durumları
+OK, NO_DATA, THROTTLED, ERROR = "ok", "no_data", "throttled", "error"
+
+DEFAULT_RATE = 5.0        # istek / sn
+DEFAULT_WORKERS = 8
+
+
+class ThrottledError(Exception):
+    """Sağlayıcı istek sınırına takıldı (HTTP 429 vb.); daha sonra tekrar denenmeli."""
+
+
+class NoDataError(Exception):
+    """Sembol için veri yok (geçersiz ya da işlem görmüyor); tekrar denemek anlamsız."""
+
+
+def classify_error(exc: BaseException) -> str:
+    """İstisnayı NO_DATA / THROTTLED / ERROR sınıflarından birine ayır."""
+    if isinstance(exc, ThrottledError):
+        return THROTTLED
+    if isinstance(exc, NoDataError):
+        return NO_DATA
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status == 429:
+        return THROTTLED
+    if status == 404:
+        return NO_DATA
+    return classify_message(str(exc))
+
+
+def classify_message(msg: str) -> str:
+    """yfinance'in hata mesajlarını sınıflandır."""
+    msg = msg.lower()
+    if "too many requests" in msg or "rate limit" in msg or "429" in msg:
+        return THROTTLED
+    if "delisted" in msg or "no data found" in msg or "no timezone found" in msg:
+        return NO_DATA
+    return ERROR
+
+
+class TokenBucket:
+    """İş parçacığı güvenli, uyarlamalı token-bucket hız sınırlayıcı."""
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: float | None = None,
+                 min_rate: float = 0.2, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.target_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Bütçede `tokens` kadar yer açılana kadar bekle."""
+        # Kapasiteden büyük istek (ör. büyük sembol parçası) borçlanarak geçer
+        tokens = min(tokens, self.capacity)
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self.tokens >= tokens:
+                        self.tokens -= tokens
+                        return
+                    wait = (tokens - self.tokens) / self.rate
+            self._sleep(wait)
+
+    def throttled(self, cooldown: float) -> None:
+        """429 alındı: hızı yarıya indir, herkesi `cooldown` sn beklet."""
+        with self._lock:
+            now = self._clock()
+            # Aynı bekleme penceresindeki eşzamanlı 429'lar hızı bir kez düşürür
+            if now >= self._paused_until:
+                self.rate = max(self.min_rate, self.rate / 2)
+            self._paused_until = max(self._paused_until, now + cooldown)
+            self.tokens = 0.0
+
+    def succeeded(self) -> None:
+        """Başarılı istek: hızı kademeli olarak hedefe doğru artır."""
+        with self._lock:
+            if self.rate < self.target_rate:
+                self.rate = min(self.target_rate, self.rate + self.target_rate * 0.05)
+
+
+@dataclass
+class FetchResult:
+    key: Any
+    status: str
+    value: Any = None
+    attempts: int = 0
+    error: str | None = None
+    elapsed: float = 0.0     # bekleme ve tekrar denemeler dahil süre (sn)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == OK
+
+
+class FetchPool:
+    """
+    Hız sınırlı, tekrar denemeli iş parçacığı havuzu.
+    outcomes: bu havuzla çekilen her anahtarın son durumu (arayüz özeti için).
+    timings:  anahtar başına toplam çağrı süresi (sn).
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, max_workers: int = DEFAULT_WORKERS,
+                 retries: int = 4, base_delay: float = 0.5, max_delay: float = 30.0,
+                 limiter: TokenBucket | None = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.limiter = limiter or TokenBucket(rate, sleep=sleep)
+        self.max_workers = max_workers
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.outcomes: dict = {}
+        self.timings: dict = {}
+
+    def backoff(self, attempt: int) -> float:
+        """attempt. deneme sonrası bekleme: üstel artış + %50 jitter."""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.5)
+
+    def record(self, key, status: str, elapsed: float = 0.0) -> None:
+        with self._lock:
+            self.outcomes[key] = status
+            self.timings[key] = self.timings.get(key, 0.0) + elapsed
+
+    def summary(self) -> Counter:
+        """Durum başına anahtar sayısı: {"ok": .., "no_data": .., ...}."""
+        with self._lock:
+            return Counter(self.outcomes.values())
+
+    def call(self, fn: Callable[[Any], Any], key, cost: float = 1.0,
+             record: bool = True) -> FetchResult:
+        """
+        fn(key) çağrısını bütçe dahilinde yap. None/boş dönüş → NO_DATA.
+        Kısıtlama ve geçici hatalar tekrar denenir; NO_DATA denenmez.
+        """
+        result = FetchResult(key, ERROR)
+        t0 = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire(cost)
+            result.attempts = attempt + 1
+            try:
+                value = fn(key)
+            except Exception as exc:
+                result.status = classify_error(exc)
+                result.error = f"{type(exc).__name__}: {exc}"
+                if result.status == NO_DATA:
+                    break
+                delay = self.backoff(attempt)
+                if result.status == THROTTLED:
+                    self.limiter.throttled(delay)
+                if attempt < self.retries:
+                    self._sleep(delay)
+                continue
+
+            self.limiter.succeeded()
+            empty = value is None or (hasattr(value, "__len__") and len(value) == 0)
+            result.status, result.value, result.error = (NO_DATA if empty else OK), value, None
+            break
+
+        result.elapsed = time.perf_counter() - t0
+        if record:
+            self.record(key, result.status, result.elapsed)
+        return result
+
+    def map(self, fn: Callable[[Any], Any], keys: Iterable,
+            cost: Callable[[Any], float] | None = None,
+            progress_cb: Callable[[int, int], None] | None = None,
+            record: bool = True,
+            result_cb: Callable[[Any, FetchResult], None] | None = None) -> dict:
+        """
+        Anahtarları eşzamanlı çek. Dönüş: {key: FetchResult} (giriş sırasıyla).
+        result_cb(key, sonuç) her sonuç tamamlandıkça (tamamlanma sırasıyla)
+        çağıran iş parçacığında çağrılır; yavaş bir anahtar arkasındakileri
+        bekletmez (ara sonuçları kalıcı yazmak / yayınlamak için).
+        """
+        keys = list(keys)
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.call, fn, k, cost(k) if cost else 1.0, record): k
+                       for k in keys}
+            for i, fut in enumerate(as_completed(futures)):
+                key = futures[fut]
+                results[key] = fut.result()
+                if result_cb:
+                    result_cb(key, results[key])
+                if progress_cb:
+                    progress_cb(i + 1, len(keys))
+        return {k: results[k] for k in keys}
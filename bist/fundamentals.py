@@ -0,0 +1,136 @@
+"""
+Temel Veri Önbelleği
+====================
+yf.Ticker(...).info uygulamadaki en yavaş çağrıdır ve PD/DD, F/K, kar büyümesi
+gibi alanlar çeyreklik değişir. Bu modül .info sonuçlarının ihtiyaç duyulan
+alanlarını TTL (varsayılan 1 gün) süresince diskte (SQLite) saklar; sektör
+istatistikleri ve puanlama aynı önbelleği paylaşır. Yazılan her .info aynı
+dosyadaki tüm evren sektör toplamlarını günceller (bist.sectors).
+"""
+
+import json
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Callable
+
+from bist.config import data_path
+from bist.data import YahooProvider
+from bist.fetcher import NO_DATA, OK, FetchPool
+from bist.sectors import SectorStats
+
+DEFAULT_DB = "fundamentals.sqlite"
+DEFAULT_TTL = 24 * 3600  # sn
+FLUSH_EVERY = 25         # fill sırasında kaç yeni kayıtta bir diske yazılır
+
+# .info içinden saklanan alanlar (tam sözlük çok büyük)
+INFO_FIELDS = (
+    "sector", "priceToBook", "trailingPE", "forwardPE",
+    "earningsQuarterlyGrowth", "revenueGrowth",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fundamentals (
+    ticker     TEXT PRIMARY KEY,
+    info       TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+def select_fields(info: dict) -> dict:
+    """.info sözlüğünden yalnızca puanlamada kullanılan alanları al."""
+    return {k: info[k] for k in INFO_FIELDS if info.get(k) is not None}
+
+
+class FundamentalsCache:
+    """Oturumlar ve yeniden başlatmalar arası paylaşılan, TTL'li .info önbelleği."""
+
+    def __init__(self, path: str | Path | None = None, ttl: float = DEFAULT_TTL,
+                 fetcher: Callable[[str], dict] | None = None):
+        self.path = Path(path) if path else data_path(DEFAULT_DB)
+        self.ttl = ttl
+        self.fetcher = fetcher or YahooProvider().info
+        with closing(self._connect()) as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_SCHEMA)
+        self.sectors = SectorStats(self.path)
+        # Sektör tabloları yoksa mevcut kayıtlardan (TTL'den bağımsız) kur
+        if self.sectors.empty():
+            self.sectors.update(self.all())
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_many(self, tickers: list) -> dict:
+        """TTL içindeki kayıtları döndür (ağ erişimi yok)."""
+        if not tickers:
+            return {}
+        cutoff = time.time() - self.ttl
+        with closing(self._connect()) as con:
+            rows = con.execute(
+                f"SELECT ticker, info FROM fundamentals WHERE fetched_at >= ? "
+                f"AND ticker IN ({','.join('?' * len(tickers))})",
+                [cutoff, *tickers],
+            ).fetchall()
+        return {t: json.loads(info) for t, info in rows}
+
+    def all(self) -> dict:
+        """Süresi dolmuşlar dahil tüm kayıtlar."""
+        with closing(self._connect()) as con:
+            rows = con.execute("SELECT ticker, info FROM fundamentals").fetchall()
+        return {t: json.loads(info) for t, info in rows}
+
+    def put_many(self, infos: dict) -> None:
+        if not infos:
+            return
+        now = time.time()
+        with closing(self._connect()) as con, con:
+            con.executemany(
+                "INSERT OR REPLACE INTO fundamentals VALUES (?,?,?)",
+                [(t, json.dumps(info), now) for t, info in infos.items()],
+            )
+        self.sectors.update(infos)
+
+    def sector_stats(self) -> dict:
+        """Tüm evren sektör tabanları (bkz. SectorStats.stats)."""
+        return self.sectors.stats()
+
+    def get(self, ticker: str, pool: FetchPool | None = None) -> dict:
+        """Tek hisse: önbellekte varsa oradan, yoksa çekip kaydederek döndür."""
+        return self.fill([ticker], pool).get(ticker, {})
+
+    def fill(self, tickers: list, pool: FetchPool | None = None,
+             progress_cb: Callable[[int, int], None] | None = None,
+             result_cb: Callable[[str, dict | None], None] | None = None) -> dict:
+        """
+        Eksik/süresi dolmuş hisselerin .info'sunu havuz üzerinden eşzamanlı
+        çekip önbelleğe yaz. Dönüş: {ticker: info}.
+        Boş .info ("veri yok") da önbelleğe yazılır; kısıtlanan ya da hata
+        alan hisseler sonuçta yer almaz ve sonraki çağrıda tekrar denenir.
+        result_cb(ticker, info | None) çekilen her hisse için, geldikçe çağrılır.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        cached = self.get_many(tickers)
+        missing = [t for t in tickers if t not in cached]
+        if not missing:
+            return cached
+
+        pool = pool or FetchPool()
+        fetched, batch = {}, {}
+
+        def _collect(tkr, res):
+            # Gelenler FLUSH_EVERY'de bir yazılır; yarıda kalan doldurma baştan başlamaz
+            if res.status in (OK, NO_DATA):
+                fetched[tkr] = batch[tkr] = res.value or {}
+            if len(batch) >= FLUSH_EVERY:
+                self.put_many(batch)
+                batch.clear()
+            if result_cb:
+                result_cb(tkr, fetched.get(tkr))
+
+        pool.map(lambda t: select_fields(self.fetcher(t)), missing,
+                 progress_cb=progress_cb, result_cb=_collect)
+        self.put_many(batch)
+        return {**cached, **fetched}
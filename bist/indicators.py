@@ -0,0 +1,40 @@
+"""
+Teknik İndikatörler
+===================
+RSI, MACD ve ATR hesapları (pandas_ta olmadan saf numpy/pandas ile).
+Fonksiyonlar hem tek hisse Series'i hem de (tarih × hisse) DataFrame
+paneli üzerinde sütun bazında çalışır.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def calculate_rsi(series: pd.Series, period: int = 14) -> pd.Series:
+    """RSI hesapla (pandas_ta olmadan saf numpy/pandas ile)."""
+    delta = series.diff()
+    gain = delta.clip(lower=0)
+    loss = -delta.clip(upper=0)
+    avg_gain = gain.ewm(alpha=1/period, min_periods=period).mean()
+    avg_loss = loss.ewm(alpha=1/period, min_periods=period).mean()
+    rs = avg_gain / avg_loss.replace(0, np.nan)
+    return 100 - (100 / (1 + rs))
+
+
+def calculate_macd(series: pd.Series, fast=12, slow=26, signal=9):
+    """MACD, Sinyal ve Histogram hesapla."""
+    ema_fast = series.ewm(span=fast, adjust=False).mean()
+    ema_slow = series.ewm(span=slow, adjust=False).mean()
+    macd_line = ema_fast - ema_slow
+    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+    histogram = macd_line - signal_line
+    return macd_line, signal_line, histogram
+
+
+def calculate_atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
+    """ATR (Average True Range) hesapla."""
+    prev_close = close.shift(1)
+    # fmax NaN'ı atlar: ilk barda TR = High - Low
+    tr = np.fmax(np.fmax(high - low, (high - prev_close).abs()),
+                 (low - prev_close).abs())
+    return tr.ewm(span=period, adjust=False).mean()
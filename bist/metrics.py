@@ -0,0 +1,167 @@
+"""
+Tarama Ölçümleri
+================
+Her tarama için faz bazında giren/geçen hisse sayısı, hisse ve aşama bazında
+süre (indirme, temizlik, indikatörler, temel veri, puanlama) ve
+sınıflandırılmış hata sebepleri. Arayüzdeki özet
+paneli (p50/p95, hata sınıfı sayıları) ve JSON dışa aktarım buradan beslenir.
+
+Toplu (vektörel) aşamalarda hisse başı süre, aşama süresinin hisse sayısına
+bölünmüş payıdır; ağ aşamalarında (indirme parçası, .info) ölçülen gerçek
+çağrı süresidir.
+"""
+
+import json
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from bist.fetcher import ERROR, NO_DATA, THROTTLED
+
+STAGES = ("download", "cleaning", "indicators", "timeframes", "fundamentals", "scoring")
+STAGE_LABELS = {
+    "download":     "İndirme",
+    "cleaning":     "Temizlik",
+    "indicators":   "İndikatörler",
+    "timeframes":   "Haftalık / Aylık",
+    "fundamentals": "Temel Veri",
+    "scoring":      "Puanlama",
+}
+
+# Tarama fazları (her biri giren/geçen hisse sayısı ve süre raporlar)
+PHASES = ("prices", "fundamentals", "scoring")
+PHASE_LABELS = {
+    "prices":       "1. Fiyat + Trend Filtresi",
+    "fundamentals": "2. Temel Veri (trendi geçenler)",
+    "scoring":      "3. Puanlama",
+}
+
+# Hata sınıfları
+INSUFFICIENT_BARS = "insufficient_bars"
+NOT_IN_STORE = "not_in_store"
+EXCEPTION = "exception"
+FAILURE_LABELS = {
+    NO_DATA:           "Veri yok / geçersiz sembol",
+    THROTTLED:         "Kısıtlandı (429)",
+    ERROR:             "Bağlantı hatası",
+    INSUFFICIENT_BARS: "Yetersiz bar (<60)",
+    NOT_IN_STORE:      "Yerel depoda yok",
+    EXCEPTION:         "Hesaplama hatası",
+}
+
+
+class ScanMetrics:
+    """Bir taramanın aşama süreleri ve hata kayıtları."""
+
+    def __init__(self):
+        self.timings: dict = defaultdict(dict)   # aşama → {ticker: sn}
+        self.wall: dict = {}                     # aşama → toplam duvar saati (sn)
+        self.failures: dict = {}                 # ticker → {"stage", "reason", "detail"}
+        self.phases: dict = {}                   # faz → {"in", "passed", "seconds", "note"}
+
+    def record(self, stage: str, ticker: str, seconds: float) -> None:
+        """Hisseye aşama süresi ekle (tekrar denemeler birikir)."""
+        self.timings[stage][ticker] = self.timings[stage].get(ticker, 0.0) + seconds
+
+    def share(self, stage: str, tickers: list, seconds: float) -> None:
+        """Toplu işlem süresini hisselere eşit paylaştır."""
+        if tickers:
+            each = seconds / len(tickers)
+            for t in tickers:
+                self.record(stage, t, each)
+
+    @contextmanager
+    def stage(self, name: str, tickers: list | None = None):
+        """Aşamanın duvar saatini ölç; tickers verilirse süreyi onlara paylaştır."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            self.wall[name] = self.wall.get(name, 0.0) + elapsed
+            if tickers is not None:
+                self.share(name, tickers, elapsed)
+
+    @contextmanager
+    def phase(self, name: str, tickers_in: int):
+        """
+        Tarama fazını ölç. Blok içinde dönen sözlüğe "passed" (geçen hisse
+        sayısı) ve isteğe bağlı "note" yazılır.
+        """
+        rec = {"in": tickers_in, "passed": tickers_in, "seconds": 0.0, "note": ""}
+        self.phases[name] = rec
+        t0 = time.perf_counter()
+        try:
+            yield rec
+        finally:
+            rec["seconds"] = time.perf_counter() - t0
+
+    def fail(self, ticker: str, stage: str, reason: str, detail: str | None = None) -> None:
+        self.failures[ticker] = {"stage": stage, "reason": reason, "detail": detail}
+
+    # ── Özetler ──────────────────────────────────────────────────────────────
+
+    def stage_summary(self) -> pd.DataFrame:
+        """Aşama başına hisse sayısı, toplam süre ve hisse başı p50/p95/maks (ms)."""
+        rows = []
+        for name in [*STAGES, *(s for s in self.wall if s not in STAGES)]:
+            per = np.fromiter(self.timings.get(name, {}).values(), dtype=float)
+            if name not in self.wall and not len(per):
+                continue
+            rows.append({
+                "Aşama":       STAGE_LABELS.get(name, name),
+                "Hisse":       len(per),
+                "Toplam (sn)": self.wall.get(name, per.sum()),
+                "p50 (ms)":    np.percentile(per, 50) * 1000 if len(per) else np.nan,
+                "p95 (ms)":    np.percentile(per, 95) * 1000 if len(per) else np.nan,
+                "Maks (ms)":   per.max() * 1000 if len(per) else np.nan,
+            })
+        return pd.DataFrame(rows, columns=["Aşama", "Hisse", "Toplam (sn)",
+                                           "p50 (ms)", "p95 (ms)", "Maks (ms)"])
+
+    def phase_summary(self) -> pd.DataFrame:
+        """Faz başına giren / geçen hisse sayısı ve süre."""
+        rows = [{"Faz": PHASE_LABELS.get(k, k), "Giren": r["in"], "Geçen": r["passed"],
+                 "Süre (sn)": r["seconds"], "Not": r["note"]}
+                for k, r in self.phases.items()]
+        return pd.DataFrame(rows, columns=["Faz", "Giren", "Geçen", "Süre (sn)", "Not"])
+
+    def failure_counts(self) -> pd.DataFrame:
+        """(aşama, hata sınıfı) başına hisse sayısı."""
+        counts = Counter((f["stage"], f["reason"]) for f in self.failures.values())
+        rows = [{"Aşama": STAGE_LABELS.get(s, s), "Sebep": FAILURE_LABELS.get(r, r),
+                 "Hisse": n} for (s, r), n in counts.most_common()]
+        return pd.DataFrame(rows, columns=["Aşama", "Sebep", "Hisse"])
+
+    def to_dict(self) -> dict:
+        return {
+            "stages": self.stage_summary().astype(object).where(
+                lambda d: d.notna(), None).to_dict("records"),
+            "phases": self.phases,
+            "failures": self.failure_counts().to_dict("records"),
+            "wall": self.wall,
+            "timings": {s: dict(t) for s, t in self.timings.items()},
+            "failed_tickers": self.failures,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ScanMetrics":
+        """to_dict çıktısından geri yükle (özet tablolar yeniden üretilir)."""
+        m = cls()
+        for stage, per in d.get("timings", {}).items():
+            m.timings[stage].update(per)
+        m.wall.update(d.get("wall", {}))
+        m.failures.update(d.get("failed_tickers", {}))
+        m.phases.update(d.get("phases", {}))
+        return m
+
+    def to_json(self, path: str | Path | None = None) -> str:
+        """JSON metni; path verilirse dosyaya da yazar."""
+        text = json.dumps(self.to_dict(), ensure_ascii=False, indent=1, default=float)
+        if path:
+            Path(path).write_text(text, encoding="utf-8")
+        return text
@@ -0,0 +1,389 @@
+"""
+Vektörel Panel Puanlama
+=======================
+Tüm hisseleri geniş (bar × hisse) Close/High/Low/Volume tablolarına hizalar,
+MA50/MA200, RSI, MACD, ATR ve hacim oranlarını tüm evren için tek geçişte
+hesaplar. score_ticker'daki if/elif merdivenleri burada eşik tablolarıdır ve
+np.select ile tüm hisselere aynı anda uygulanır.
+
+Puan fonksiyonları herhangi bir şekildeki dizilerle çalışır: son bar için
+(hisse,) vektörleri, geriye dönük test için (tarih × hisse) matrisleri.
+Sonuçlar score_ticker ile birebir aynıdır; tablo şeması bist.results'tadır.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from bist.indicators import calculate_atr, calculate_macd, calculate_rsi
+from bist.results import (DETAIL_COLUMNS, MACD_LABELS, MACD_NONE, TREND_BELOW,
+                          TREND_LABELS, ResultColumns)
+
+MIN_BARS = 60
+PRICE_FIELDS = ["Close", "High", "Low", "Volume"]
+
+# ─────────────────────────────────────────────────────────────────────────────
+# EŞİK TABLOLARI
+# Her satır (operatör, eşik, puan); ilk sağlanan koşulun puanı alınır,
+# hiçbiri sağlanmazsa *_DEFAULT kullanılır (score_ticker'daki else dalı).
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Temel analiz – eşikler sektör ortalamasının katları
+PB_LADDER = (("<", 0.5, 15), ("<", 0.75, 12), ("<", 1.0, 8), ("<", 1.25, 4))
+PB_DEFAULT, PB_NEUTRAL, PB_SECTOR_FALLBACK = 0, 5, 3.0
+
+PE_LADDER = (("<", 0.5, 15), ("<", 0.75, 12), ("<", 1.0, 8), ("<", 1.5, 4))
+PE_DEFAULT, PE_NEUTRAL, PE_SECTOR_FALLBACK = 1, 5, 15.0
+
+EG_LADDER = ((">", 0.50, 10), (">", 0.25, 8), (">", 0.10, 6), (">", 0, 4))
+EG_DEFAULT, EG_NEUTRAL = 0, 3
+REVENUE_FALLBACK = (0.15, 4)   # Kar büyümesi yoksa: gelir büyümesi > %15 → 4
+
+# Teknik analiz
+RSI_LADDER = (("<", 30, 2), ("<", 40, 8), ("<", 50, 12), ("<=", 60, 20),
+              ("<=", 70, 15), ("<=", 80, 7))
+RSI_DEFAULT = 2
+
+# Sıra: crossover, hist. büyüyor & MACD>0, hist. büyüyor & MACD<0,
+#       hist. pozitif, MACD > sinyal
+MACD_SCORES = (20, 16, 10, 8, 5)
+MACD_DEFAULT = 0
+
+VOLUME_LADDER = ((">", 2.0, 10), (">", 1.5, 8), (">", 1.2, 6), (">", 1.0, 4))
+VOLUME_DEFAULT = 0
+
+ATR_LADDER = (("<", 0.8, 1), ("<", 1.5, 4), ("<=", 3.0, 10), ("<=", 4.5, 7),
+              ("<=", 6.0, 4))
+ATR_DEFAULT = 1
+
+GOLDEN_CROSS_BONUS = 5
+# MA50 mesafesi: %2–8 → 5, %8–15 → 2, %15+ → 0, diğer → 3
+MA50_PROX_SCORES = (5, 2, 0)
+MA50_PROX_DEFAULT = 3
+
+TEMEL_CAP, TEKNIK_CAP = 40, 60
+
+# Haftalık onay (isteğe bağlı, bist.timeframes). Açıkken teknik tavandan
+# WEEKLY_CAP puan haftalık onaya ayrılır; toplam yine 100 üzerindendir.
+WEEKLY_TREND_SCORES = (4, 2)   # fiyat > MA10 > MA30 → 4, yalnızca fiyat > MA10 → 2
+WEEKLY_MACD_SCORES = (3, 2)    # crossover / hist. büyüyor → 3, MACD > sinyal → 2
+WEEKLY_RSI_LADDER = (("<", 40, 0), ("<", 50, 1), ("<=", 70, 3), ("<=", 80, 1))
+WEEKLY_RSI_DEFAULT = 0
+WEEKLY_CAP = 10
+
+_OPS = {"<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal}
+
+
+def ladder(x, table, default, scale=1.0) -> np.ndarray:
+    """Eşik tablosunu diziye uygula; eşikler `scale` ile çarpılır."""
+    x = np.asarray(x, dtype=float)
+    conds = [_OPS[op](x, t * scale) for op, t, _ in table]
+    return np.select(conds, [s for *_, s in table], default)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PANEL
+# ─────────────────────────────────────────────────────────────────────────────
+
+@dataclass
+class Panel:
+    """
+    (bar/tarih × hisse) hizalı fiyat tabloları.
+    dates: bar hizalamada her hücrenin takvim tarihi (dolgu = NaT).
+    """
+    close: pd.DataFrame
+    high: pd.DataFrame
+    low: pd.DataFrame
+    volume: pd.DataFrame
+    dates: pd.DataFrame | None = None
+
+    @property
+    def tickers(self) -> list:
+        return list(self.close.columns)
+
+
+def _clean_arrays(raw: pd.DataFrame, min_bars: int):
+    """
+    score_ticker ile aynı temizlik (sütunları düzleştir, eksik barları at).
+    Dönüş: (tarih indeksi, [Close, High, Low, Volume] dizisi) ya da None.
+    """
+    if raw is None or len(raw) < min_bars:
+        return None
+    if isinstance(raw.columns, pd.MultiIndex):
+        raw = raw.copy()
+        raw.columns = raw.columns.get_level_values(0)
+    vals = raw[PRICE_FIELDS].to_numpy(dtype=float)
+    mask = ~np.isnan(vals).any(axis=1)
+    if mask.sum() < min_bars:
+        return None
+    return raw.index[mask], vals[mask]
+
+
+def build_panel(frames: dict, align: str = "bars", min_bars: int = MIN_BARS) -> Panel:
+    """
+    {ticker: OHLCV} sözlüğünden panel kur. Yetersiz veride hisse atlanır.
+    align="bars": her hissenin barları sona hizalanır (son satır = her hissenin
+      son barı). Öndeki NaN dolgu EMA/rolling sonuçlarını değiştirmez, bu
+      yüzden son bar değerleri hisse bazlı hesapla birebir aynıdır.
+    align="dates": ortak takvim indeksi (geriye dönük test için).
+    """
+    cleaned = {}
+    for tkr, raw in frames.items():
+        arrays = _clean_arrays(raw, min_bars)
+        if arrays is not None:
+            cleaned[tkr] = arrays
+    tickers = list(cleaned)
+
+    if align == "dates":
+        index = pd.DatetimeIndex(sorted(set().union(*(idx for idx, _ in cleaned.values()))))
+        rows = {t: index.get_indexer(idx) for t, (idx, _) in cleaned.items()}
+    elif align == "bars":
+        n = max((len(idx) for idx, _ in cleaned.values()), default=0)
+        index = pd.RangeIndex(n)
+        rows = {t: np.arange(n - len(idx), n) for t, (idx, _) in cleaned.items()}
+    else:
+        raise ValueError(f"Geçersiz hizalama: {align}")
+
+    cube = np.full((len(PRICE_FIELDS), len(index), len(tickers)), np.nan)
+    for j, tkr in enumerate(tickers):
+        cube[:, rows[tkr], j] = cleaned[tkr][1].T
+    fields = [pd.DataFrame(cube[k], index=index, columns=tickers)
+              for k in range(len(PRICE_FIELDS))]
+
+    dates = None
+    if align == "bars":
+        grid = np.full((len(index), len(tickers)), np.datetime64("NaT"), dtype="datetime64[ns]")
+        for j, tkr in enumerate(tickers):
+            grid[rows[tkr], j] = cleaned[tkr][0].to_numpy(dtype="datetime64[ns]")
+        dates = pd.DataFrame(grid, index=index, columns=tickers)
+    return Panel(*fields, dates=dates)
+
+
+def compute_indicators(panel: Panel) -> dict:
+    """Tüm evren için indikatör tablolarını tek geçişte hesapla."""
+    close = panel.close
+    macd, signal, hist = calculate_macd(close)
+    return {
+        "price":  close,
+        "ma50":   close.rolling(50).mean(),
+        "ma200":  close.rolling(200).mean(),
+        "rsi":    calculate_rsi(close, 14),
+        "macd":   macd,
+        "signal": signal,
+        "hist":   hist,
+        "atr":    calculate_atr(panel.high, panel.low, close, 14),
+        "vol5":   panel.volume.rolling(5).mean(),
+        "vol20":  panel.volume.rolling(20).mean(),
+    }
+
+
+def latest_values(panel: Panel, ind: dict | None = None) -> pd.DataFrame:
+    """Her hissenin son bar değerleri (index: ticker)."""
+    ind = ind or compute_indicators(panel)
+    if panel.close.empty:
+        return pd.DataFrame(columns=[*ind, "macd_prev", "signal_prev", "hist_prev"],
+                            dtype=float)
+    out = pd.DataFrame({k: v.iloc[-1] for k, v in ind.items()})
+    for k in ("macd", "signal", "hist"):
+        out[f"{k}_prev"] = ind[k].iloc[-2]
+
+    # Hacim ortalamaları score_ticker'daki gibi son 5/20 barın düz ortalaması
+    # (rolling toplam yuvarlama farkı eşik sınırında sonucu değiştirmesin)
+    vol = np.ascontiguousarray(panel.volume.to_numpy().T)
+    out["vol5"] = vol[:, -5:].mean(axis=1)
+    out["vol20"] = vol[:, -20:].mean(axis=1)
+    return out
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PUANLAMA
+# ─────────────────────────────────────────────────────────────────────────────
+
+def trend_filter(price, ma50, ma200):
+    """Zorunlu trend filtresi: (MA50 üzeri, MA200 üzeri). MA200 yoksa geçer."""
+    above_ma50 = price > ma50
+    above_ma200 = np.isnan(ma200) | (price > ma200)
+    return above_ma50, above_ma200
+
+
+def technical_scores(price, ma50, ma200, rsi, macd, signal, hist,
+                     macd_prev, signal_prev, hist_prev, vol5, vol20, atr) -> dict:
+    """Teknik analiz bileşenleri (limit uygulanmamış)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        macd_cross = (macd_prev < signal_prev) & (macd > signal)
+        hist_growing = (hist > 0) & (hist > hist_prev)
+        macd_skor = np.select(
+            [macd_cross, hist_growing & (macd > 0), hist_growing & (macd < 0),
+             hist > 0, macd > signal],
+            MACD_SCORES, MACD_DEFAULT)
+
+        has_vol = (vol5 > 0) & (vol20 > 0)
+        hacim_skor = np.where(has_vol, ladder(vol5 / vol20, VOLUME_LADDER, VOLUME_DEFAULT), 0)
+
+        atr_pct = (atr / price) * 100
+        golden = ~np.isnan(ma200) & (ma200 != 0) & (ma50 > ma200)
+        ma50_dist = ((price - ma50) / ma50) * 100
+        prox = np.select(
+            [(2 <= ma50_dist) & (ma50_dist <= 8),
+             (8 < ma50_dist) & (ma50_dist <= 15),
+             ma50_dist > 15],
+            MA50_PROX_SCORES, MA50_PROX_DEFAULT)
+
+    scores = {
+        "RSI Skor":              ladder(rsi, RSI_LADDER, RSI_DEFAULT),
+        "MACD Skor":             macd_skor,
+        "Hacim Skor":            hacim_skor,
+        "ATR Skor":              ladder(atr_pct, ATR_LADDER, ATR_DEFAULT),
+        "MA Golden Cross Bonus": np.where(golden, GOLDEN_CROSS_BONUS, 0),
+        "MA50 Mesafe Bonus":     prox,
+    }
+    return {
+        **scores,
+        "teknik": sum(scores.values()),
+        "atr_pct": atr_pct,
+        "macd_cross": macd_cross,
+        "hist_growing": hist_growing,
+        "volume_ok": vol5 > vol20,
+    }
+
+
+WEEKLY_FIELDS = ("price", "ma_fast", "ma_slow", "rsi", "macd", "signal", "hist",
+                 "macd_prev", "signal_prev", "hist_prev")
+
+
+def weekly_scores(price, ma_fast, ma_slow, rsi, macd, signal, hist,
+                  macd_prev, signal_prev, hist_prev) -> dict:
+    """Haftalık onay puanı (trend + MACD + RSI); eksik değer puan almaz."""
+    with np.errstate(invalid="ignore"):
+        up = price > ma_fast
+        trend = np.select([up & (ma_fast > ma_slow), up], WEEKLY_TREND_SCORES, 0)
+        cross = (macd_prev < signal_prev) & (macd > signal)
+        growing = (hist > 0) & (hist > hist_prev)
+        macd_skor = np.select([cross | growing, macd > signal], WEEKLY_MACD_SCORES, 0)
+    rsi_skor = ladder(rsi, WEEKLY_RSI_LADDER, WEEKLY_RSI_DEFAULT)
+    return {"onay": np.minimum(trend + macd_skor + rsi_skor, WEEKLY_CAP), "up": up}
+
+
+def fundamental_scores(pb, pe, eg, rg, pb_mean, pe_mean, eg_known=None) -> dict:
+    """Temel analiz bileşenleri (limit uygulanmamış). Eksik değer = NaN."""
+    pb, pe, eg, rg = (np.asarray(a, dtype=float) for a in (pb, pe, eg, rg))
+    if eg_known is None:
+        eg_known = ~np.isnan(eg)
+    with np.errstate(invalid="ignore"):
+        pb_skor = np.where(pb > 0, ladder(pb, PB_LADDER, PB_DEFAULT, pb_mean), PB_NEUTRAL)
+        pe_skor = np.where(pe > 0, ladder(pe, PE_LADDER, PE_DEFAULT, pe_mean), PE_NEUTRAL)
+        rev_t, rev_score = REVENUE_FALLBACK
+        eg_skor = np.where(eg_known, ladder(eg, EG_LADDER, EG_DEFAULT),
+                           np.where(rg > rev_t, rev_score, EG_NEUTRAL))
+    scores = {"PD/DD Skor": pb_skor, "F/K Skor": pe_skor, "Kar Büyüme Skor": eg_skor}
+    return {**scores, "temel": sum(scores.values())}
+
+
+def info_values(info: dict) -> tuple:
+    """score_ticker ile aynı .info okuması: (pb, pe, eg, rg, sector)."""
+    return (
+        info.get("priceToBook", None),
+        info.get("trailingPE", None) or info.get("forwardPE", None),
+        info.get("earningsQuarterlyGrowth", None),
+        info.get("revenueGrowth", None),
+        info.get("sector", "Unknown"),
+    )
+
+
+def fundamental_arrays(infos: dict, tickers: list, sector_stats: dict) -> dict:
+    """{ticker: info} sözlüğünü fundamental_scores girdilerine çevir."""
+    rows = [info_values(infos.get(t) or {}) for t in tickers]
+    nan = lambda v: np.nan if v is None else v
+    return {
+        "pb": np.array([nan(r[0]) for r in rows], dtype=float),
+        "pe": np.array([nan(r[1]) for r in rows], dtype=float),
+        "eg": np.array([nan(r[2]) for r in rows], dtype=float),
+        "rg": np.array([nan(r[3]) for r in rows], dtype=float),
+        "eg_known": np.array([r[2] is not None for r in rows], dtype=bool),
+        "pb_mean": np.array([sector_stats.get(r[4], {}).get("pb_mean", PB_SECTOR_FALLBACK)
+                             for r in rows], dtype=float),
+        "pe_mean": np.array([sector_stats.get(r[4], {}).get("pe_mean", PE_SECTOR_FALLBACK)
+                             for r in rows], dtype=float),
+    }
+
+
+def macd_labels(cross, growing, hist) -> np.ndarray:
+    """score_ticker'daki MACD sinyal etiketi, vektörel."""
+    with np.errstate(invalid="ignore"):
+        return np.select([cross, growing, np.asarray(hist) > 0], MACD_LABELS[:3],
+                         MACD_LABELS[3]).astype(object)
+
+
+def score_universe(panel: Panel | None, infos: dict, sector_stats: dict,
+                   latest: pd.DataFrame | None = None,
+                   timeframes: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Paneldeki tüm hisseleri puanla; score_ticker ile aynı değerleri şemalı
+    tablo olarak döndür (bist.results). infos: {ticker: .info} (yalnızca
+    trendi geçenler için gerekir). latest verilirse (ör. artımlı indikatör
+    durumundan) panel kullanılmaz. timeframes verilirse (bist.timeframes,
+    w_*/m_* sütunları) haftalık onay puanı eklenir, teknik tavan
+    TEKNIK_CAP - WEEKLY_CAP olur.
+    """
+    lv = latest if latest is not None else latest_values(panel)
+    tickers = list(lv.index)
+    col = {k: lv[k].to_numpy() for k in lv.columns}
+
+    above_ma50, above_ma200 = trend_filter(col["price"], col["ma50"], col["ma200"])
+    ok = np.asarray(above_ma50 & above_ma200, dtype=bool)
+    tech = technical_scores(**col)
+    fa = fundamental_arrays(infos, tickers, sector_stats)
+    fund = fundamental_scores(**fa)
+
+    temel = np.minimum(fund["temel"], TEMEL_CAP)
+    if timeframes is None:
+        teknik = np.minimum(tech["teknik"], TEKNIK_CAP)
+        toplam = temel + teknik
+    else:
+        tf = timeframes.reindex(tickers)
+        weekly = weekly_scores(*(tf[f"w_{k}"].to_numpy(float) for k in WEEKLY_FIELDS))
+        teknik = np.minimum(tech["teknik"], TEKNIK_CAP - WEEKLY_CAP)
+        toplam = temel + teknik + weekly["onay"]
+    merged = {**fund, **tech}
+
+    # Elenenler: skorlar 0, RSI/ATR/temel alanlar boş, MACD "-"
+    res = ResultColumns(len(tickers))
+    res.set_labels("Ticker", tickers)
+    res["Fiyat"] = np.round(col["price"], 2)
+    res["Toplam Skor"] = np.where(ok, toplam, 0)
+    res["Temel Skor"] = np.where(ok, temel, 0)
+    res["Teknik Skor"] = np.where(ok, teknik, 0)
+    res["MA50 Üzeri"] = above_ma50
+    res["MA200 Üzeri"] = above_ma200
+    res["Hacim OK"] = ok & tech["volume_ok"]
+    res.set_labels("MACD Sinyal", np.where(
+        ok, macd_labels(tech["macd_cross"], tech["hist_growing"], col["hist"]), MACD_NONE))
+    res.set_labels("Elendi", np.full(len(tickers), TREND_BELOW, dtype=object), ~ok)
+    res.put("RSI", ok, np.round(col["rsi"], 1))
+    res.put("ATR%", ok, np.round(tech["atr_pct"], 2))
+
+    sectors = np.array([info_values(infos.get(t) or {})[4] for t in tickers], dtype=object)
+    res.set_labels("Sektör", sectors, ok & (sectors != None))  # noqa: E711
+    # score_ticker: değer yoksa ya da 0 ise "N/A" (burada NaN)
+    with np.errstate(invalid="ignore"):
+        res.put("PD/DD", ok & (fa["pb"] != 0), np.round(fa["pb"], 2))
+        res.put("F/K", ok & (fa["pe"] != 0), np.round(fa["pe"], 2))
+        res.put("Kar Büyümesi", ok & (fa["eg"] != 0), np.round(fa["eg"] * 100, 1))
+    for k in DETAIL_COLUMNS:
+        res.put(k, ok, merged[k])
+
+    if timeframes is not None:
+        res.put("Haftalık Onay", ok, weekly["onay"])
+        res.put("Haftalık RSI", ok, np.round(tf["w_rsi"].to_numpy(float), 1))
+        with np.errstate(invalid="ignore"):
+            res.put("Haftalık ATR%", ok, np.round(tf["w_atr"].to_numpy(float)
+                                                  / tf["w_price"].to_numpy(float) * 100, 2))
+        for name, prefix in (("Haftalık Trend", "w_"), ("Aylık Trend", "m_")):
+            if f"{prefix}ma_fast" not in tf:
+                continue
+            price, ma = tf[f"{prefix}price"].to_numpy(float), tf[f"{prefix}ma_fast"].to_numpy(float)
+            with np.errstate(invalid="ignore"):
+                labels = np.where(price > ma, TREND_LABELS[0], TREND_LABELS[1])
+            res.set_labels(name, labels, ok & ~np.isnan(ma) & ~np.isnan(price))
+    return res.frame()
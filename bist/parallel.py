@@ -0,0 +1,87 @@
+"""
+Çok Süreçli Panel Hesabı
+========================
+Büyük evrenlerde (tüm BIST ya da birden fazla piyasa) indikatör hesabını
+işçi süreçlere böler. Hizalı (alan × bar × hisse) fiyat küpü bir kez
+paylaşımlı belleğe (multiprocessing.shared_memory) kopyalanır; işçiler aynı
+belleğe NumPy görünümüyle bağlanır ve kendi hisse dilimleri için
+latest_values hesaplar. DataFrame gönderilmez, yalnızca (hisse × değer)
+sonuç dizileri geri döner.
+
+İndikatörler sütun (hisse) bazında bağımsız olduğundan sonuçlar tek süreçli
+latest_values ile bit bit aynıdır.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from bist.panel import Panel, latest_values
+
+SERIAL, PROCESS = "serial", "process"
+BACKENDS = (SERIAL, PROCESS)
+BACKEND_LABELS = {SERIAL: "Tek süreç", PROCESS: "Çok süreç (paylaşımlı bellek)"}
+# Dilim başına en az hisse: küçük evrende süreç başlatma maliyeti baskın
+MIN_SLICE = 64
+
+_WORKER_SHM = None
+_WORKER_CUBE = None
+
+
+def _init_worker(name: str, shape: tuple) -> None:
+    global _WORKER_SHM, _WORKER_CUBE
+    _WORKER_SHM = shared_memory.SharedMemory(name=name)
+    _WORKER_CUBE = np.ndarray(shape, dtype=np.float64, buffer=_WORKER_SHM.buf)
+
+
+def _slice_panel(cube: np.ndarray, lo: int, hi: int) -> Panel:
+    """Küpün [lo, hi) hisse dilimi için kopyasız panel."""
+    return Panel(*(pd.DataFrame(cube[k, :, lo:hi], copy=False) for k in range(4)))
+
+
+def _latest_slice(bounds: tuple) -> tuple:
+    lo, hi = bounds
+    lv = latest_values(_slice_panel(_WORKER_CUBE, lo, hi))
+    return list(lv.columns), lv.to_numpy()
+
+
+def slices(n: int, jobs: int, min_slice: int = MIN_SLICE) -> list:
+    """n hisseyi en çok `jobs` dilime böl (dilim başına en az min_slice hisse)."""
+    parts = max(1, min(jobs, n // min_slice))
+    edges = np.linspace(0, n, parts + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def parallel_latest(panel: Panel, jobs: int | None = None,
+                    min_slice: int = MIN_SLICE) -> pd.DataFrame:
+    """
+    latest_values'un çok süreçli karşılığı. Tek dilime düşen (küçük) evrende
+    ya da jobs <= 1 iken doğrudan tek süreçte hesaplar.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    tickers = panel.tickers
+    bounds = slices(len(tickers), jobs, min_slice)
+    if jobs <= 1 or len(bounds) <= 1:
+        return latest_values(panel)
+
+    fields = (panel.close, panel.high, panel.low, panel.volume)
+    shape = (len(fields), *panel.close.shape)
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+    try:
+        cube = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        for k, frame in enumerate(fields):
+            cube[k] = frame.to_numpy(dtype=np.float64)
+        with ProcessPoolExecutor(max_workers=len(bounds), initializer=_init_worker,
+                                 initargs=(shm.name, shape)) as pool:
+            parts = list(pool.map(_latest_slice, bounds))
+        del cube
+    finally:
+        shm.close()
+        shm.unlink()
+
+    columns = parts[0][0]
+    return pd.DataFrame(np.concatenate([vals for _, vals in parts]),
+                        index=pd.Index(tickers), columns=columns)
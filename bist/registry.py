@@ -0,0 +1,161 @@
+"""
+Sembol Kaydı (Negatif Önbellek)
+===============================
+Yahoo'da çözülmeyen (veri yok) ya da yetersiz geçmişi olan (<60 bar)
+semboller sebep ve yeniden deneme zamanıyla kalıcı olarak kaydedilir.
+Taramalar bu sembolleri yeniden deneme zamanına kadar atlar; böylece
+KOZA1.IS gibi hatalı ya da işlemden kalkmış semboller her taramada indirme
+denemesi ve bekleme maliyeti yaratmaz.
+
+- Veri yok: art arda her başarısızlıkta bekleme ikiye katlanır (1 → 30 gün).
+- Yetersiz bar: yeni halka arzlar bar biriktirir, 7 gün sonra tekrar denenir.
+- Başarıyla puanlanan sembol kayıttan silinir.
+
+Manuel eklenen semboller tarama öncesi tek toplu istekle doğrulanır
+(validate_symbols); indirilen barlar depoya yazıldığından tarama aynı
+barları tekrar indirmez.
+"""
+
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from bist.config import data_path
+from bist.fetcher import NO_DATA, FetchPool
+from bist.metrics import FAILURE_LABELS, INSUFFICIENT_BARS
+from bist.panel import MIN_BARS
+from bist.state import clean_bars
+
+DEFAULT_DB = "symbols.sqlite"
+DAY = 24 * 3600
+NO_DATA_BACKOFF = (1 * DAY, 30 * DAY)   # (ilk bekleme, üst sınır)
+INSUFFICIENT_RETRY = 7 * DAY
+REASONS = (NO_DATA, INSUFFICIENT_BARS)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS symbols (
+    ticker      TEXT PRIMARY KEY,
+    reason      TEXT NOT NULL,
+    bars        INTEGER,
+    failures    INTEGER NOT NULL,
+    checked_at  REAL NOT NULL,
+    retry_after REAL NOT NULL
+);
+"""
+
+
+def retry_delay(reason: str, failures: int) -> float:
+    """Sebep ve art arda başarısızlık sayısına göre bekleme süresi (sn)."""
+    if reason == INSUFFICIENT_BARS:
+        return INSUFFICIENT_RETRY
+    first, cap = NO_DATA_BACKOFF
+    return min(first * 2 ** (failures - 1), cap)
+
+
+class SymbolRegistry:
+    """Geçersiz / yetersiz veri veren sembollerin kalıcı kaydı."""
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else data_path(DEFAULT_DB)
+        with closing(self._connect()) as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def record(self, failures: dict, now: float | None = None) -> None:
+        """
+        failures: {ticker: sebep} ya da {ticker: (sebep, bar sayısı)}.
+        Yalnızca kalıcı sebepler (REASONS) kaydedilir; kısıtlama/bağlantı
+        hataları geçicidir ve kayda girmez.
+        """
+        now = now or time.time()
+        items = {t: (v if isinstance(v, tuple) else (v, None)) for t, v in failures.items()}
+        items = {t: v for t, v in items.items() if v[0] in REASONS}
+        if not items:
+            return
+        with closing(self._connect()) as con, con:
+            prev = dict(con.execute(
+                f"SELECT ticker, failures FROM symbols WHERE ticker IN "
+                f"({','.join('?' * len(items))})", list(items)).fetchall())
+            rows = []
+            for tkr, (reason, bars) in items.items():
+                n = prev.get(tkr, 0) + 1
+                rows.append((tkr, reason, bars, n, now, now + retry_delay(reason, n)))
+            con.executemany("INSERT OR REPLACE INTO symbols VALUES (?,?,?,?,?,?)", rows)
+
+    def clear(self, tickers: list) -> None:
+        """Veri veren sembolleri kayıttan sil."""
+        tickers = list(tickers)
+        if not tickers:
+            return
+        with closing(self._connect()) as con, con:
+            con.executemany("DELETE FROM symbols WHERE ticker = ?", [(t,) for t in tickers])
+
+    def blocked(self, tickers: list, now: float | None = None) -> dict:
+        """Yeniden deneme zamanı gelmemiş semboller: {ticker: {"reason", "bars", "retry_after"}}."""
+        if not tickers:
+            return {}
+        now = now or time.time()
+        tickers = list(dict.fromkeys(tickers))
+        with closing(self._connect()) as con:
+            rows = con.execute(
+                f"SELECT ticker, reason, bars, retry_after FROM symbols "
+                f"WHERE retry_after > ? AND ticker IN ({','.join('?' * len(tickers))})",
+                [now, *tickers]).fetchall()
+        return {t: {"reason": r, "bars": b, "retry_after": ra} for t, r, b, ra in rows}
+
+    def table(self) -> pd.DataFrame:
+        with closing(self._connect()) as con:
+            return pd.read_sql_query("SELECT * FROM symbols ORDER BY ticker", con)
+
+
+def skipped_table(skipped: dict) -> pd.DataFrame:
+    """Atlanan semboller için arayüz tablosu (sembol, sebep, bar, yeniden deneme)."""
+    rows = [{"Sembol": t,
+             "Sebep": FAILURE_LABELS.get(s["reason"], s["reason"]),
+             "Bar": s.get("bars"),
+             "Yeniden Deneme": datetime.fromtimestamp(s["retry_after"]).strftime("%d.%m.%Y %H:%M")}
+            for t, s in sorted(skipped.items())]
+    df = pd.DataFrame(rows, columns=["Sembol", "Sebep", "Bar", "Yeniden Deneme"])
+    return df.astype({"Bar": "Int64"})
+
+
+def validate_symbols(tickers: list, store, registry: SymbolRegistry, period: str = "1y",
+                     pool: FetchPool | None = None, provider=None,
+                     offline: bool = False) -> dict:
+    """
+    Sembolleri tek toplu istekle doğrula (depo güncellenir). Kayıtta engelli
+    olanlar için ağa çıkılmaz. Dönüş: geçersizler {ticker: {"reason", "bars",
+    "retry_after"}}; geçerliler kayıttan silinir.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    invalid = registry.blocked(tickers)
+    rest = [t for t in tickers if t not in invalid]
+    if not rest:
+        return invalid
+
+    pool = pool or FetchPool()
+    if offline:
+        frames = store.read_many(rest)
+    else:
+        frames = store.update(rest, period=period, pool=pool, provider=provider)
+    failures = {}
+    for tkr in rest:
+        df = frames.get(tkr)
+        bars = 0 if df is None else len(clean_bars(df))
+        if bars == 0:
+            # Kısıtlama/bağlantı hatası ya da çevrimdışı modda depoda olmamak
+            # "veri yok" demek değildir
+            if not offline and pool.outcomes.get(tkr, NO_DATA) == NO_DATA:
+                failures[tkr] = (NO_DATA, 0)
+        elif bars < MIN_BARS:
+            failures[tkr] = (INSUFFICIENT_BARS, bars)
+    registry.record(failures)
+    registry.clear([t for t in rest if t not in failures and frames.get(t) is not None])
+    return {**invalid, **registry.blocked(list(failures))}
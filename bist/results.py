@@ -0,0 +1,175 @@
+"""
+Sonuç Şeması
+============
+Tarama sonuç tablosunun sabit, tipli şeması. Sayılar float32 (eksik = NaN),
+Ticker / Sektör / MACD etiketi / eleme sebebi kategorik, bayraklar gerçek
+bool'dur. Biçimlendirme ("N/A", "%12.3") yalnızca gösterimde yapılır
+(DISPLAY_FORMATS).
+
+score_universe sütun dizilerini önceden ayırıp (ResultColumns) maskelerle
+doldurur; satır sözlüğü listesi kurulmaz. Eski biçimdeki tablolar (karışık
+"N/A" metinleri, kayıtlı eski anlık görüntüler) conform ile şemaya çevrilir.
+"""
+
+import numpy as np
+import pandas as pd
+
+MACD_LABELS = ("🔥 Crossover", "📈 Hist. Büyüyor", "✅ Pozitif", "❌ Negatif", "-")
+MACD_NONE = "-"
+TREND_BELOW = "Trend Altı"
+ELIMINATION_REASONS = (TREND_BELOW,)
+TREND_LABELS = ("▲ Yukarı", "▼ Aşağı")
+
+MACD_DTYPE = pd.CategoricalDtype(MACD_LABELS)
+ELIMINATION_DTYPE = pd.CategoricalDtype(ELIMINATION_REASONS)
+TREND_DTYPE = pd.CategoricalDtype(TREND_LABELS)
+
+DETAIL_COLUMNS = ("PD/DD Skor", "F/K Skor", "Kar Büyüme Skor", "RSI Skor",
+                  "MACD Skor", "Hacim Skor", "ATR Skor",
+                  "MA Golden Cross Bonus", "MA50 Mesafe Bonus")
+# Çoklu zaman dilimi (bist.timeframes); kapalıyken boş kalır
+TIMEFRAME_COLUMNS = ("Haftalık Onay", "Haftalık Trend", "Haftalık RSI", "Haftalık ATR%",
+                     "Aylık Trend")
+
+# Sütun → tür: "float32" | "bool" | "category" (kategoriler veriden) | CategoricalDtype
+SCHEMA = {
+    "Ticker":       "category",
+    "Fiyat":        "float32",
+    "Sektör":       "category",
+    "Toplam Skor":  "float32",
+    "Temel Skor":   "float32",
+    "Teknik Skor":  "float32",
+    "RSI":          "float32",
+    "MACD Sinyal":  MACD_DTYPE,
+    "Hacim OK":     "bool",
+    "MA50 Üzeri":   "bool",
+    "MA200 Üzeri":  "bool",
+    "ATR%":         "float32",
+    "PD/DD":        "float32",
+    "F/K":          "float32",
+    "Kar Büyümesi": "float32",   # yüzde (12.3 = %12.3)
+    "Elendi":       ELIMINATION_DTYPE,
+    **{c: "float32" for c in DETAIL_COLUMNS},
+    "Haftalık Onay":  "float32",
+    "Haftalık Trend": TREND_DTYPE,
+    "Haftalık RSI":   "float32",
+    "Haftalık ATR%":  "float32",
+    "Aylık Trend":    TREND_DTYPE,
+}
+
+# Gösterim biçimleri (Styler.format / st.column_config ile); eksik = "N/A"
+DISPLAY_FORMATS = {
+    "Fiyat":        "{:.2f}",
+    "Toplam Skor":  "{:.0f}",
+    "Temel Skor":   "{:.0f}",
+    "Teknik Skor":  "{:.0f}",
+    "RSI":          "{:.1f}",
+    "ATR%":         "{:.2f}%",
+    "PD/DD":        "{:.2f}",
+    "F/K":          "{:.2f}",
+    "Kar Büyümesi": "{:.1f}%",
+    **{c: "{:.0f}" for c in DETAIL_COLUMNS},
+    "Haftalık Onay": "{:.0f}",
+    "Haftalık RSI":  "{:.1f}",
+    "Haftalık ATR%": "{:.2f}%",
+}
+NA_REP = "N/A"
+
+
+def display_formats(columns) -> dict:
+    """Verilen sütunlar için DISPLAY_FORMATS alt kümesi."""
+    return {c: f for c, f in DISPLAY_FORMATS.items() if c in columns}
+
+
+class ResultColumns:
+    """
+    n satırlık önceden ayrılmış sütunlar. Kategorik sütunlar kod dizisi
+    (-1 = eksik) ve kategori listesiyle tutulur.
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self.values: dict = {}
+        self.categories: dict = {}
+        for name, kind in SCHEMA.items():
+            if kind == "float32":
+                self.values[name] = np.full(n, np.nan, dtype=np.float32)
+            elif kind == "bool":
+                self.values[name] = np.zeros(n, dtype=bool)
+            else:
+                self.values[name] = np.full(n, -1, dtype=np.int32)
+                self.categories[name] = (list(kind.categories)
+                                         if isinstance(kind, pd.CategoricalDtype) else [])
+
+    def __setitem__(self, name: str, value) -> None:
+        self.values[name][:] = value
+
+    def put(self, name: str, mask, value) -> None:
+        """mask satırlarına değer yaz (sayı/bool)."""
+        self.values[name][mask] = np.asarray(value)[mask] if np.ndim(value) else value
+
+    def set_labels(self, name: str, labels, mask=None) -> None:
+        """
+        Kategorik sütuna etiket yaz. Sabit kategorili sütunlara (MACD, eleme)
+        tekrar tekrar yazılabilir; veri kaynaklı sütunlarda (Ticker, Sektör)
+        kategoriler bu tek çağrıdaki etiketlerden sıralı kurulur.
+        """
+        labels = np.asarray(labels, dtype=object)
+        if mask is not None:
+            labels = labels[mask]
+        if not isinstance(SCHEMA[name], pd.CategoricalDtype):
+            self.categories[name] = sorted(set(labels))
+        cats = self.categories[name]
+        codes = pd.Index(cats).get_indexer(labels)
+        if (codes < 0).any():
+            raise ValueError(f"{name}: şemada olmayan etiket "
+                             f"{sorted(set(labels[codes < 0]))}")
+        if mask is None:
+            self.values[name][:] = codes
+        else:
+            self.values[name][mask] = codes
+
+    def frame(self) -> pd.DataFrame:
+        cols = {}
+        for name, kind in SCHEMA.items():
+            if name in self.categories:
+                dtype = (kind if isinstance(kind, pd.CategoricalDtype)
+                         else pd.CategoricalDtype(self.categories[name]))
+                cols[name] = pd.Categorical.from_codes(self.values[name], dtype=dtype)
+            else:
+                cols[name] = self.values[name]
+        return pd.DataFrame(cols)
+
+
+def _numeric(s: pd.Series) -> pd.Series:
+    if s.dtype == object:
+        # Eski biçim: "N/A", "12.3%" metinleri
+        s = s.map(lambda v: v.rstrip("%") if isinstance(v, str) else v)
+    return pd.to_numeric(s, errors="coerce").astype(np.float32)
+
+
+def conform(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tabloyu şemaya çevir (eksik sütunlar eklenir, şema dışı sütunlar sona
+    kalır). score_ticker kayıtları ve eski anlık görüntüler için.
+    """
+    out = {}
+    for name, kind in SCHEMA.items():
+        s = df[name] if name in df else pd.Series([None] * len(df), index=df.index)
+        if kind == "float32":
+            out[name] = _numeric(s)
+        elif kind == "bool":
+            out[name] = s.fillna(False).astype(bool)
+        elif isinstance(kind, pd.CategoricalDtype):
+            out[name] = s.astype(object).where(s.notna(), None).astype(kind)
+        else:
+            cats = sorted(s.dropna().astype(str).unique())
+            out[name] = s.astype(object).where(s.notna(), None).astype(
+                pd.CategoricalDtype(cats))
+    extra = [c for c in df.columns if c not in SCHEMA]
+    return pd.DataFrame(out, index=df.index).join(df[extra]) if extra else pd.DataFrame(out)
+
+
+def records_frame(records: list) -> pd.DataFrame:
+    """score_ticker sözlük listesini şemaya uygun tabloya çevir."""
+    return conform(pd.DataFrame(records))
@@ -0,0 +1,726 @@
+"""
+Tarama ve Puanlama Çekirdeği
+============================
+Streamlit'ten bağımsız tarama kütüphanesi: tek hisse puanlama (score_ticker),
+sektör istatistikleri ve tüm evreni tarayan run_scan. Hem Streamlit arayüzü
+(app.py) hem de komut satırı (python -m bist) bu modülü kullanır.
+"""
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from bist.data import period_start
+from bist.fetcher import (DEFAULT_RATE, DEFAULT_WORKERS, ERROR, NO_DATA, OK,
+                          THROTTLED, FetchPool, TokenBucket, classify_error)
+from bist.fundamentals import DEFAULT_TTL, FundamentalsCache
+from bist.indicators import calculate_atr, calculate_macd, calculate_rsi
+from bist.metrics import (EXCEPTION, INSUFFICIENT_BARS, NOT_IN_STORE,
+                          ScanMetrics)
+from bist.panel import build_panel, latest_values, score_universe, trend_filter
+from bist.parallel import BACKENDS, PROCESS, SERIAL, parallel_latest
+from bist.registry import REASONS, SymbolRegistry
+from bist.state import IndicatorStateStore, clean_bars
+from bist.store import OHLCVStore
+from bist.timeframes import OFF, TIMEFRAMES, timeframe_values
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ANA PUANLAMA FONKSİYONU
+# ─────────────────────────────────────────────────────────────────────────────
+
+def score_ticker(ticker: str, sector_stats: dict,
+                 raw: pd.DataFrame | None = None,
+                 fundamentals: FundamentalsCache | None = None,
+                 metrics: ScanMetrics | None = None) -> dict | None:
+    """
+    Bir hisse için temel + teknik analiz puanı hesapla.
+    raw verilirse (toplu indirmeden gelen OHLCV) tekrar indirme yapılmaz.
+    fundamentals verilirse .info önbellekten okunur (TTL içinde ağ yok).
+    metrics verilirse aşama süreleri ve hata sebebi kaydedilir.
+    Dönüş: dict (skor ve detaylar) ya da None (hata/yetersiz veri). Eksik
+    temel değerler None'dır; tabloya bist.results.records_frame ile çevrilir.
+    """
+    stage, t0 = "download", time.perf_counter()
+
+    def _lap(next_stage):
+        nonlocal stage, t0
+        now = time.perf_counter()
+        if metrics is not None:
+            metrics.record(stage, ticker, now - t0)
+        stage, t0 = next_stage, now
+
+    try:
+        # ── Veri İndir ──────────────────────────────────────────────────────
+        # 1 yıllık günlük veri (MA200 için yeterli)
+        if raw is None:
+            raw = yf.download(ticker, period="1y", interval="1d",
+                              auto_adjust=True, progress=False)
+        _lap("cleaning")
+        if raw is None or len(raw) < 60:
+            if metrics is not None:
+                empty = raw is None or raw.empty
+                metrics.fail(ticker, "download" if empty else stage,
+                             NO_DATA if empty else INSUFFICIENT_BARS)
+            return None
+
+        # MultiIndex sütunları düzleştir
+        if isinstance(raw.columns, pd.MultiIndex):
+            raw.columns = raw.columns.get_level_values(0)
+
+        raw = raw.dropna(subset=["Close", "High", "Low", "Volume"])
+        if len(raw) < 60:
+            if metrics is not None:
+                metrics.fail(ticker, stage, INSUFFICIENT_BARS)
+            return None
+        _lap("indicators")
+
+        close = raw["Close"].squeeze()
+        high  = raw["High"].squeeze()
+        low   = raw["Low"].squeeze()
+        vol   = raw["Volume"].squeeze()
+
+        # ── Hareketli Ortalamalar ────────────────────────────────────────────
+        ma50  = close.rolling(50).mean()
+        ma200 = close.rolling(200).mean()
+        current_price = float(close.iloc[-1])
+        ma50_val  = float(ma50.iloc[-1])
+        ma200_val = float(ma200.iloc[-1]) if not np.isnan(ma200.iloc[-1]) else None
+
+        # ZORUNLU TREND FİLTRESİ: Fiyat MA50 VE MA200 üzerinde olmalı
+        # MA200 mevcut değilse (< 200 gün veri) sadece MA50 kontrolü yap
+        above_ma50  = current_price > ma50_val
+        above_ma200 = (ma200_val is None) or (current_price > ma200_val)
+
+        trend_ok = above_ma50 and above_ma200
+        if not trend_ok:
+            # Elendi – düşük skor döndür ama kaydı tut
+            _lap(None)
+            return {
+                "Ticker": ticker, "Fiyat": round(current_price, 2),
+                "Toplam Skor": 0, "Temel Skor": 0, "Teknik Skor": 0,
+                "RSI": None, "MACD Sinyal": "-", "Hacim OK": False,
+                "MA50 Üzeri": above_ma50, "MA200 Üzeri": above_ma200,
+                "Elendi": "Trend Altı"
+            }
+
+        # ── RSI ─────────────────────────────────────────────────────────────
+        rsi_series = calculate_rsi(close, 14)
+        rsi_val = float(rsi_series.iloc[-1]) if not rsi_series.empty else 50.0
+
+        # ── MACD ─────────────────────────────────────────────────────────────
+        macd_line, signal_line, histogram = calculate_macd(close)
+        macd_val   = float(macd_line.iloc[-1])
+        signal_val = float(signal_line.iloc[-1])
+        hist_val   = float(histogram.iloc[-1])
+        hist_prev  = float(histogram.iloc[-2]) if len(histogram) > 1 else 0.0
+
+        # MACD crossover: önceki bar'da MACD < Signal, şimdi MACD > Signal
+        macd_cross = (float(macd_line.iloc[-2]) < float(signal_line.iloc[-2])) and (macd_val > signal_val)
+        # Histogram pozitif ve büyüyor
+        hist_growing = hist_val > 0 and hist_val > hist_prev
+
+        # ── Hacim ───────────────────────────────────────────────────────────
+        vol_5d  = float(vol.iloc[-5:].mean())
+        vol_20d = float(vol.iloc[-20:].mean())
+        volume_ok = vol_5d > vol_20d
+
+        # ── ATR (Volatilite) ─────────────────────────────────────────────────
+        atr_series = calculate_atr(high, low, close, 14)
+        atr_val = float(atr_series.iloc[-1])
+        atr_pct = (atr_val / current_price) * 100  # Fiyata göre % ATR
+
+        # ── Temel Analiz Verisi ──────────────────────────────────────────────
+        _lap("fundamentals")
+        info = {}
+        try:
+            if fundamentals is not None:
+                info = fundamentals.get(ticker)
+            else:
+                info = yf.Ticker(ticker).info or {}
+        except Exception as e:
+            # .info alınamazsa temel skorlar nötr kalır; sebep yine de kaydedilir
+            if metrics is not None:
+                metrics.fail(ticker, stage, classify_error(e), f"{type(e).__name__}: {e}")
+        _lap("scoring")
+
+        pb_ratio = info.get("priceToBook", None)
+        pe_ratio = info.get("trailingPE", None) or info.get("forwardPE", None)
+        earnings_growth = info.get("earningsQuarterlyGrowth", None)  # Çeyreklik kar büyümesi
+        revenue_growth  = info.get("revenueGrowth", None)
+        sector = info.get("sector", "Unknown")
+
+        # ─────────────────────────────────────────────────────────────────────
+        # PUANLAMA
+        # ─────────────────────────────────────────────────────────────────────
+        temel_skor    = 0
+        teknik_skor   = 0
+        skor_detay    = {}
+
+        # ── 1. TEMEL ANALİZ (Maks 40) ────────────────────────────────────────
+
+        # 1a. PD/DD – Maks 15 Puan
+        # Sektör ortalaması yoksa sabit eşikler kullan
+        pb_skor = 0
+        if pb_ratio is not None and pb_ratio > 0:
+            sektör_pb_ort = sector_stats.get(sector, {}).get("pb_mean", 3.0)
+            if pb_ratio < sektör_pb_ort * 0.5:
+                pb_skor = 15     # Sektörün yarısından ucuz
+            elif pb_ratio < sektör_pb_ort * 0.75:
+                pb_skor = 12
+            elif pb_ratio < sektör_pb_ort:
+                pb_skor = 8
+            elif pb_ratio < sektör_pb_ort * 1.25:
+                pb_skor = 4
+            else:
+                pb_skor = 0
+        else:
+            pb_skor = 5  # Veri yok → nötr puan
+        skor_detay["PD/DD Skor"] = pb_skor
+        temel_skor += pb_skor
+
+        # 1b. F/K – Maks 15 Puan
+        pe_skor = 0
+        if pe_ratio is not None and pe_ratio > 0:
+            sektör_pe_ort = sector_stats.get(sector, {}).get("pe_mean", 15.0)
+            if pe_ratio < sektör_pe_ort * 0.5:
+                pe_skor = 15
+            elif pe_ratio < sektör_pe_ort * 0.75:
+                pe_skor = 12
+            elif pe_ratio < sektör_pe_ort:
+                pe_skor = 8
+            elif pe_ratio < sektör_pe_ort * 1.5:
+                pe_skor = 4
+            elif pe_ratio > 0:
+                pe_skor = 1
+        else:
+            pe_skor = 5  # Veri yok → nötr
+        skor_detay["F/K Skor"] = pe_skor
+        temel_skor += pe_skor
+
+        # 1c. Net Kar Büyümesi – Maks 10 Puan
+        eg_skor = 0
+        if earnings_growth is not None:
+            if earnings_growth > 0.50:
+                eg_skor = 10   # %50+ büyüme
+            elif earnings_growth > 0.25:
+                eg_skor = 8
+            elif earnings_growth > 0.10:
+                eg_skor = 6
+            elif earnings_growth > 0:
+                eg_skor = 4
+            else:
+                eg_skor = 0   # Kar düşüşü → puan yok
+        else:
+            # Gelir büyümesini yedek olarak kullan
+            if revenue_growth is not None and revenue_growth > 0.15:
+                eg_skor = 4
+            else:
+                eg_skor = 3   # Veri yok → düşük nötr
+        skor_detay["Kar Büyüme Skor"] = eg_skor
+        temel_skor += eg_skor
+
+        # ── 2. TEKNİK ANALİZ (Maks 60) ───────────────────────────────────────
+
+        # 2a. RSI – Maks 20 Puan
+        rsi_skor = 0
+        if rsi_val < 30:
+            rsi_skor = 2    # Aşırı satım ama trend kötü olabilir
+        elif rsi_val < 40:
+            rsi_skor = 8
+        elif rsi_val < 50:
+            rsi_skor = 12
+        elif rsi_val <= 60:
+            rsi_skor = 20   # Altın bölge: momentum var, henüz aşırı alım yok
+        elif rsi_val <= 70:
+            rsi_skor = 15   # Güçlü ama biraz fazla ısınmış
+        elif rsi_val <= 80:
+            rsi_skor = 7    # Aşırı alım bölgesi
+        else:
+            rsi_skor = 2    # Ekstrem aşırı alım
+        skor_detay["RSI Skor"] = rsi_skor
+        teknik_skor += rsi_skor
+
+        # 2b. MACD – Maks 20 Puan
+        macd_skor = 0
+        if macd_cross:
+            macd_skor = 20   # Tam crossover – en güçlü sinyal
+        elif hist_growing and macd_val > 0:
+            macd_skor = 16   # MACD pozitif ve histogram büyüyor
+        elif hist_growing and macd_val < 0:
+            macd_skor = 10   # Histogram büyüyor ama MACD hala negatif
+        elif hist_val > 0:
+            macd_skor = 8    # Histogram pozitif ama büyümüyor
+        elif macd_val > signal_val:
+            macd_skor = 5    # MACD sinyalin üzerinde ama histogram küçülüyor
+        else:
+            macd_skor = 0
+        skor_detay["MACD Skor"] = macd_skor
+        teknik_skor += macd_skor
+
+        # 2c. Hacim – Maks 10 Puan
+        hacim_skor = 0
+        if vol_5d > 0 and vol_20d > 0:
+            vol_ratio = vol_5d / vol_20d
+            if vol_ratio > 2.0:
+                hacim_skor = 10   # Hacim patlaması
+            elif vol_ratio > 1.5:
+                hacim_skor = 8
+            elif vol_ratio > 1.2:
+                hacim_skor = 6
+            elif vol_ratio > 1.0:
+                hacim_skor = 4
+            else:
+                hacim_skor = 0    # Hacim düşük → ilgi yok
+        skor_detay["Hacim Skor"] = hacim_skor
+        teknik_skor += hacim_skor
+
+        # 2d. ATR Volatilite – Maks 10 Puan
+        # Swing trade için ideal ATR: %1.5 – %4.5 arası
+        atr_skor = 0
+        if atr_pct < 0.8:
+            atr_skor = 1    # Çok hareketsiz, swing için fırsat yok
+        elif atr_pct < 1.5:
+            atr_skor = 4
+        elif atr_pct <= 3.0:
+            atr_skor = 10   # İdeal swing volatilitesi
+        elif atr_pct <= 4.5:
+            atr_skor = 7
+        elif atr_pct <= 6.0:
+            atr_skor = 4    # Biraz riskli ama kabul edilebilir
+        else:
+            atr_skor = 1    # Aşırı volatil = risk yüksek
+        skor_detay["ATR Skor"] = atr_skor
+        teknik_skor += atr_skor
+
+        # ── EKSTRA FAKTÖRLER (Bonus/Ceza) ────────────────────────────────────
+        # 2e. MA Üçlü Düzeni: MA50 > MA200 (Altın Çapraz yapısı) +5 Bonus
+        if ma200_val and ma50_val > ma200_val:
+            bonus = 5
+            skor_detay["MA Golden Cross Bonus"] = bonus
+            teknik_skor += bonus
+        else:
+            skor_detay["MA Golden Cross Bonus"] = 0
+
+        # 2f. Fiyatın MA50'ye Yakınlığı: MA50'nin %2-8 üzerinde ideal pozisyon
+        ma50_dist_pct = ((current_price - ma50_val) / ma50_val) * 100
+        if 2 <= ma50_dist_pct <= 8:
+            prox_bonus = 5
+        elif 8 < ma50_dist_pct <= 15:
+            prox_bonus = 2   # Biraz uzaklaşmış ama tamam
+        elif ma50_dist_pct > 15:
+            prox_bonus = 0   # Çok uzaklaşmış, geri çekilme riski
+        else:
+            prox_bonus = 3   # MA50'ye çok yakın ama üzerinde
+        skor_detay["MA50 Mesafe Bonus"] = prox_bonus
+        teknik_skor += prox_bonus
+
+        # ── SINIR KONTROLÜ ───────────────────────────────────────────────────
+        temel_skor  = min(temel_skor, 40)
+        teknik_skor = min(teknik_skor, 60)
+        toplam_skor = temel_skor + teknik_skor
+
+        # MACD sinyal etiketi
+        if macd_cross:
+            macd_label = "🔥 Crossover"
+        elif hist_growing:
+            macd_label = "📈 Hist. Büyüyor"
+        elif hist_val > 0:
+            macd_label = "✅ Pozitif"
+        else:
+            macd_label = "❌ Negatif"
+
+        _lap(None)
+        return {
+            "Ticker":        ticker,
+            "Fiyat":         round(current_price, 2),
+            "Sektör":        sector,
+            "Toplam Skor":   round(toplam_skor, 1),
+            "Temel Skor":    round(temel_skor, 1),
+            "Teknik Skor":   round(teknik_skor, 1),
+            "RSI":           round(rsi_val, 1),
+            "MACD Sinyal":   macd_label,
+            "Hacim OK":      volume_ok,
+            "MA50 Üzeri":    above_ma50,
+            "MA200 Üzeri":   above_ma200,
+            "ATR%":          round(atr_pct, 2),
+            "PD/DD":         round(pb_ratio, 2) if pb_ratio else None,
+            "F/K":           round(pe_ratio, 2) if pe_ratio else None,
+            "Kar Büyümesi":  round(earnings_growth * 100, 1) if earnings_growth else None,
+            "Elendi":        None,
+            **skor_detay
+        }
+
+    except Exception as e:
+        if metrics is not None:
+            metrics.fail(ticker, stage, EXCEPTION, f"{type(e).__name__}: {e}")
+        return None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SEKTÖR İSTATİSTİKLERİ
+# (Tüm evren, temel veri önbelleğinden sürekli güncellenir; bkz. bist.sectors)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def build_sector_stats(fundamentals: FundamentalsCache | None = None,
+                       fundamentals_ttl: float = DEFAULT_TTL) -> dict:
+    """
+    Sektör bazlı F/K ve PD/DD tabanları (budanmış ortalama). Önbelleğe şimdiye
+    kadar yazılmış tüm .info'lardan kalıcı olarak toplanır; ağ çağrısı yapmaz.
+    """
+    fundamentals = fundamentals or FundamentalsCache(ttl=fundamentals_ttl)
+    return fundamentals.sector_stats()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TAM TARAMA
+# ─────────────────────────────────────────────────────────────────────────────
+
+# Ara sonuçlar en çok bu aralıkta bir yayınlanır (sn)
+PARTIAL_INTERVAL = 0.5
+
+
+class PartialResults:
+    """
+    Tarama sürerken puanlanabilen hisseleri ara sonuç olarak yayınlar: faz 1'de
+    fiyat parçaları geldikçe elenenler ve .info'su önbellekte olan trendi
+    geçenler, faz 2'de .info'su gelenler. Yayın sıklığı `interval` ile
+    sınırlıdır; her yayın o ana kadar hazır olan satırları tek vektörel geçişte
+    puanlar (500 hissede birkaç ms). Sektör tabanları tarama başındaki hâliyle
+    kullanılır; nihai sonuç (tabanlar faz 2'deki .info'larla güncel) run_scan
+    dönüşündedir.
+    """
+
+    def __init__(self, sector_stats: dict,
+                 callback: Callable[[pd.DataFrame, int, int], None], total: int,
+                 interval: float = PARTIAL_INTERVAL):
+        self.sector_stats = sector_stats
+        self.callback = callback
+        self.total = total
+        self.interval = interval
+        self.latest: list = []       # indikatör satırları, parça parça
+        self.timeframes: list = []   # haftalık / aylık değerler, parça parça
+        self.ready: dict = {}        # puanlanabilir hisseler: ticker → .info
+        self.published = 0
+        self.last = 0.0
+
+    def add(self, infos: dict, latest: pd.DataFrame | None = None,
+            timeframes: pd.DataFrame | None = None) -> None:
+        """Puanlanabilir hisseler ({ticker: .info}) ve yeni parçanın indikatör satırları."""
+        if latest is not None:
+            self.latest.append(latest)
+        if timeframes is not None:
+            self.timeframes.append(timeframes)
+        self.ready.update(infos)
+
+    def due(self) -> bool:
+        """Son yayından bu yana `interval` geçti mi."""
+        return time.monotonic() - self.last >= self.interval
+
+    def reset(self, latest: pd.DataFrame, timeframes: pd.DataFrame | None,
+              total: int) -> None:
+        """Faz 1 sonu: parça satırları tüm evrenin kesin değerleriyle değiştirilir."""
+        self.latest = [latest]
+        self.timeframes = [] if timeframes is None else [timeframes]
+        self.ready, self.published, self.total = {}, 0, total
+
+    def publish(self, force: bool = False) -> None:
+        """Hazır satırları puanla ve sıralı ara sonucu yayınla (aralık dolduysa)."""
+        if len(self.ready) == self.published:
+            return
+        if not force and not self.due():
+            return
+        self.latest = [_stack(self.latest)]
+        tf = None
+        if self.timeframes:
+            self.timeframes = [_stack(self.timeframes)]
+            tf = self.timeframes[0]
+        rows = score_universe(None, self.ready, self.sector_stats,
+                              self.latest[0].loc[list(self.ready)], tf)
+        rows = rows.sort_values("Toplam Skor", ascending=False, kind="stable",
+                                ignore_index=True)
+        self.published = len(self.ready)
+        self.callback(rows, len(rows), self.total)
+        self.last = time.monotonic()
+
+
+def _stack(frames: list) -> pd.DataFrame:
+    """Parça tablolarını birleştir; aynı hisse için son gelen satır geçerlidir."""
+    parts = [f for f in frames if len(f)] or frames[:1]
+    df = pd.concat(parts) if len(parts) > 1 else parts[0]
+    return df[~df.index.duplicated(keep="last")]
+
+
+@dataclass
+class ScanReport:
+    """run_scan çıktısı."""
+    results: pd.DataFrame              # Toplam Skor'a göre azalan sıralı tüm sonuçlar
+    scanned: int                       # Taranan hisse sayısı
+    errors: int                        # Veri alınamayan / yetersiz veri
+    fetch_summary: Counter = field(default_factory=Counter)   # ok / no_data / throttled / error
+    metrics: ScanMetrics = field(default_factory=ScanMetrics)  # aşama süreleri, hata sebepleri
+    skipped: dict = field(default_factory=dict)  # sembol kaydınca atlananlar: {ticker: sebep/zaman}
+    timeframes: str = OFF              # çoklu zaman dilimi: haftalık onaylı skorlar farklı ölçekte
+
+
+def run_scan(scan_list: list, sector_stats: dict | None = None, *,
+             offline: bool = False, rate: float = DEFAULT_RATE,
+             workers: int = DEFAULT_WORKERS, fundamentals_ttl: float = DEFAULT_TTL,
+             period: str = "1y",
+             progress_cb: Callable[[str, int, int], None] | None = None,
+             store: OHLCVStore | None = None,
+             fundamentals: FundamentalsCache | None = None,
+             provider=None, incremental: bool = True,
+             indicator_state: IndicatorStateStore | None = None,
+             backend: str = SERIAL, jobs: int | None = None,
+             registry: SymbolRegistry | None = None,
+             skip_invalid: bool = True, checkpoint=None, timeframes: str = OFF,
+             partial_cb: Callable[[pd.DataFrame, int, int], None] | None = None
+             ) -> ScanReport:
+    """
+    Listeyi üç fazda tara ve puanla:
+    1. Fiyat + trend filtresi: yerel depo güncellenir (offline=True ise
+       yalnızca okunur), indikatörler ve MA50/MA200 filtresi tüm evren için
+       tek vektörel geçişte. incremental=True ise kalıcı indikatör durumu
+       yalnızca yeni barlarla ilerletilir (bist.state); False ise `period`
+       penceresi baştan hesaplanır. backend="process" ise panel paylaşımlı
+       bellekte `jobs` işçi sürece bölünerek baştan hesaplanır (bist.parallel;
+       artımlı durum kullanılmaz, sonuç aynıdır).
+    2. Temel veri: .info yalnızca trendi geçenler için (önbellekten / eşzamanlı).
+    3. Puanlama. sector_stats verilmezse tüm evren sektör tabanları (faz 2'de
+       gelenler dahil) temel veri önbelleğinden okunur.
+    Sembol kaydında (bist.registry) yeniden deneme zamanı gelmemiş semboller
+    skip_invalid=True iken taranmaz (report.skipped); veri yok / yetersiz bar
+    veren semboller kayda yazılır, puanlananlar kayıttan silinir.
+    checkpoint (bist.checkpoint.ScanRun) verilirse fiyat aşamasında bu koşuda
+    tamamlanan hisseler parça parça kaydedilir; yarıda kesilip aynı
+    parametrelerle yeniden başlatılan tarama bunları tekrar indirmez.
+    timeframes="weekly" | "weekly_monthly" ise trendi geçenlerin günlük
+    barları haftalık / aylık örneklenir (bist.timeframes; ağ erişimi yok) ve
+    haftalık onay puanı skora eklenir.
+    partial_cb(ara sonuç, puanlanan, toplam) verilirse tarama sürerken (en çok
+    PARTIAL_INTERVAL'de bir) o ana kadar puanlanabilen hisseler Toplam Skor'a
+    göre sıralı yayınlanır: indirme gerektirmeyenler hemen, diğerleri fiyat
+    parçaları geldikçe, .info bekleyenler faz 2'de geldikçe (bkz. PartialResults).
+    progress_cb(aşama, tamamlanan, toplam): aşama "download" | "fundamentals".
+    Faz başına giren/geçen hisse sayısı ve süre report.metrics.phases'te,
+    aşama süreleri ve hisse bazında hata sebepleri report.metrics'tedir.
+    """
+    # İndirme ve .info ayrı havuzlarda (durum/süre kayıtları karışmasın),
+    # aynı istek bütçesini paylaşır
+    limiter = TokenBucket(rate)
+    price_pool = FetchPool(max_workers=workers, limiter=limiter)
+    info_pool = FetchPool(max_workers=workers, limiter=limiter)
+    if backend not in BACKENDS:
+        raise ValueError(f"Geçersiz hesaplama arka ucu: {backend}")
+    if timeframes not in TIMEFRAMES:
+        raise ValueError(f"Geçersiz zaman dilimi: {timeframes}")
+    metrics = ScanMetrics()
+    store = store or OHLCVStore()
+    fundamentals = fundamentals or FundamentalsCache(
+        ttl=fundamentals_ttl, fetcher=provider.info if provider else None)
+
+    def _progress(stage):
+        return (lambda done, total: progress_cb(stage, done, total)) if progress_cb else None
+
+    registry = registry or SymbolRegistry()
+    skipped = registry.blocked(scan_list) if skip_invalid else {}
+    scan_list = [t for t in dict.fromkeys(scan_list) if t not in skipped]
+
+    partial = None
+    if partial_cb:
+        partial = PartialResults(sector_stats if sector_stats is not None
+                                 else build_sector_stats(fundamentals),
+                                 partial_cb, len(scan_list))
+
+    def provisional(tickers: list) -> None:
+        """Depoda hazır hisseleri faz 1 bitmeden ara sonuca ekle (kalıcı duruma dokunmaz)."""
+        frames = store.read_many(tickers, period_start(period))
+        if not frames:
+            return
+        rows = latest_values(build_panel(frames))
+        above50, above200 = trend_filter(rows["price"], rows["ma50"], rows["ma200"])
+        passed = list(rows.index[above50 & above200])
+        # Elenenler .info'suz, trendi geçenler .info'su önbellekteyse puanlanır
+        infos = {t: {} for t in rows.index.difference(passed)}
+        infos.update(fundamentals.get_many(passed))
+        partial.add(infos, rows,
+                    timeframe_values({t: frames[t] for t in passed}, timeframes))
+        partial.publish()
+
+    # ── Faz 1: Fiyat + trend filtresi (tüm evren, yalnızca fiyat verisi) ─────
+    with metrics.phase("prices", len(scan_list)) as ph:
+        resumed = checkpoint.done("prices") if checkpoint and not offline else {}
+        for tkr, status in resumed.items():
+            if status != OK:
+                price_pool.record(tkr, status)   # "veri yok" sınıflandırması korunur
+
+        waiting = []   # yazılmış, henüz ara sonuca eklenmemiş hisseler
+
+        def written(tickers):
+            if checkpoint:
+                checkpoint.mark("prices", dict.fromkeys(tickers, OK))
+            if partial:
+                # Parçalar hızlı gelirse okuma / indikatör geçişi yayın aralığına toplanır;
+                # kalanlar faz 1 sonunda kesin değerlerle yayınlanır
+                waiting.extend(tickers)
+                if partial.due():
+                    provisional(waiting)
+                    waiting.clear()
+
+        with metrics.stage("download"):
+            if not offline:
+                to_fetch = [t for t in scan_list if t not in resumed]
+                if partial:
+                    # İndirme gerektirmeyenler (güncel / kontrol noktasından) hemen
+                    stale = set(store.stale(to_fetch, period))
+                    provisional([t for t in scan_list if t not in stale])
+                store.update(to_fetch, period=period, pool=price_pool, provider=provider,
+                             progress_cb=_progress("download"), read=False,
+                             written_cb=written if checkpoint or partial else None)
+                if checkpoint:
+                    # Güncel olduğu için indirilmeyenler de tamamlandı; kısıtlanan /
+                    # hata alanlar sonraki denemede yeniden istenir
+                    final = {t: price_pool.outcomes.get(t, OK) for t in to_fetch}
+                    checkpoint.mark("prices", {t: st for t, st in final.items()
+                                               if st in (OK, NO_DATA)})
+        for tkr, seconds in price_pool.timings.items():
+            metrics.record("download", tkr, seconds)
+
+        panel = None
+        if incremental and backend == SERIAL:
+            indicator_state = indicator_state or IndicatorStateStore()
+            with metrics.stage("indicators"):
+                latest = indicator_state.latest(store, scan_list, period)
+            metrics.share("indicators", list(latest.index), metrics.wall["indicators"])
+            in_store = set(store.last_dates(scan_list))
+        else:
+            with metrics.stage("cleaning"):
+                price_data = store.read_many(scan_list, period_start(period))
+                panel = build_panel({t: price_data[t] for t in scan_list if t in price_data})
+            metrics.share("cleaning", list(panel.tickers), metrics.wall["cleaning"])
+            with metrics.stage("indicators", list(panel.tickers)):
+                latest = (parallel_latest(panel, jobs) if backend == PROCESS
+                          else latest_values(panel))
+            in_store = set(price_data)
+        above_ma50, above_ma200 = trend_filter(latest["price"], latest["ma50"], latest["ma200"])
+        survivors = list(latest.index[above_ma50 & above_ma200])
+
+        # Haftalık / aylık barlar yalnızca trendi geçenler için, depodaki
+        # günlük barlardan örneklenir (ek indirme yok)
+        tf_values = None
+        if timeframes != OFF:
+            with metrics.stage("timeframes", survivors):
+                daily = (price_data if panel is not None
+                         else store.read_many(survivors, period_start(period)))
+                tf_values = timeframe_values({t: daily[t] for t in survivors if t in daily},
+                                             timeframes)
+        ph["passed"] = len(survivors)
+        ph["note"] = (f"{len(latest)} hissede yeterli veri, "
+                      f"{len(latest) - len(survivors)} trend altı"
+                      + (f", {len(skipped)} geçersiz sembol atlandı" if skipped else "")
+                      + (f", {len(resumed)} hisse kontrol noktasından" if resumed else ""))
+
+    # ── Faz 2: Temel veri (yalnızca trendi geçenler, eşzamanlı) ─────────────
+    with metrics.phase("fundamentals", len(survivors)) as ph:
+        on_info = None
+        if partial:
+            # Ara satırlar kesin indikatörlerle yenilenir; elenenler .info'suz,
+            # önbellekte .info'su olanlar hemen puanlanır
+            partial.reset(latest, tf_values, len(latest))
+            passed = set(survivors)
+            partial.add({t: {} for t in latest.index if t not in passed})
+            partial.add(fundamentals.get_many(survivors))
+            partial.publish(force=True)
+
+            def on_info(tkr, info):
+                partial.add({tkr: info or {}})
+                partial.publish()
+        with metrics.stage("fundamentals"):
+            infos = fundamentals.fill(survivors, info_pool,
+                                      progress_cb=_progress("fundamentals"),
+                                      result_cb=on_info)
+        for tkr, seconds in info_pool.timings.items():
+            metrics.record("fundamentals", tkr, seconds)
+        ph["passed"] = sum(t in infos for t in survivors)
+        ph["note"] = (f"{len(survivors) - len(info_pool.outcomes)} önbellekten, "
+                      f"{len(info_pool.outcomes)} istek")
+
+    # ── Faz 3: Puanlama ─────────────────────────────────────────────────────
+    # Sektör tabanları faz 2'de gelen .info'ları da içerir
+    if sector_stats is None:
+        sector_stats = build_sector_stats(fundamentals)
+    with metrics.phase("scoring", len(latest)) as ph:
+        with metrics.stage("scoring", list(latest.index)):
+            results = score_universe(panel, infos, sector_stats, latest, tf_values)
+        ph["passed"] = len(results)
+
+    # Hata sebepleri: sonuç üretmeyen hisseler + .info alınamayanlar
+    # (ikincisi yine puanlanır, temel skorlar nötr kalır)
+    scored = set(latest.index)
+    for tkr in scan_list:
+        if tkr in scored:
+            continue
+        if tkr in in_store:
+            metrics.fail(tkr, "cleaning", INSUFFICIENT_BARS)
+        elif offline:
+            metrics.fail(tkr, "download", NOT_IN_STORE)
+        else:
+            metrics.fail(tkr, "download", price_pool.outcomes.get(tkr, NO_DATA))
+    for tkr, status in info_pool.outcomes.items():
+        if status in (THROTTLED, ERROR):
+            metrics.fail(tkr, "fundamentals", status)
+
+    # Kalıcı sebepler sembol kaydına (yetersiz barda bar sayısıyla)
+    dead = {t: f["reason"] for t, f in metrics.failures.items()
+            if f["stage"] != "fundamentals" and f["reason"] in REASONS}
+    short = [t for t, r in dead.items() if r == INSUFFICIENT_BARS]
+    for tkr, raw in store.read_many(short).items():
+        dead[tkr] = (INSUFFICIENT_BARS, len(clean_bars(raw)))
+    registry.record(dead)
+    registry.clear(scored)
+
+    df = results.sort_values("Toplam Skor", ascending=False, kind="stable",
+                             ignore_index=True)
+    summary = Counter({**price_pool.outcomes,
+                       **{t: st for t, st in info_pool.outcomes.items() if st != OK}}.values())
+    return ScanReport(df, len(scan_list), len(scan_list) - len(results), summary, metrics,
+                      skipped, timeframes)
+
+
+def select_buy_list(df: pd.DataFrame, min_score: float) -> pd.DataFrame:
+    """AL listesi: elenmemiş ve min_score üzeri hisseler."""
+    if df.empty:
+        return df.copy()
+    return df[(df["Elendi"].isna()) & (df["Toplam Skor"] >= min_score)].copy()
+
+
+def parquet_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """"PD/DD" gibi sayı ile "N/A" karışık sütunları metne çevir (Parquet tek tip ister)."""
+    mixed = {c: df[c].map(lambda v: None if v is None else str(v))
+             for c in df.columns
+             if df[c].dtype == object and df[c].map(type).nunique() > 1}
+    return df.assign(**mixed)
+
+
+def write_results(df: pd.DataFrame, path: str | Path) -> Path:
+    """Sonuçları uzantıya göre CSV, Parquet ya da JSON olarak yaz."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+    elif suffix == ".parquet":
+        parquet_safe(df).to_parquet(path, index=False)
+    elif suffix == ".json":
+        # float32 sütunlar ikili gösterim artığı taşımasın (421.44 → 421.440002)
+        wide = {c: df[c].astype("float64").round(4)
+                for c in df.columns if df[c].dtype == "float32"}
+        df.assign(**wide).to_json(path, orient="records", force_ascii=False, indent=1)
+    else:
+        raise ValueError(f"Desteklenmeyen çıktı biçimi: {suffix} (.csv, .parquet, .json)")
+    return path
@@ -0,0 +1,258 @@
+"""
+Gün Sonu Tarama Zamanlayıcısı
+=============================
+Tarayıcı oturumundan bağımsız yerel süreç. Tam taramayı Borsa İstanbul
+kapanışından sonra (hafta içi, varsayılan 18:30 TSİ) ve isteğe bağlı olarak
+sabit aralıklarla çalıştırır. Sonuç anlık görüntü olarak yazılır
+(bist.snapshots, atomik) ve önceki görüntüye göre bir uyarı dosyası üretilir:
+
+    DATA_DIR/alerts/<görüntü id>.json     AL eşiğini yeni geçenler, yeni MACD kesişimleri
+    DATA_DIR/scheduler/status.json        son / sonraki çalışma, son hata
+    DATA_DIR/scheduler/run_now            arayüzün "şimdi tara" isteği
+
+Uyarılar yalnızca aynı parametrelerle çalışmış önceki zamanlayıcı
+görüntüsüne göre hesaplanır (arayüzden başlatılan, farklı evren ya da ölçekli
+taramalar karşılaştırılmaz); böyle bir görüntü yoksa uyarı dosyası yazılmaz.
+
+Arayüz en son görüntüyle açılır; tarama sekme kapansa da sürer.
+
+Örnek:
+    python -m bist.scheduler --max-tickers 600 --every 60
+    python -m bist.scheduler --once
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from datetime import datetime, time as dtime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from bist.checkpoint import RUNTIME_PARAMS, ScanCheckpoint, compact
+from bist.cli import add_scan_args, scan_from_args, scan_params
+from bist.config import ISTANBUL, data_path
+from bist.results import MACD_LABELS
+from bist.scanner import select_buy_list
+from bist.snapshots import SnapshotStore, write_atomic
+
+# Kapanış 18:00; kapanış fiyatlarının yayılması için yarım saat pay
+CLOSE_RUN = dtime(18, 30)
+POLL_SECONDS = 30
+
+ALERT_DIR = "alerts"
+STATE_DIR = "scheduler"
+CROSSOVER = MACD_LABELS[0]
+SOURCE = "scheduler"
+
+
+def next_close_run(now: datetime, at: dtime = CLOSE_RUN) -> datetime:
+    """now'dan sonraki ilk hafta içi `at` (TSİ). Resmî tatiller atlanmaz."""
+    now = now.astimezone(ISTANBUL)
+    run = now.replace(hour=at.hour, minute=at.minute, second=0, microsecond=0)
+    if run <= now:
+        run += timedelta(days=1)
+    while run.weekday() >= 5:
+        run += timedelta(days=1)
+    return run
+
+
+def next_run(now: datetime, last_run: datetime | None, at: dtime = CLOSE_RUN,
+             every: float = 0) -> datetime:
+    """Kapanış sonrası çalışma ile `every` dakikalık aralığın erken olanı."""
+    run = next_close_run(now, at)
+    if every and last_run is not None:
+        run = min(run, last_run.astimezone(ISTANBUL) + timedelta(minutes=every))
+    return run
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# UYARILAR
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _alert_rows(df: pd.DataFrame) -> list:
+    return [{"Ticker": str(t), "Toplam Skor": round(float(score), 1), "MACD Sinyal": str(macd)}
+            for t, score, macd in zip(df["Ticker"], df["Toplam Skor"], df["MACD Sinyal"])]
+
+
+def compute_alerts(prev: pd.DataFrame | None, new: pd.DataFrame, min_score: float) -> dict:
+    """
+    Önceki görüntüye göre yeni AL'a girenler ve yeni "🔥 Crossover"lar.
+    Önceki görüntü yoksa mevcut AL listesi ve kesişimlerin tamamı yenidir.
+    """
+    buy = select_buy_list(new, min_score)
+    cross = new[new["MACD Sinyal"] == CROSSOVER]
+    if prev is not None:
+        was_buy = set(select_buy_list(prev, min_score)["Ticker"].astype(str))
+        was_cross = set(prev.loc[prev["MACD Sinyal"] == CROSSOVER, "Ticker"].astype(str))
+        buy = buy[~buy["Ticker"].astype(str).isin(was_buy)]
+        cross = cross[~cross["Ticker"].astype(str).isin(was_cross)]
+    return {"min_score": min_score,
+            "new_buy": _alert_rows(buy),
+            "new_crossover": _alert_rows(cross)}
+
+
+def same_scan(params: dict, other: dict) -> bool:
+    """Aynı zamanlayıcı taraması mı (çalışma zamanı ayarları hariç aynı parametreler)."""
+    def key(p):
+        return {k: v for k, v in p.items() if k not in RUNTIME_PARAMS}
+    return other.get("source") == SOURCE and key(params) == key(other)
+
+
+def alerts_path(sid: str) -> Path:
+    return data_path(ALERT_DIR) / f"{sid}.json"
+
+
+def write_alerts(sid: str, alerts: dict) -> Path:
+    path = alerts_path(sid)
+    path.parent.mkdir(exist_ok=True)
+    write_atomic(path, lambda p: p.write_text(
+        json.dumps({"snapshot": sid, **alerts}, ensure_ascii=False, indent=1),
+        encoding="utf-8"))
+    return path
+
+
+def load_alerts(sid: str) -> dict | None:
+    path = alerts_path(sid)
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# DURUM / İSTEK DOSYALARI
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _state_file(name: str) -> Path:
+    path = data_path(STATE_DIR) / name
+    path.parent.mkdir(exist_ok=True)
+    return path
+
+
+def request_run() -> None:
+    """Arayüzden "şimdi tara" isteği; zamanlayıcı bir sonraki yoklamada işler."""
+    _state_file("run_now").write_text(datetime.now(ISTANBUL).isoformat(), encoding="utf-8")
+
+
+def run_requested() -> bool:
+    return _state_file("run_now").exists()
+
+
+def read_status() -> dict | None:
+    """Zamanlayıcının son yazdığı durum (çalışmıyorsa bayat olabilir)."""
+    path = _state_file("status.json")
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+
+
+def is_alive(status: dict | None) -> bool:
+    """
+    Zamanlayıcı çalışıyor mu: tarama sürerken süreç yaşıyorsa, beklerken
+    durum dosyası son birkaç yoklama içinde yazıldıysa.
+    """
+    if not status:
+        return False
+    if status["running"]:
+        try:
+            os.kill(status["pid"], 0)
+        except OSError:
+            return False
+        return True
+    beat = datetime.fromisoformat(status["heartbeat"])
+    return (datetime.now(ISTANBUL) - beat).total_seconds() < 3 * status["poll"] + 5
+
+
+def _write_status(**status) -> None:
+    write_atomic(_state_file("status.json"), lambda p: p.write_text(
+        json.dumps(status, ensure_ascii=False, indent=1, default=str), encoding="utf-8"))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ÇALIŞTIRMA
+# ─────────────────────────────────────────────────────────────────────────────
+
+def run_once(args: argparse.Namespace, store: SnapshotStore | None = None):
+    """
+    Taramayı çalıştır, görüntüyü ve uyarıları yaz. Dönüş: (görüntü, uyarılar);
+    karşılaştırılacak önceki zamanlayıcı görüntüsü yoksa uyarılar None.
+    """
+    store = store or SnapshotStore()
+    params = {**scan_params(args), "source": SOURCE}
+    prev = store.latest(lambda p: same_scan(params, p))
+    # Süreç yarıda kesilirse aynı gün yeniden başlatılan tarama kaldığı yerden sürer
+    run = ScanCheckpoint().run(params)
+    if run.resumed:
+        print("⏯️ Yarım kalan tarama kontrol noktasından sürdürülüyor", file=sys.stderr)
+    report = scan_from_args(args, checkpoint=run)
+    if report.results.empty:
+        raise RuntimeError("Hiç sonuç alınamadı (bağlantı / sembol listesi)")
+    snap = compact(run, report, store, params)
+    if prev is None:
+        return snap, None
+    alerts = compute_alerts(prev.report.results, report.results, args.min_score)
+    write_alerts(snap.id, alerts)
+    return snap, alerts
+
+
+def _alert_summary(alerts: dict | None) -> str:
+    if alerts is None:
+        return "karşılaştırılacak önceki zamanlayıcı taraması yok, uyarı yazılmadı"
+    return (f"{len(alerts['new_buy'])} yeni AL, "
+            f"{len(alerts['new_crossover'])} yeni kesişim")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="python -m bist.scheduler",
+                                description="Gün sonu tarama zamanlayıcısı")
+    add_scan_args(p)
+    p.add_argument("--at", default=CLOSE_RUN.strftime("%H:%M"),
+                   help="Hafta içi kapanış sonrası çalışma saati, TSİ (varsayılan: 18:30)")
+    p.add_argument("--every", type=float, default=0,
+                   help="Ayrıca her N dakikada bir tara (0 = yalnızca kapanış sonrası)")
+    p.add_argument("--poll", type=float, default=POLL_SECONDS,
+                   help="Zamanlama / istek dosyası yoklama aralığı (sn)")
+    p.add_argument("--once", action="store_true",
+                   help="Hemen bir kez tara ve çık")
+    return p
+
+
+def main(argv: list | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    at = dtime.fromisoformat(args.at)
+    store = SnapshotStore()
+
+    if args.once:
+        snap, alerts = run_once(args, store)
+        print(f"✅ {snap.label} · {_alert_summary(alerts)}", file=sys.stderr)
+        if alerts is not None:
+            print(alerts_path(snap.id))
+        return 0
+
+    last_run, last_snapshot, last_error = None, None, None
+    due = next_run(datetime.now(ISTANBUL), last_run, at, args.every)
+    print(f"⏰ Zamanlayıcı başladı; ilk tarama {due:%d.%m.%Y %H:%M} TSİ", file=sys.stderr)
+    while True:
+        now = datetime.now(ISTANBUL)
+        requested = run_requested()
+        _write_status(pid=os.getpid(), heartbeat=now.isoformat(), poll=args.poll,
+                      running=requested or now >= due, next_run=due.isoformat(),
+                      last_run=last_run and last_run.isoformat(),
+                      last_snapshot=last_snapshot, last_error=last_error)
+        if requested or now >= due:
+            _state_file("run_now").unlink(missing_ok=True)
+            try:
+                snap, alerts = run_once(args, store)
+                last_snapshot, last_error = snap.id, None
+                print(f"✅ {snap.label} · {_alert_summary(alerts)}", file=sys.stderr)
+            except Exception as e:   # zamanlayıcı tek hatada durmasın
+                last_error = f"{type(e).__name__}: {e}"
+                traceback.print_exc()
+            last_run = datetime.now(ISTANBUL)
+            due = next_run(last_run, last_run, at, args.every)
+            print(f"⏰ Sonraki tarama {due:%d.%m.%Y %H:%M} TSİ", file=sys.stderr)
+            continue
+        time.sleep(args.poll)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Sektör İstatistikleri
+=====================
+Sektör bazlı PD/DD ve F/K taban değerleri tüm evren üzerinden hesaplanır.
+Temel veri önbelleğine yazılan her .info hisse katkısı olarak saklanır;
+yalnızca etkilenen sektörlerin toplamları (sayı, toplam, ortalama, medyan,
+budanmış ortalama) yeniden hesaplanıp zaman damgasıyla kaydedilir.
+Böylece istatistikler tarama listesinin sırasına ve boyutuna bağlı değildir,
+oturumlar arası korunur ve ayrı bir ısınma turu gerektirmez.
+
+Puanlamada kullanılan taban ("pb_mean", "pe_mean") %10 budanmış ortalamadır:
+tek bir aşırı F/K değeri sektör ortalamasını bozmaz.
+
+Komut satırı:
+    python -m bist.sectors            # kayıtlı istatistikleri göster
+    python -m bist.sectors --fill     # tüm BIST listesinin .info'sunu doldur
+"""
+
+import argparse
+import math
+import sqlite3
+import sys
+import time
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+METRICS = ("pb", "pe")
+TRIM = 0.10   # budanmış ortalamada her iki uçtan atılan oran
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sector_members (
+    ticker     TEXT PRIMARY KEY,
+    sector     TEXT NOT NULL,
+    pb         REAL,
+    pe         REAL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sector_stats (
+    sector       TEXT NOT NULL,
+    metric       TEXT NOT NULL,
+    count        INTEGER NOT NULL,
+    sum          REAL NOT NULL,
+    mean         REAL,
+    median       REAL,
+    trimmed_mean REAL,
+    computed_at  REAL NOT NULL,
+    PRIMARY KEY (sector, metric)
+);
+"""
+
+
+def sector_values(info: dict) -> tuple:
+    """score_ticker ile aynı okuma: (sektör, PD/DD, F/K)."""
+    return (info.get("sector", "Unknown"),
+            info.get("priceToBook"),
+            info.get("trailingPE") or info.get("forwardPE"))
+
+
+def trimmed_mean(values: np.ndarray, trim: float = TRIM) -> float:
+    """Sıralı değerlerin her iki ucundan `trim` oranı atılarak ortalama."""
+    if not len(values):
+        return math.nan
+    k = int(len(values) * trim)
+    return float(np.sort(values)[k:len(values) - k].mean())
+
+
+def aggregate(values: np.ndarray) -> dict:
+    values = values[np.isfinite(values)]
+    n = len(values)
+    return {
+        "count": n,
+        "sum": float(values.sum()),
+        "mean": float(values.mean()) if n else None,
+        "median": float(np.median(values)) if n else None,
+        "trimmed_mean": trimmed_mean(values) if n else None,
+    }
+
+
+class SectorStats:
+    """Temel veri önbelleğiyle aynı SQLite dosyasında tutulan sektör toplamları."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with closing(self._connect()) as con:
+            con.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def empty(self) -> bool:
+        with closing(self._connect()) as con:
+            return con.execute("SELECT COUNT(*) FROM sector_members").fetchone()[0] == 0
+
+    def update(self, infos: dict) -> None:
+        """
+        Yeni gelen .info'ları katkı olarak yaz, etkilenen sektörleri yeniden
+        topla. Boş .info ("veri yok") katkı değildir.
+        """
+        rows = []
+        for tkr, info in infos.items():
+            if not info:
+                continue
+            sector, pb, pe = sector_values(info)
+            rows.append((tkr, sector or "Unknown", pb, pe, time.time()))
+        if not rows:
+            return
+
+        with closing(self._connect()) as con, con:
+            # Sektör değiştiren hissenin eski sektörü de yeniden toplanır
+            old = con.execute(
+                f"SELECT DISTINCT sector FROM sector_members WHERE ticker IN "
+                f"({','.join('?' * len(rows))})", [r[0] for r in rows]).fetchall()
+            con.executemany("INSERT OR REPLACE INTO sector_members VALUES (?,?,?,?,?)", rows)
+            affected = {s for (s,) in old} | {r[1] for r in rows}
+            self._recompute(con, affected)
+
+    def _recompute(self, con: sqlite3.Connection, sectors: set) -> None:
+        now = time.time()
+        marks = ",".join("?" * len(sectors))
+        members = pd.read_sql_query(
+            f"SELECT sector, pb, pe FROM sector_members WHERE sector IN ({marks})",
+            con, params=list(sectors))
+        con.execute(f"DELETE FROM sector_stats WHERE sector IN ({marks})", list(sectors))
+        out = []
+        for sector, grp in members.groupby("sector"):
+            for metric in METRICS:
+                agg = aggregate(grp[metric].to_numpy(dtype=float))
+                if agg["count"]:
+                    out.append((sector, metric, agg["count"], agg["sum"], agg["mean"],
+                                agg["median"], agg["trimmed_mean"], now))
+        con.executemany("INSERT INTO sector_stats VALUES (?,?,?,?,?,?,?,?)", out)
+
+    def table(self) -> pd.DataFrame:
+        """Kayıtlı tüm sektör toplamları (sektör × metrik)."""
+        with closing(self._connect()) as con:
+            return pd.read_sql_query(
+                "SELECT * FROM sector_stats ORDER BY sector, metric", con)
+
+    def stats(self) -> dict:
+        """
+        Puanlamanın kullandığı biçim: {sektör: {"pb_mean", "pe_mean", ...}}.
+        *_mean budanmış ortalamadır; medyan, düz ortalama ve sayı da eklenir.
+        Verisi olmayan metrik yazılmaz (puanlama sabit yedek değere düşer).
+        """
+        stats: dict = {}
+        for r in self.table().itertuples(index=False):
+            s = stats.setdefault(r.sector, {})
+            s[f"{r.metric}_mean"] = r.trimmed_mean
+            s[f"{r.metric}_median"] = r.median
+            s[f"{r.metric}_avg"] = r.mean
+            s[f"{r.metric}_count"] = r.count
+        return stats
+
+    def computed_at(self) -> float | None:
+        """En son toplama zamanı (epoch sn)."""
+        with closing(self._connect()) as con:
+            return con.execute("SELECT MAX(computed_at) FROM sector_stats").fetchone()[0]
+
+
+def main(argv: list | None = None) -> int:
+    from bist.fetcher import DEFAULT_RATE, FetchPool
+    from bist.fundamentals import FundamentalsCache
+    from bist.universe import BIST_TICKERS
+
+    p = argparse.ArgumentParser(prog="python -m bist.sectors",
+                                description="Tüm evren sektör istatistikleri")
+    p.add_argument("--fill", action="store_true",
+                   help="BIST listesinin eksik/süresi dolmuş .info'sunu çek")
+    p.add_argument("--rate", type=float, default=DEFAULT_RATE)
+    args = p.parse_args(argv)
+
+    cache = FundamentalsCache()
+    if args.fill:
+        cache.fill(list(dict.fromkeys(BIST_TICKERS)), FetchPool(rate=args.rate))
+    table = cache.sectors.table()
+    if table.empty:
+        print("Kayıtlı sektör istatistiği yok (--fill ile doldurun).", file=sys.stderr)
+        return 1
+    with pd.option_context("display.width", 200, "display.max_rows", 200,
+                           "display.float_format", "{:.2f}".format):
+        print(table.drop(columns="computed_at"))
+    print(f"\nSon güncelleme: {pd.Timestamp(cache.sectors.computed_at(), unit='s')}",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""
+Paylaşılan Piyasa Verisi Servisi
+================================
+Aynı Streamlit sunucusundaki tüm oturumların kullandığı süreç çapında veri
+katmanı (arayüzde st.cache_resource ile tek örnek). İki oturum aynı anda
+tarama başlattığında aynı hisseler iki kez indirilmez:
+
+- Tek uçuş (single-flight): aynı (hisse, periyot) fiyat güncellemesi ya da
+  aynı hissenin .info isteği sürerken gelen çağrılar yeni istek atmaz,
+  süren işin sonucunu bekler.
+- Sınırlı LRU bellek önbelleği: depodan okunan bar tabloları hisse başına
+  bellekte tutulur; depodaki son indirme zamanı değişmedikçe (başka süreç
+  yazsa da) SQLite'a gidilmez.
+
+SharedStore ve SharedFundamentals, OHLCVStore ve FundamentalsCache yerine
+doğrudan kullanılabilir (run_scan, validate_symbols, grafikler). İsabet /
+ıska / birleşen sayıları stats_table() ile raporlanır.
+"""
+
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from typing import Callable
+
+import pandas as pd
+
+from bist.data import period_start
+from bist.fetcher import FetchPool
+from bist.fundamentals import DEFAULT_TTL, FundamentalsCache
+from bist.store import REFRESH_AFTER, OHLCVStore
+
+# Bellekte tutulan en çok hisse tablosu (1 yıllık tablo ≈ 10 KB)
+MAX_FRAMES = 2000
+
+HIT, MISS, COALESCED = "hit", "miss", "coalesced"
+STAT_LABELS = {HIT: "İsabet", MISS: "Iska", COALESCED: "Birleşen"}
+KIND_LABELS = {
+    "prices":       "Fiyat güncelleme (ağ)",
+    "bars":         "Bar okuma (bellek)",
+    "fundamentals": "Temel veri (ağ)",
+}
+
+
+class SingleFlight:
+    """Aynı anahtar için eşzamanlı çağrılar uçuştaki tek işin sonucunu bekler."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict = {}
+
+    def claim(self, keys: list) -> tuple:
+        """
+        Dönüş: (sahiplenilen anahtarlar, {anahtar: Future} beklenecekler).
+        Sahiplenilen her anahtar için done() çağrılmalıdır.
+        """
+        owned, waiting = [], {}
+        with self._lock:
+            for key in keys:
+                if key in self._calls:
+                    waiting[key] = self._calls[key]
+                else:
+                    self._calls[key] = Future()
+                    owned.append(key)
+        return owned, waiting
+
+    def done(self, key, value=None, error: BaseException | None = None) -> None:
+        with self._lock:
+            fut = self._calls.pop(key)
+        if error is not None:
+            fut.set_exception(error)
+        else:
+            fut.set_result(value)
+
+
+class MarketDataService:
+    """Süreç çapında tek örnek: ortak tek uçuş tablosu, LRU ve sayaçlar."""
+
+    def __init__(self, store: OHLCVStore | None = None, max_frames: int = MAX_FRAMES):
+        self.flight = SingleFlight()
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self.store = SharedStore(store or OHLCVStore(), self, max_frames)
+
+    def count(self, kind: str, event: str, n: int = 1) -> None:
+        if n:
+            with self._lock:
+                self.counts[(kind, event)] += n
+
+    def fundamentals(self, ttl: float = DEFAULT_TTL,
+                     fetcher: Callable[[str], dict] | None = None) -> "SharedFundamentals":
+        """Oturumun TTL'iyle .info önbelleği; tek uçuş tablosu ortaktır."""
+        return SharedFundamentals(FundamentalsCache(ttl=ttl, fetcher=fetcher), self)
+
+    def stats_table(self) -> pd.DataFrame:
+        """Tür başına isabet / ıska / birleşen sayıları ve isabet oranı."""
+        with self._lock:
+            counts = dict(self.counts)
+        rows = []
+        for kind, label in KIND_LABELS.items():
+            row = {"Tür": label, **{STAT_LABELS[e]: counts.get((kind, e), 0)
+                                    for e in (HIT, MISS, COALESCED)}}
+            total = sum(row[STAT_LABELS[e]] for e in (HIT, MISS, COALESCED))
+            row["İsabet %"] = (100 * (total - row[STAT_LABELS[MISS]]) / total
+                               if total else float("nan"))
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+class SharedStore:
+    """
+    OHLCVStore yerine geçer: update tek uçuşlu, read_many LRU önbellekli;
+    diğer yöntemler doğrudan depoya gider. Dönen tablolar oturumlar arasında
+    paylaşılır, salt okunur kullanılmalıdır.
+    """
+
+    def __init__(self, store: OHLCVStore, service: MarketDataService,
+                 max_frames: int = MAX_FRAMES):
+        self.store = store
+        self.service = service
+        self.max_frames = max_frames
+        # (ticker, adjusted) → (fetched_at, start, df)
+        self._frames: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.store, name)
+
+    def update(self, tickers: list, period: str = "1y",
+               progress_cb: Callable[[int, int], None] | None = None,
+               refresh_after: float = REFRESH_AFTER,
+               pool: FetchPool | None = None, provider=None,
+               read: bool = True,
+               written_cb: Callable[[list], None] | None = None) -> dict | None:
+        """
+        OHLCVStore.update ile aynı; başka oturumun o an güncellediği hisseler
+        yeniden istenmez, o güncelleme beklenir ve indirme durumu bu
+        çağrının havuzuna (pool.outcomes) kopyalanır.
+        """
+        pool = pool or FetchPool()
+        tickers = list(dict.fromkeys(tickers))
+        owned, waiting = self.service.flight.claim([("prices", t, period) for t in tickers])
+        mine = [t for _, t, _ in owned]
+        error = None
+        try:
+            if mine:
+                self.store.update(mine, period, progress_cb, refresh_after, pool, provider,
+                                  read=False, written_cb=written_cb)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            for key in owned:
+                self.service.flight.done(key, pool.outcomes.get(key[1]), error)
+
+        fetched = sum(t in pool.outcomes for t in mine)
+        self.service.count("prices", MISS, fetched)
+        self.service.count("prices", HIT, len(mine) - fetched)
+        self.service.count("prices", COALESCED, len(waiting))
+        for (_, tkr, _), fut in waiting.items():
+            status = fut.result()
+            if status:
+                pool.record(tkr, status)
+        return self.read_many(tickers, period_start(period)) if read else None
+
+    def read(self, ticker: str, start: pd.Timestamp | None = None,
+             adjusted: bool = True) -> pd.DataFrame | None:
+        return self.read_many([ticker], start, adjusted).get(ticker)
+
+    def read_many(self, tickers: list, start: pd.Timestamp | None = None,
+                  adjusted: bool = True) -> dict:
+        """
+        OHLCVStore.read_many ile aynı. Bellekteki tablo, hissenin depodaki son
+        indirme zamanı değişmediyse ve istenen başlangıcı kapsıyorsa kullanılır;
+        düzeltilmiş ve ham barlar ayrı tutulur.
+        """
+        if not tickers:
+            return {}
+        tickers = list(dict.fromkeys(tickers))
+        start = None if start is None else pd.Timestamp(start)
+        fetched = self.store.fetched_at(tickers)
+
+        frames, missing = {}, []
+        with self._lock:
+            for tkr in tickers:
+                entry = self._frames.get((tkr, adjusted))
+                if (entry is None or entry[0] != fetched.get(tkr)
+                        or (entry[1] is not None and (start is None or start < entry[1]))):
+                    missing.append(tkr)
+                    continue
+                self._frames.move_to_end((tkr, adjusted))
+                df = entry[2]
+                frames[tkr] = df if start is None else df[df.index >= start]
+
+        read = self.store.read_many(missing, start, adjusted)
+        with self._lock:
+            for tkr, df in read.items():
+                self._frames[(tkr, adjusted)] = (fetched.get(tkr), start, df)
+                self._frames.move_to_end((tkr, adjusted))
+            while len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+        self.service.count("bars", HIT, len(frames))
+        self.service.count("bars", MISS, len(missing))
+        frames.update(read)
+        return {t: frames[t] for t in tickers if t in frames}
+
+
+class SharedFundamentals:
+    """FundamentalsCache yerine geçer: eksik .info'lar tek uçuşla çekilir."""
+
+    def __init__(self, cache: FundamentalsCache, service: MarketDataService):
+        self.cache = cache
+        self.service = service
+
+    def __getattr__(self, name):
+        return getattr(self.cache, name)
+
+    def get(self, ticker: str, pool: FetchPool | None = None) -> dict:
+        return self.fill([ticker], pool).get(ticker, {})
+
+    def fill(self, tickers: list, pool: FetchPool | None = None,
+             progress_cb: Callable[[int, int], None] | None = None,
+             result_cb: Callable[[str, dict | None], None] | None = None) -> dict:
+        """FundamentalsCache.fill ile aynı; başka oturumun çektiği .info beklenir."""
+        pool = pool or FetchPool()
+        tickers = list(dict.fromkeys(tickers))
+        cached = self.cache.get_many(tickers)
+        missing = [t for t in tickers if t not in cached]
+        owned, waiting = self.service.flight.claim([("info", t) for t in missing])
+        mine = [t for _, t in owned]
+        got, error = {}, None
+        try:
+            if mine:
+                got = self.cache.fill(mine, pool, progress_cb, result_cb)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            for key in owned:
+                self.service.flight.done(key, (got.get(key[1]), pool.outcomes.get(key[1])),
+                                         error)
+
+        self.service.count("fundamentals", HIT, len(cached))
+        self.service.count("fundamentals", MISS, len(mine))
+        self.service.count("fundamentals", COALESCED, len(waiting))
+        for (_, tkr), fut in waiting.items():
+            info, status = fut.result()
+            if status:
+                pool.record(tkr, status)
+            if info is not None:
+                got[tkr] = info
+            if result_cb:
+                result_cb(tkr, info)
+        return {**cached, **got}
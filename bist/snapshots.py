@@ -0,0 +1,262 @@
+"""
+Tarama Anlık Görüntüleri
+========================
+Her tarama sonucu, parametreleri ve zaman damgasıyla birlikte sürümlü bir
+anlık görüntü olarak diske yazılır (DATA_DIR/snapshots):
+
+    <id>.parquet        sonuç tablosu
+    <id>.metrics.json   aşama süreleri, fazlar, hata sebepleri
+    <id>.json           parametreler, özet sayılar (en son yazılır)
+
+Arayüz filtreleme, eşik ve grafikleri yüklenen görüntü üzerinden çalıştırır;
+widget değişiklikleri taramayı tekrarlatmaz. En son ya da daha eski bir
+görüntü yüklenebilir, iki görüntünün skorları karşılaştırılabilir.
+
+CSV / Parquet dışa aktarım görüntünün Parquet dosyasından parça parça
+yazılır (tüm tablo bellekte metne çevrilmez); sonuç DATA_DIR/snapshots/exports
+altında saklanır ve aynı istek için yeniden kullanılır; önbellekte en son
+kullanılan MAX_EXPORTS dosya tutulur.
+"""
+
+import hashlib
+import json
+import os
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from bist.config import data_path
+from bist.metrics import ScanMetrics
+from bist.results import conform
+from bist.scanner import ScanReport, parquet_safe
+from bist.timeframes import OFF, TIMEFRAME_LABELS
+
+SNAPSHOT_DIR = "snapshots"
+_ID_FORMAT = "%Y%m%d_%H%M%S"
+EXPORT_DIR = "exports"
+EXPORT_FORMATS = ("csv", "parquet")
+EXPORT_BATCH = 65_536
+# Dışa aktarım önbelleğinde tutulan en çok dosya (en son kullanılanlar kalır)
+MAX_EXPORTS = 20
+
+
+@dataclass
+class Snapshot:
+    """Kayıtlı bir tarama: sonuçlar + parametreler + zaman damgası."""
+    id: str
+    created_at: datetime
+    params: dict
+    report: ScanReport
+
+    @property
+    def label(self) -> str:
+        return snapshot_label(self.created_at, self.report.scanned, len(self.report.results),
+                              self.report.timeframes)
+
+
+def snapshot_label(created_at: datetime, scanned: int, results: int,
+                   timeframes: str = OFF) -> str:
+    label = f"{created_at:%d.%m.%Y %H:%M:%S} · {scanned} hisse ({results} sonuç)"
+    # Haftalık onaylı skorlar (teknik 50 + onay 10) günlük skorlarla aynı ölçekte değil
+    return label if timeframes == OFF else f"{label} · {TIMEFRAME_LABELS[timeframes]}"
+
+
+def write_atomic(path: Path, write) -> None:
+    """Geçici dosyaya yazıp yeniden adlandır (yarım dosya görünmez)."""
+    tmp = path.with_name(path.name + ".tmp")
+    write(tmp)
+    os.replace(tmp, path)
+
+
+class SnapshotStore:
+    """DATA_DIR/snapshots altındaki anlık görüntüler."""
+
+    def __init__(self, root: str | Path | None = None):
+        self.root = Path(root) if root else data_path(SNAPSHOT_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def save(self, report: ScanReport, params: dict | None = None,
+             created_at: datetime | None = None) -> Snapshot:
+        created_at = created_at or datetime.now()
+        sid = created_at.strftime(_ID_FORMAT)
+        n = 1
+        while (self.root / f"{sid}.json").exists():
+            sid, n = f"{created_at.strftime(_ID_FORMAT)}_{n}", n + 1
+
+        meta = {
+            "id": sid,
+            "created_at": created_at.isoformat(timespec="seconds"),
+            "params": params or {},
+            "scanned": report.scanned,
+            "errors": report.errors,
+            "results": len(report.results),
+            "fetch_summary": dict(report.fetch_summary),
+            "skipped": report.skipped,
+            "timeframes": report.timeframes,
+        }
+        write_atomic(self.root / f"{sid}.parquet",
+                      lambda p: parquet_safe(report.results).to_parquet(p, index=False))
+        write_atomic(self.root / f"{sid}.metrics.json",
+                      lambda p: report.metrics.to_json(p))
+        # Meta en son yazılır: varlığı görüntünün tamamlandığını gösterir
+        write_atomic(self.root / f"{sid}.json", lambda p: p.write_text(
+            json.dumps(meta, ensure_ascii=False, indent=1, default=float), encoding="utf-8"))
+        return Snapshot(sid, created_at, meta["params"], report)
+
+    def ids(self) -> list:
+        """Kayıtlı görüntü kimlikleri, en yeni başta."""
+        return sorted((p.name[:-len(".json")] for p in self.root.glob("*.json")
+                       if not p.name.endswith(".metrics.json")), reverse=True)
+
+    def meta(self, sid: str) -> dict:
+        return json.loads((self.root / f"{sid}.json").read_text(encoding="utf-8"))
+
+    def export(self, sid: str, fmt: str, columns: list | None = None,
+               min_score: float | None = None) -> Path:
+        """
+        Görüntüyü CSV ya da Parquet olarak dışa aktar ve dosya yolunu döndür.
+        min_score verilirse yalnızca AL listesi (select_buy_list ile aynı koşul)
+        yazılır. Satırlar EXPORT_BATCH'lik parçalarla akar; süzgeçsiz tam
+        Parquet için görüntü dosyasının kendisi döner.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Desteklenmeyen dışa aktarım biçimi: {fmt} (csv, parquet)")
+        source = self.root / f"{sid}.parquet"
+        if fmt == "parquet" and columns is None and min_score is None:
+            return source
+
+        key = hashlib.sha1(repr((columns, min_score)).encode()).hexdigest()[:10]
+        path = self.root / EXPORT_DIR / f"{sid}_{key}.{fmt}"
+        if path.exists():
+            path.touch()   # görüntüler değişmez; dosya yeniden kullanılır
+            return path
+        path.parent.mkdir(exist_ok=True)
+
+        dataset = ds.dataset(source)
+        condition = None
+        if min_score is not None:
+            condition = (ds.field("Elendi").is_null()
+                         & (ds.field("Toplam Skor") >= min_score))
+        batches = dataset.to_batches(columns=columns, filter=condition,
+                                     batch_size=EXPORT_BATCH)
+        # pandas üst verisi tüm sütunları listeler; alt kümede yanıltmasın
+        schema = dataset.schema.remove_metadata()
+        if columns is not None:
+            schema = pa.schema([schema.field(c) for c in columns])
+        write_atomic(path, lambda p: _write_batches(p, fmt, schema, batches))
+        self.prune_exports()
+        return path
+
+    def prune_exports(self, keep: int = MAX_EXPORTS) -> None:
+        """Dışa aktarım önbelleğinde en son kullanılan `keep` dosya dışındakileri sil."""
+        files = []
+        for p in (self.root / EXPORT_DIR).glob("*"):
+            if p.suffix.lstrip(".") not in EXPORT_FORMATS:
+                continue   # yazılmakta olan .tmp dosyaları
+            try:
+                files.append((p.stat().st_mtime, p))
+            except FileNotFoundError:   # başka süreç silmiş olabilir
+                continue
+        for _, p in sorted(files, reverse=True)[keep:]:
+            p.unlink(missing_ok=True)
+
+    def list(self) -> pd.DataFrame:
+        """Görüntü listesi (kimlik, zaman, hisse/sonuç sayısı, parametreler)."""
+        rows = []
+        for sid in self.ids():
+            m = self.meta(sid)
+            created = datetime.fromisoformat(m["created_at"])
+            timeframes = m.get("timeframes", OFF)
+            rows.append({"id": sid, "created_at": created, "scanned": m["scanned"],
+                         "results": m["results"], "errors": m["errors"],
+                         "timeframes": timeframes,
+                         "label": snapshot_label(created, m["scanned"], m["results"], timeframes),
+                         "params": m["params"]})
+        return pd.DataFrame(rows, columns=["id", "created_at", "scanned", "results",
+                                           "errors", "timeframes", "label", "params"])
+
+    def load(self, sid: str) -> Snapshot:
+        m = self.meta(sid)
+        metrics_path = self.root / f"{sid}.metrics.json"
+        metrics = (ScanMetrics.from_dict(json.loads(metrics_path.read_text(encoding="utf-8")))
+                   if metrics_path.exists() else ScanMetrics())
+        # Eski görüntüler karışık tipli olabilir; şemaya çevrilir
+        report = ScanReport(conform(pd.read_parquet(self.root / f"{sid}.parquet")),
+                            m["scanned"], m["errors"], Counter(m["fetch_summary"]), metrics,
+                            m.get("skipped", {}), m.get("timeframes", OFF))
+        return Snapshot(sid, datetime.fromisoformat(m["created_at"]), m["params"], report)
+
+    def latest(self, match: Callable[[dict], bool] | None = None) -> Snapshot | None:
+        """En son görüntü; match verilirse parametreleri match(params) olan en son görüntü."""
+        for sid in self.ids():
+            if match is None or match(self.meta(sid)["params"]):
+                return self.load(sid)
+        return None
+
+
+def _text_schema(schema: pa.Schema) -> pa.Schema:
+    """Kategorik (sözlük) sütunlar CSV için düz metne çevrilir."""
+    return pa.schema([pa.field(f.name, pa.string()) if pa.types.is_dictionary(f.type) else f
+                      for f in schema])
+
+
+def _write_batches(path: Path, fmt: str, schema: pa.Schema, batches) -> None:
+    if fmt == "parquet":
+        with pq.ParquetWriter(path, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+        return
+    text = _text_schema(schema)
+    with open(path, "wb") as f:
+        f.write("\ufeff".encode("utf-8"))   # Excel için BOM (utf-8-sig)
+        with pa_csv.CSVWriter(f, text) as writer:
+            for batch in batches:
+                writer.write_batch(batch.cast(text))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SKOR FARKLARI
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _status(df: pd.DataFrame) -> np.ndarray:
+    return np.where(df["Elendi"].isna(), "Aktif", "Elendi")
+
+
+def diff_scores(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """
+    İki görüntünün hisse bazında skor farkı (yeni − eski). Yalnızca birinde
+    olan hisseler "Yeni" / "Çıktı", eleme durumu değişenler "Elendi" /
+    "Elemeden Çıktı" olarak işaretlenir. Durumu değişenler başta, sonra mutlak
+    Δ Skor'a göre azalan sıralı. İki görüntü aynı zaman dilimi ayarıyla
+    (report.timeframes) taranmış olmalıdır; aksi hâlde toplamlar farklı ölçekte.
+    """
+    cols = ["Ticker", "Toplam Skor", "Temel Skor", "Teknik Skor"]
+    a = old[cols].assign(Durum=_status(old))
+    b = new[cols].assign(Durum=_status(new))
+    m = a.merge(b, on="Ticker", how="outer", suffixes=(" (Önce)", " (Sonra)"), indicator=True)
+
+    out = pd.DataFrame({
+        "Ticker": m["Ticker"],
+        "Önceki Skor": m["Toplam Skor (Önce)"],
+        "Yeni Skor": m["Toplam Skor (Sonra)"],
+        "Δ Skor": m["Toplam Skor (Sonra)"] - m["Toplam Skor (Önce)"],
+        "Δ Temel": m["Temel Skor (Sonra)"] - m["Temel Skor (Önce)"],
+        "Δ Teknik": m["Teknik Skor (Sonra)"] - m["Teknik Skor (Önce)"],
+    })
+    before, after = m["Durum (Önce)"], m["Durum (Sonra)"]
+    out["Değişim"] = np.select(
+        [m["_merge"] == "right_only", m["_merge"] == "left_only",
+         (before == "Aktif") & (after == "Elendi"), (before == "Elendi") & (after == "Aktif")],
+        ["Yeni", "Çıktı", "Elendi", "Elemeden Çıktı"], default="")
+    return (out.assign(_moved=out["Değişim"] != "", _abs=out["Δ Skor"].abs())
+               .sort_values(["_moved", "_abs", "Ticker"], ascending=[False, False, True])
+               .drop(columns=["_moved", "_abs"]).reset_index(drop=True))
@@ -0,0 +1,318 @@
+"""
+Artımlı İndikatör Durumu
+========================
+RSI, MACD ve ATR özyinelemeli EMA'lardır; MA50/MA200 ve 5/20 günlük hacim
+ortalamaları pencere ortalamalarıdır. Hisse başına EMA biriktiricileri ve
+halka tamponlar (son 200 kapanış, son 20 hacim) saklanırsa yeni bir bar
+O(1) işle işlenir; tüm geçmişi yeniden hesaplamaya gerek kalmaz.
+
+EMA adımları pandas'ın ewm (adjust=True/False) özyinelemesinin aynısıdır,
+pencere ortalamaları tampondaki son N değerin ortalamasıdır; sonuçlar
+bist.indicators ile tam yeniden hesaplamayla kayan nokta toleransında
+aynıdır. Durum tüm evren için dizi olarak tutulur; bir adım tüm hisseleri
+birlikte ilerletir.
+
+Kalıcı durum son bardan BİR ÖNCEKİ bara kadardır: depo son barı her
+güncellemede yeniden çeker (gün içi kapanış düzelir), bu yüzden son bar her
+taramada geçici olarak uygulanır. Kayıtlı son kapanış depodakiyle
+uyuşmazsa (geçmiş değişti) hisse baştan kurulur.
+"""
+
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from bist.config import data_path
+from bist.data import period_start
+from bist.panel import MIN_BARS, PRICE_FIELDS
+
+DEFAULT_DB = "indicator_state.sqlite"
+
+RSI_PERIOD, ATR_PERIOD = 14, 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+MA_WINDOWS = (50, 200)
+VOLUME_WINDOWS = (5, 20)
+CLOSE_BUFFER, VOLUME_BUFFER = max(MA_WINDOWS), max(VOLUME_WINDOWS)
+
+# Hisse başına skaler biriktiriciler
+SCALARS = ("n", "close", "ema_fast", "ema_slow", "signal",
+           "macd_prev", "signal_prev", "hist_prev",
+           "gain", "gain_wt", "loss", "loss_wt", "rsi_obs", "atr")
+
+# Kapanış kontrolü toleransı (depodaki son kapanış değişti mi?)
+CLOSE_RTOL = 1e-9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS indicator_state (
+    ticker    TEXT PRIMARY KEY,
+    last_date TEXT NOT NULL,
+    scalars   BLOB NOT NULL,
+    closes    BLOB NOT NULL,
+    volumes   BLOB NOT NULL
+);
+"""
+
+
+def _ewm_step(weighted, old_wt, x, alpha, adjust, mask):
+    """pandas ewm (ignore_na=False) özyinelemesinin tek adımı; mask dışı değişmez."""
+    new_wt = 1.0 if adjust else alpha
+    first = mask & np.isnan(weighted)
+    cont = mask & ~np.isnan(weighted)
+    ow = old_wt * (1 - alpha)
+    with np.errstate(invalid="ignore"):
+        blended = np.where(weighted != x, (ow * weighted + new_wt * x) / (ow + new_wt), weighted)
+    weighted = np.where(first, x, np.where(cont, blended, weighted))
+    old_wt = np.where(first, 1.0, np.where(cont, ow + new_wt if adjust else 1.0, old_wt))
+    return weighted, old_wt
+
+
+class IndicatorState:
+    """Hisse dizisi için EMA biriktiricileri ve halka tamponlar."""
+
+    def __init__(self, tickers: list):
+        self.tickers = list(tickers)
+        t = len(self.tickers)
+        self.s = {k: np.empty(t) for k in SCALARS}
+        self.closes = np.empty((t, CLOSE_BUFFER))
+        self.volumes = np.empty((t, VOLUME_BUFFER))
+        self.last_date = np.empty(t, dtype="datetime64[ns]")
+        self.reset(np.arange(t))
+
+    def reset(self, rows) -> None:
+        """Seçilen hisseleri boş (n=0) duruma getir."""
+        for k in SCALARS:
+            self.s[k][rows] = np.nan
+        for k in ("n", "rsi_obs"):
+            self.s[k][rows] = 0
+        for k in ("gain_wt", "loss_wt"):
+            self.s[k][rows] = 1.0
+        self.closes[rows] = np.nan
+        self.volumes[rows] = np.nan
+        self.last_date[rows] = np.datetime64("NaT")
+
+    def copy(self) -> "IndicatorState":
+        out = IndicatorState.__new__(IndicatorState)
+        out.tickers = list(self.tickers)
+        out.s = {k: v.copy() for k, v in self.s.items()}
+        out.closes, out.volumes = self.closes.copy(), self.volumes.copy()
+        out.last_date = self.last_date.copy()
+        return out
+
+    def advance(self, close, high, low, volume, date) -> None:
+        """
+        Her hisseye bir bar uygula (dizi uzunluğu = hisse sayısı).
+        close NaN olan hisseler bu adımda değişmez.
+        """
+        s = self.s
+        m = ~np.isnan(close)
+        rows = np.flatnonzero(m)
+        prev_close = s["close"]
+
+        # MACD (adjust=False); önceki değerler crossover kontrolü için saklanır
+        macd = s["ema_fast"] - s["ema_slow"]
+        for k, v in (("macd_prev", macd), ("signal_prev", s["signal"]),
+                     ("hist_prev", macd - s["signal"])):
+            s[k] = np.where(m, v, s[k])
+        one = np.ones_like(close)
+        s["ema_fast"], _ = _ewm_step(s["ema_fast"], one, close, 2 / (MACD_FAST + 1), False, m)
+        s["ema_slow"], _ = _ewm_step(s["ema_slow"], one, close, 2 / (MACD_SLOW + 1), False, m)
+        s["signal"], _ = _ewm_step(s["signal"], one, s["ema_fast"] - s["ema_slow"],
+                                   2 / (MACD_SIGNAL + 1), False, m)
+
+        # RSI (adjust=True); ilk barda fark yok
+        with np.errstate(invalid="ignore"):
+            delta = close - prev_close
+        has_delta = m & ~np.isnan(delta)
+        gain, loss = np.clip(delta, 0, None), -np.clip(delta, None, 0)
+        s["gain"], s["gain_wt"] = _ewm_step(s["gain"], s["gain_wt"], gain, 1 / RSI_PERIOD,
+                                            True, has_delta)
+        s["loss"], s["loss_wt"] = _ewm_step(s["loss"], s["loss_wt"], loss, 1 / RSI_PERIOD,
+                                            True, has_delta)
+        s["rsi_obs"] += has_delta
+
+        # ATR (adjust=False); ilk barda TR = High - Low
+        with np.errstate(invalid="ignore"):
+            tr = np.fmax(np.fmax(high - low, np.abs(high - prev_close)),
+                         np.abs(low - prev_close))
+        s["atr"], _ = _ewm_step(s["atr"], one, tr, 2 / (ATR_PERIOD + 1), False, m)
+
+        # Halka tamponlar
+        n = s["n"][rows].astype(int)
+        self.closes[rows, n % CLOSE_BUFFER] = close[rows]
+        self.volumes[rows, n % VOLUME_BUFFER] = volume[rows]
+        s["n"][rows] += 1
+        s["close"] = np.where(m, close, prev_close)
+        self.last_date[rows] = date[rows]
+
+    def _window_mean(self, buf: np.ndarray, window: int) -> np.ndarray:
+        """Tampondaki son `window` değerin (kronolojik sırayla) ortalaması."""
+        n = self.s["n"].astype(int)
+        idx = (n[:, None] - window + np.arange(window)) % buf.shape[1]
+        vals = np.take_along_axis(buf, idx, axis=1)
+        out = vals.mean(axis=1)
+        out[n < window] = np.nan
+        return out
+
+    def latest(self, min_bars: int = MIN_BARS) -> pd.DataFrame:
+        """bist.panel.latest_values ile aynı sütunlar (index: ticker)."""
+        s = self.s
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = s["gain"] / np.where(s["loss"] == 0, np.nan, s["loss"])
+            rsi = np.where(s["rsi_obs"] >= RSI_PERIOD, 100 - (100 / (1 + rs)), np.nan)
+        macd = s["ema_fast"] - s["ema_slow"]
+        out = pd.DataFrame({
+            "price":  s["close"],
+            "ma50":   self._window_mean(self.closes, MA_WINDOWS[0]),
+            "ma200":  self._window_mean(self.closes, MA_WINDOWS[1]),
+            "rsi":    rsi,
+            "macd":   macd,
+            "signal": s["signal"],
+            "hist":   macd - s["signal"],
+            "atr":    s["atr"],
+            "vol5":   self._window_mean(self.volumes, VOLUME_WINDOWS[0]),
+            "vol20":  self._window_mean(self.volumes, VOLUME_WINDOWS[1]),
+            "macd_prev":   s["macd_prev"],
+            "signal_prev": s["signal_prev"],
+            "hist_prev":   s["hist_prev"],
+        }, index=pd.Index(self.tickers, name=None))
+        return out[s["n"] >= min_bars]
+
+
+def clean_bars(raw: pd.DataFrame) -> pd.DataFrame:
+    """score_ticker / build_panel ile aynı temizlik: eksik alanlı barlar atılır."""
+    if isinstance(raw.columns, pd.MultiIndex):
+        raw = raw.copy()
+        raw.columns = raw.columns.get_level_values(0)
+    return raw[PRICE_FIELDS].dropna()
+
+
+def consume(state: IndicatorState, frames: dict, hold_last: bool = False):
+    """
+    {ticker: yeni barlar} sözlüğünü duruma sırayla uygula (hisseler arası
+    vektörel). hold_last=True ise her hissenin son barı uygulanmaz,
+    {ticker: son bar satırı} olarak döndürülür.
+    """
+    pos = {t: i for i, t in enumerate(state.tickers)}
+    items = [(pos[t], df) for t, df in frames.items() if t in pos and len(df)]
+    held = {}
+    if hold_last:
+        held = {state.tickers[i]: df.iloc[-1] for i, df in items}
+        items = [(i, df.iloc[:-1]) for i, df in items]
+    depth = max((len(df) for _, df in items), default=0)
+    t = len(state.tickers)
+
+    # (adım × alan × hisse) küpü, her hissenin barları baştan hizalı
+    cube = np.full((depth, len(PRICE_FIELDS), t), np.nan)
+    dates = np.full((depth, t), np.datetime64("NaT"), dtype="datetime64[ns]")
+    for i, df in items:
+        cube[:len(df), :, i] = df.to_numpy(dtype=float)
+        dates[:len(df), i] = df.index.to_numpy(dtype="datetime64[ns]")
+    for k in range(depth):
+        c, h, lo, v = cube[k]
+        state.advance(c, h, lo, v, dates[k])
+    return held
+
+
+def apply_held(state: IndicatorState, held: dict) -> IndicatorState:
+    """consume(hold_last=True) ile bekletilen son barları bir kopyaya uygula."""
+    out = state.copy()
+    if held:
+        pos = {t: i for i, t in enumerate(out.tickers)}
+        bars = np.full((len(PRICE_FIELDS), len(out.tickers)), np.nan)
+        dates = np.full(len(out.tickers), np.datetime64("NaT"), dtype="datetime64[ns]")
+        for tkr, row in held.items():
+            bars[:, pos[tkr]] = row.to_numpy(dtype=float)
+            dates[pos[tkr]] = np.datetime64(pd.Timestamp(row.name), "ns")
+        out.advance(*bars, dates)
+    return out
+
+
+class IndicatorStateStore:
+    """Hisse bazlı kalıcı indikatör durumu (SQLite)."""
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else data_path(DEFAULT_DB)
+        with closing(self._connect()) as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def load(self, tickers: list) -> IndicatorState:
+        """Kayıtlı durumları yükle; kaydı olmayanlar boş (n=0) başlar."""
+        state = IndicatorState(tickers)
+        if not tickers:
+            return state
+        with closing(self._connect()) as con:
+            rows = con.execute(
+                f"SELECT * FROM indicator_state WHERE ticker IN "
+                f"({','.join('?' * len(tickers))})", tickers).fetchall()
+        pos = {t: i for i, t in enumerate(state.tickers)}
+        for tkr, last_date, scalars, closes, volumes in rows:
+            i = pos[tkr]
+            for k, v in zip(SCALARS, np.frombuffer(scalars, dtype=float)):
+                state.s[k][i] = v
+            state.closes[i] = np.frombuffer(closes, dtype=float)
+            state.volumes[i] = np.frombuffer(volumes, dtype=float)
+            state.last_date[i] = np.datetime64(last_date, "ns")
+        return state
+
+    def save(self, state: IndicatorState) -> None:
+        rows = []
+        for i, tkr in enumerate(state.tickers):
+            if not state.s["n"][i]:
+                continue
+            rows.append((tkr, str(pd.Timestamp(state.last_date[i]).date()),
+                         np.array([state.s[k][i] for k in SCALARS]).tobytes(),
+                         state.closes[i].tobytes(), state.volumes[i].tobytes()))
+        with closing(self._connect()) as con, con:
+            con.executemany("INSERT OR REPLACE INTO indicator_state VALUES (?,?,?,?,?)", rows)
+
+    def drop(self, tickers: list) -> None:
+        with closing(self._connect()) as con, con:
+            con.executemany("DELETE FROM indicator_state WHERE ticker = ?",
+                            [(t,) for t in tickers])
+
+    def latest(self, store, tickers: list, period: str = "1y") -> pd.DataFrame:
+        """
+        Depodaki barlardan son indikatör değerleri (latest_values ile aynı biçim).
+        Durumu olan hisseler için yalnızca son kayıtlı bardan sonraki barlar
+        okunur; durumu olmayan ya da geçmişi değişen hisseler `period`
+        penceresinden baştan kurulur. Kalıcı durum bir önceki bara kadar
+        ilerletilip kaydedilir.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        state = self.load(tickers)
+        known = {t: pd.Timestamp(d) for t, d in zip(tickers, state.last_date)
+                 if not pd.isna(d)}
+
+        # Bilinen hisseler: son kayıtlı bardan itibaren (kontrol barı dahil)
+        frames = {}
+        if known:
+            since = min(known.values())
+            for tkr, df in store.read_many(list(known), since).items():
+                frames[tkr] = clean_bars(df[df.index >= known[tkr]])
+
+        reseed, positions = [], []
+        for i, tkr in enumerate(state.tickers):
+            df = frames.get(tkr)
+            if (tkr not in known or df is None or not len(df) or df.index[0] != known[tkr]
+                    or not np.isclose(df["Close"].iloc[0], state.s["close"][i],
+                                      rtol=CLOSE_RTOL, atol=0)):
+                reseed.append(tkr)
+                positions.append(i)
+            else:
+                frames[tkr] = df.iloc[1:]
+
+        if reseed:
+            state.reset(positions)
+            for tkr, df in store.read_many(reseed, period_start(period)).items():
+                frames[tkr] = clean_bars(df)
+
+        held = consume(state, frames, hold_last=True)
+        self.save(state)
+        return apply_held(state, held).latest()
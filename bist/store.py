@@ -0,0 +1,316 @@
+"""
+Kalıcı OHLCV Deposu
+===================
+yf.download çıktısını hisse bazında yerel bir SQLite dosyasında tutar.
+Sonraki taramalarda yalnızca son kayıtlı tarihten sonraki barlar indirilip
+depoya eklenir; puanlama için okuma tamamen yereldir (ağ erişimi yok).
+
+Barlar işlem gördüğü hâliyle (ham), temettü / bedelsiz / bölünmeler ayrı
+eylem tablosunda saklanır; okunan barlar eylemlere göre yerelde düzeltilir
+(bist.actions). Yeni bir eylem geldiğinde yalnızca o hissenin çarpanları
+yeniden hesaplanır, geçmiş yeniden indirilmez. Düzeltilmiş geçmiş değiştiği
+için kalıcı indikatör durumu (bist.state) kontrol barı uyuşmazlığıyla o
+hisseyi baştan kurar.
+"""
+
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from bist.actions import (DIVIDEND, SPLIT, adjust, dividend_factors, extract_actions,
+                          factor_after, to_raw)
+from bist.config import data_path
+from bist.data import CHUNK_SIZE, OHLCV_COLUMNS, download_ohlcv, period_start
+from bist.fetcher import NO_DATA, FetchPool
+
+DEFAULT_DB = "ohlcv.sqlite"
+# 2: ham barlar + eylem tablosu (1: Yahoo'nun düzeltilmiş barları)
+SCHEMA_VERSION = 2
+
+# Bu süreden daha yakın zamanda güncellenmiş hisseler için ağa çıkılmaz (sn)
+REFRESH_AFTER = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ohlcv (
+    ticker TEXT NOT NULL,
+    date   TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS fetch_log (
+    ticker     TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS coverage (
+    ticker       TEXT PRIMARY KEY,
+    covered_from TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS actions (
+    ticker TEXT NOT NULL,
+    date   TEXT NOT NULL,
+    kind   TEXT NOT NULL,
+    value  REAL NOT NULL,
+    factor REAL,
+    PRIMARY KEY (ticker, date, kind)
+) WITHOUT ROWID;
+"""
+
+# İlk kayıtlı bar, istenen başlangıçtan en fazla bu kadar sonra olabilir (tatiller)
+COVERAGE_SLACK = pd.Timedelta(days=7)
+# Artımlı istek son kayıtlı bardan bu kadar önceden başlar: Yahoo bölünme /
+# bedelsiz / temettüyü ex-date'ten sonra bildirirse eylem yine pencereye düşer
+ACTION_LOOKBACK = pd.Timedelta(days=45)
+
+
+class OHLCVStore:
+    """Hisse bazlı günlük OHLCV barlarını tutan SQLite deposu."""
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else data_path(DEFAULT_DB)
+        with closing(self._connect()) as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_SCHEMA)
+            self._migrate(con)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _migrate(self, con: sqlite3.Connection) -> None:
+        """
+        Eski depo düzeltilmiş barlar tutuyordu; eylemler olmadan ham fiyata
+        çevrilemez, barlar silinir ve ilk taramada bir kez yeniden indirilir.
+        """
+        (version,) = con.execute("PRAGMA user_version").fetchone()
+        if version >= SCHEMA_VERSION:
+            return
+        with con:
+            if con.execute("SELECT 1 FROM ohlcv LIMIT 1").fetchone():
+                for table in ("ohlcv", "fetch_log", "coverage", "actions"):
+                    con.execute(f"DELETE FROM {table}")
+            con.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # ── Yazma ────────────────────────────────────────────────────────────────
+
+    def write(self, ticker: str, df: pd.DataFrame) -> int:
+        """
+        Barları ham fiyatla ekle; aynı tarihteki mevcut bar üzerine yazılır.
+        df Yahoo'nun auto_adjust=False çıktısıdır (bölünmelere göre düzeltilmiş,
+        isteğe bağlı Dividends / Stock Splits sütunlarıyla). Yeni eylemler
+        eylem tablosuna yazılır ve hissenin temettü çarpanları yeniden hesaplanır.
+        """
+        events = extract_actions(df)
+        df = df.dropna(subset=["Close"])
+        with closing(self._connect()) as con, con:
+            known = self._actions(con, [ticker])
+            # Bilinen + yeni bölünmeler (aynı tarih tek kayıt)
+            ratios = {d: v for f in (known, events) for d, k, v in
+                      zip(f["date"], f["kind"], f["value"]) if k == SPLIT}
+            splits = pd.DataFrame({"date": list(ratios), "value": list(ratios.values())})
+            raw = to_raw(df, splits)
+            rows = [
+                (ticker, ts.strftime("%Y-%m-%d"),
+                 *(None if pd.isna(v) else float(v) for v in vals))
+                for ts, vals in zip(raw.index, raw[OHLCV_COLUMNS].itertuples(index=False))
+            ]
+            con.executemany(
+                "INSERT OR REPLACE INTO ohlcv VALUES (?,?,?,?,?,?,?)", rows)
+            if not events.empty:
+                # Temettüler de ham (işlem günündeki) tutara çevrilir
+                value = events["value"].to_numpy(float)
+                is_div = (events["kind"] == DIVIDEND).to_numpy()
+                value[is_div] *= factor_after(events["date"][is_div],
+                                              splits["date"], splits["value"])
+                con.executemany(
+                    "INSERT OR REPLACE INTO actions VALUES (?,?,?,?,?)",
+                    [(ticker, d.strftime("%Y-%m-%d"), k, v, 1 / v if k == SPLIT else None)
+                     for d, k, v in zip(events["date"], events["kind"], value)])
+                self._refresh_factors(con, ticker)
+            con.execute("INSERT OR REPLACE INTO fetch_log VALUES (?,?)",
+                        (ticker, time.time()))
+        return len(rows)
+
+    def _refresh_factors(self, con: sqlite3.Connection, ticker: str) -> None:
+        """Hissenin temettü çarpanlarını depodaki ham kapanışlardan yeniden hesapla."""
+        dividends = self._actions(con, [ticker])
+        dividends = dividends[dividends["kind"] == DIVIDEND]
+        if dividends.empty:
+            return
+        closes = pd.read_sql_query(
+            "SELECT date, close FROM ohlcv WHERE ticker = ? ORDER BY date", con,
+            params=[ticker], parse_dates=["date"]).set_index("date")["close"]
+        factors = dividend_factors(closes, dividends)
+        con.executemany(
+            "UPDATE actions SET factor = ? WHERE ticker = ? AND date = ? AND kind = ?",
+            [(None if np.isnan(f) else float(f), ticker, d.strftime("%Y-%m-%d"), DIVIDEND)
+             for d, f in zip(dividends["date"], factors)])
+
+    def mark_fetched(self, tickers: list) -> None:
+        """Yeni bar gelmese de (hafta sonu vb.) hisseyi güncel say."""
+        now = time.time()
+        with closing(self._connect()) as con, con:
+            con.executemany("INSERT OR REPLACE INTO fetch_log VALUES (?,?)",
+                            [(t, now) for t in tickers])
+
+    # ── Okuma (ağ erişimi yok) ───────────────────────────────────────────────
+
+    def last_dates(self, tickers: list) -> dict:
+        """{ticker: son kayıtlı bar tarihi}; kaydı olmayanlar dahil edilmez."""
+        with closing(self._connect()) as con:
+            rows = con.execute(
+                f"SELECT ticker, MAX(date) FROM ohlcv WHERE ticker IN "
+                f"({','.join('?' * len(tickers))}) GROUP BY ticker", tickers
+            ).fetchall() if tickers else []
+        return {t: pd.Timestamp(d) for t, d in rows}
+
+    def covered(self, tickers: list, start: pd.Timestamp) -> set:
+        """`start`tan itibaren geçmişi depoda tam olan hisseler."""
+        if not tickers:
+            return set()
+        marks = ",".join("?" * len(tickers))
+        day = start.strftime("%Y-%m-%d")
+        with closing(self._connect()) as con:
+            by_mark = con.execute(
+                f"SELECT ticker FROM coverage WHERE covered_from <= ? "
+                f"AND ticker IN ({marks})", [day, *tickers]).fetchall()
+            by_data = con.execute(
+                f"SELECT ticker FROM ohlcv WHERE ticker IN ({marks}) "
+                f"GROUP BY ticker HAVING MIN(date) <= ?",
+                [*tickers, (start + COVERAGE_SLACK).strftime("%Y-%m-%d")]).fetchall()
+        return {t for (t,) in by_mark + by_data}
+
+    def mark_covered(self, tickers: list, start: pd.Timestamp) -> None:
+        with closing(self._connect()) as con, con:
+            con.executemany("INSERT OR REPLACE INTO coverage VALUES (?,?)",
+                            [(t, start.strftime("%Y-%m-%d")) for t in tickers])
+
+    def fetched_at(self, tickers: list) -> dict:
+        """{ticker: son başarılı indirme zamanı (epoch sn)}."""
+        with closing(self._connect()) as con:
+            rows = con.execute(
+                f"SELECT ticker, fetched_at FROM fetch_log WHERE ticker IN "
+                f"({','.join('?' * len(tickers))})", tickers
+            ).fetchall() if tickers else []
+        return dict(rows)
+
+    def _actions(self, con: sqlite3.Connection, tickers: list) -> pd.DataFrame:
+        return pd.read_sql_query(
+            f"SELECT * FROM actions WHERE ticker IN ({','.join('?' * len(tickers))}) "
+            f"ORDER BY ticker, date", con, params=list(tickers), parse_dates=["date"])
+
+    def actions(self, tickers: list) -> pd.DataFrame:
+        """Kayıtlı eylemler: ticker, date, kind (split/dividend), value, factor."""
+        with closing(self._connect()) as con:
+            return self._actions(con, tickers)
+
+    def read(self, ticker: str, start: pd.Timestamp | None = None,
+             adjusted: bool = True) -> pd.DataFrame | None:
+        """Tek hissenin barlarını yfinance sütun düzeninde döndür."""
+        return self.read_many([ticker], start, adjusted).get(ticker)
+
+    def read_many(self, tickers: list, start: pd.Timestamp | None = None,
+                  adjusted: bool = True) -> dict:
+        """
+        {ticker: OHLCV DataFrame}; deposunda verisi olmayanlar dahil edilmez.
+        adjusted=True ise barlar eylemlere göre düzeltilir (auto_adjust=True
+        karşılığı), False ise işlem gördüğü hâliyle döner.
+        """
+        if not tickers:
+            return {}
+        query = (f"SELECT * FROM ohlcv WHERE ticker IN "
+                 f"({','.join('?' * len(tickers))})")
+        params = list(tickers)
+        if start is not None:
+            query += " AND date >= ?"
+            params.append(pd.Timestamp(start).strftime("%Y-%m-%d"))
+        with closing(self._connect()) as con:
+            df = pd.read_sql_query(query + " ORDER BY ticker, date", con,
+                                   params=params)
+            actions = self._actions(con, tickers) if adjusted and not df.empty else None
+        if df.empty:
+            return {}
+
+        df["date"] = pd.to_datetime(df["date"])
+        df = df.rename(columns={c.lower(): c for c in OHLCV_COLUMNS})
+        frames = {}
+        for tkr, grp in df.groupby("ticker", sort=False):
+            frames[tkr] = grp.set_index("date")[OHLCV_COLUMNS].rename_axis("Date")
+        if actions is not None:
+            for tkr, act in actions.groupby("ticker", sort=False):
+                if tkr in frames:
+                    frames[tkr] = adjust(frames[tkr], act)
+        return frames
+
+    # ── Artımlı Güncelleme ───────────────────────────────────────────────────
+
+    def stale(self, tickers: list, period: str = "1y",
+              refresh_after: float = REFRESH_AFTER) -> list:
+        """update'in ağdan isteyeceği hisseler: `period`u kapsamayan ya da bayat olanlar."""
+        now = time.time()
+        fetched = self.fetched_at(tickers)
+        covered = self.covered(tickers, period_start(period))
+        return [t for t in tickers
+                if t not in covered or now - fetched.get(t, 0) > refresh_after]
+
+    def update(self, tickers: list, period: str = "1y",
+               progress_cb: Callable[[int, int], None] | None = None,
+               refresh_after: float = REFRESH_AFTER,
+               pool: FetchPool | None = None, provider=None,
+               read: bool = True,
+               written_cb: Callable[[list], None] | None = None) -> dict | None:
+        """
+        Depoyu güncelle ve son `period` kadarlık barları döndür
+        (read=False ise yalnızca güncelle, None döndür).
+        - Hiç kaydı olmayan ya da geçmişi `period`dan kısa kalan hisseler:
+          tam `period` indirilir (ör. 1y deposunu 3y geriye dönük teste açmak).
+        - Kaydı olanlar: son kayıtlı tarihten ACTION_LOOKBACK öncesinden
+          itibaren indirilip eklenir. Örtüşen barlar aynı ham değerle yeniden
+          yazılır (son bardaki gün içi eksik kapanış düzeltilir); geç
+          bildirilen eylemler kaydedilir ve çarpanlar yeniden hesaplanır.
+        - refresh_after sn içinde güncellenmiş olanlar için ağa çıkılmaz.
+        İndirme durumları (no_data / throttled) pool.outcomes'a yazılır.
+        Barlar her parça geldikçe yazılır; written_cb(hisseler) yazılan her
+        parçadan sonra çağrılır (tarama kontrol noktası için).
+        """
+        pool = pool or FetchPool()
+        tickers = list(dict.fromkeys(tickers))
+        begin = period_start(period)
+        covered = self.covered(tickers, begin)
+        stale = self.stale(tickers, period, refresh_after)
+
+        last = self.last_dates(stale)
+        # Aynı başlangıç tarihine sahip hisseler tek toplu istekte çekilir
+        groups: dict = {}
+        for t in stale:
+            start = ((last[t] - ACTION_LOOKBACK).strftime("%Y-%m-%d")
+                     if t in last and t in covered else None)
+            groups.setdefault(start, []).append(t)
+
+        total = sum(-(-len(g) // CHUNK_SIZE) for g in groups.values())
+        done = 0
+        for start, group in groups.items():
+            def _progress(i, _n, offset=done):
+                if progress_cb:
+                    progress_cb(offset + i, total)
+
+            def _write(frames, full=start is None):
+                for tkr, df in frames.items():
+                    self.write(tkr, df)
+                if full:
+                    self.mark_covered(list(frames), begin)
+                if written_cb:
+                    written_cb(list(frames))
+
+            frames = download_ohlcv(group, period=period, start=start, progress_cb=_progress,
+                                    pool=pool, provider=provider, chunk_cb=_write)
+            done += -(-len(group) // CHUNK_SIZE)
+            # Artımlı istekte yeni bar olmayabilir; kısıtlanmadıysa güncel sayılır
+            if start is not None:
+                self.mark_fetched([t for t in group if t not in frames
+                                   and pool.outcomes.get(t) == NO_DATA])
+
+        return self.read_many(tickers, begin) if read else None
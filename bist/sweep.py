@@ -0,0 +1,380 @@
+"""
+Eşik ve Ağırlık Taraması (Parameter Sweep)
+==========================================
+score_ticker'daki sabit eşikleri (RSI 30/40/50/60/70/80, ATR% 0.8/1.5/3/4.5/6,
+hacim oranı 1.0/1.2/1.5/2.0, 40/60 limitleri, AL eşiği) ve bileşen
+ağırlıklarını geriye dönük ileri getiriye göre sıralar.
+
+İndikatör küpü bir kez hesaplanır. Her gözlem, ızgaradaki tüm aday eşiklerin
+birleşimine göre hücrelere ayrılır (hücre içinde her eşik karşılaştırması
+aynı sonucu verir). Gözlemler hücre başına sayı / getiri toplamı olarak
+sıkıştırılır, böylece her konfigürasyon milyonlarca gözlem yerine birkaç bin
+hücre üzerinde, konfigürasyon grupları halinde yayınlanarak (broadcast)
+değerlendirilir. Sonuç gözlem bazlı hesapla birebir aynıdır.
+
+Erken eleme: konfigürasyonlar önce dönemin ilk yarısında değerlendirilir,
+yalnızca en iyi `keep` oranı tüm dönemde yeniden puanlanır.
+
+Komut satırı:
+    python -m bist.sweep --period 2y --horizon 21 --grid grid.json -o sweep.csv
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, fields, replace
+
+import numpy as np
+import pandas as pd
+
+from bist.backtest import HORIZONS, WARMUP_PERIOD, _add_period
+from bist.data import period_start
+from bist.panel import (ATR_DEFAULT, ATR_LADDER, GOLDEN_CROSS_BONUS, MACD_DEFAULT,
+                        MACD_SCORES, MA50_PROX_DEFAULT, MA50_PROX_SCORES, MIN_BARS,
+                        PB_SECTOR_FALLBACK, PE_SECTOR_FALLBACK, RSI_DEFAULT,
+                        RSI_LADDER, TEKNIK_CAP, TEMEL_CAP, VOLUME_DEFAULT,
+                        VOLUME_LADDER, build_panel, compute_indicators,
+                        fundamental_scores, ladder, trend_filter)
+
+# MA50 mesafesi merdiveni: elenmeyen gözlemlerde (fiyat > MA50) d > 0 olduğundan
+# score_ticker'daki dallar bu tabloya denktir: d<2 → 3, d≤8 → 5, d≤15 → 2, diğer → 0
+PROX_OPS = ("<", "<=", "<=")
+PROX_EDGES = (2, 8, 15)
+
+MACD_CLASSES = len(MACD_SCORES) + 1   # 5 koşul + "hiçbiri"
+
+
+@dataclass(frozen=True)
+class ScoreParams:
+    """Taranabilir puanlama parametreleri (varsayılanlar = score_ticker)."""
+    rsi_edges: tuple = tuple(t for _, t, _ in RSI_LADDER)
+    rsi_scores: tuple = tuple(s for *_, s in RSI_LADDER)
+    rsi_default: float = RSI_DEFAULT
+    atr_edges: tuple = tuple(t for _, t, _ in ATR_LADDER)
+    atr_scores: tuple = tuple(s for *_, s in ATR_LADDER)
+    atr_default: float = ATR_DEFAULT
+    volume_edges: tuple = tuple(t for _, t, _ in VOLUME_LADDER)
+    volume_scores: tuple = tuple(s for *_, s in VOLUME_LADDER)
+    macd_scores: tuple = MACD_SCORES
+    golden_bonus: float = GOLDEN_CROSS_BONUS
+    prox_edges: tuple = PROX_EDGES
+    prox_scores: tuple = (MA50_PROX_DEFAULT, *MA50_PROX_SCORES[:2])
+    prox_default: float = MA50_PROX_SCORES[2]
+    w_rsi: float = 1.0
+    w_macd: float = 1.0
+    w_volume: float = 1.0
+    w_atr: float = 1.0
+    w_ma: float = 1.0
+    w_temel: float = 1.0
+    temel_cap: float = TEMEL_CAP
+    teknik_cap: float = TEKNIK_CAP
+    al_threshold: float = 70
+
+
+def _table(ops, edges, scores) -> tuple:
+    return tuple(zip(ops, edges, scores))
+
+
+RSI_OPS = tuple(op for op, *_ in RSI_LADDER)
+ATR_OPS = tuple(op for op, *_ in ATR_LADDER)
+VOLUME_OPS = tuple(op for op, *_ in VOLUME_LADDER)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# İNDİKATÖR KÜPÜ
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _cell(x: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """
+    Değeri kenarlara göre hücreye ayır: (E[i-1], E[i]) açık aralığı 2i,
+    tam E[i] noktası 2i+1; NaN → -1. Böylece <, <=, > karşılaştırmaları
+    hücre içinde sabittir.
+    """
+    cell = np.searchsorted(edges, x, "left") + np.searchsorted(edges, x, "right")
+    return np.where(np.isnan(x), -1, cell)
+
+
+@dataclass
+class IndicatorCube:
+    """Hücrelere sıkıştırılmış gözlemler (yalnızca elenmeyenler)."""
+    rsi: np.ndarray          # (K,) hücre temsilci değerleri
+    atr_pct: np.ndarray
+    vol_ratio: np.ndarray    # hacim verisi yoksa NaN
+    ma50_dist: np.ndarray
+    macd_class: np.ndarray   # 0..5 (MACD_SCORES sırası, 5 = hiçbiri)
+    golden: np.ndarray       # bool
+    n: np.ndarray            # (F, H, K) getirisi bilinen gözlem sayısı
+    ret_sum: np.ndarray      # (F, H, K) ileri getiri toplamı
+    hit_sum: np.ndarray      # (F, H, K) pozitif getiri sayısı
+    horizons: tuple
+    observations: int
+
+
+def observations(frames: dict, horizons=HORIZONS, start: pd.Timestamp | None = None) -> dict:
+    """Panelden elenmeyen (tarih, hisse) gözlemlerinin ham girdileri."""
+    panel = build_panel(frames, align="bars")
+    ind = compute_indicators(panel)
+    a = {k: v.to_numpy() for k, v in ind.items()}
+    prev = {k: ind[k].shift(1).to_numpy() for k in ("macd", "signal", "hist")}
+
+    above_ma50, above_ma200 = trend_filter(a["price"], a["ma50"], a["ma200"])
+    keep = above_ma50 & above_ma200 & (panel.close.notna().cumsum().to_numpy() >= MIN_BARS)
+    dates = panel.dates.to_numpy()
+    if start is not None:
+        keep &= dates >= np.datetime64(pd.Timestamp(start))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cross = (prev["macd"] < prev["signal"]) & (a["macd"] > a["signal"])
+        growing = (a["hist"] > 0) & (a["hist"] > prev["hist"])
+        macd_class = np.select(
+            [cross, growing & (a["macd"] > 0), growing & (a["macd"] < 0),
+             a["hist"] > 0, a["macd"] > a["signal"]],
+            range(len(MACD_SCORES)), len(MACD_SCORES))
+        has_vol = (a["vol5"] > 0) & (a["vol20"] > 0)
+        obs = {
+            "rsi":        a["rsi"],
+            "atr_pct":    (a["atr"] / a["price"]) * 100,
+            "vol_ratio":  np.where(has_vol, a["vol5"] / a["vol20"], np.nan),
+            "ma50_dist":  ((a["price"] - a["ma50"]) / a["ma50"]) * 100,
+            "macd_class": macd_class,
+            "golden":     ~np.isnan(a["ma200"]) & (a["ma200"] != 0) & (a["ma50"] > a["ma200"]),
+        }
+        close = panel.close
+        fwd = np.stack([(close.shift(-h) / close - 1).to_numpy() for h in horizons])
+
+    out = {k: v[keep] for k, v in obs.items()}
+    out["fwd"] = fwd[:, keep]
+    out["date"] = dates[keep]
+    out["horizons"] = tuple(horizons)
+    return out
+
+
+def build_cube(obs: dict, grid: list, folds: int = 2) -> IndicatorCube:
+    """Gözlemleri ızgaradaki tüm aday eşiklere göre hücrelere sıkıştır."""
+    def edges(name):
+        return np.unique(np.concatenate([np.asarray(getattr(p, name), float) for p in grid]))
+
+    cells = np.stack([
+        _cell(obs["rsi"], edges("rsi_edges")),
+        _cell(obs["atr_pct"], edges("atr_edges")),
+        _cell(obs["vol_ratio"], edges("volume_edges")),
+        _cell(obs["ma50_dist"], edges("prox_edges")),
+        obs["macd_class"],
+        obs["golden"].astype(int),
+    ], axis=1)
+    keys, first, inverse = np.unique(cells, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+    k = len(keys)
+
+    # Zaman katları: gözlemler tarih sırasına göre eşit parçalara bölünür
+    order = np.argsort(obs["date"], kind="stable")
+    fold = np.empty(len(order), dtype=int)
+    fold[order] = np.arange(len(order)) * folds // max(len(order), 1)
+
+    fwd = obs["fwd"]
+    h = fwd.shape[0]
+    n = np.zeros((folds, h, k))
+    ret_sum = np.zeros((folds, h, k))
+    hit_sum = np.zeros((folds, h, k))
+    for f in range(folds):
+        in_fold = fold == f
+        for j in range(h):
+            r = fwd[j, in_fold]
+            known = ~np.isnan(r)
+            idx = inverse[in_fold][known]
+            n[f, j] = np.bincount(idx, minlength=k)
+            ret_sum[f, j] = np.bincount(idx, weights=r[known], minlength=k)
+            hit_sum[f, j] = np.bincount(idx, weights=(r[known] > 0), minlength=k)
+
+    return IndicatorCube(
+        rsi=obs["rsi"][first], atr_pct=obs["atr_pct"][first],
+        vol_ratio=obs["vol_ratio"][first], ma50_dist=obs["ma50_dist"][first],
+        macd_class=obs["macd_class"][first], golden=obs["golden"][first],
+        n=n, ret_sum=ret_sum, hit_sum=hit_sum,
+        horizons=obs["horizons"], observations=len(inverse),
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# DEĞERLENDİRME
+# ─────────────────────────────────────────────────────────────────────────────
+
+def cell_scores(cube: IndicatorCube, p: ScoreParams) -> np.ndarray:
+    """Bir konfigürasyon için her hücrenin toplam skoru (K,)."""
+    rsi = ladder(cube.rsi, _table(RSI_OPS, p.rsi_edges, p.rsi_scores), p.rsi_default)
+    atr = ladder(cube.atr_pct, _table(ATR_OPS, p.atr_edges, p.atr_scores), p.atr_default)
+    vol = np.where(np.isnan(cube.vol_ratio), 0,
+                   ladder(cube.vol_ratio, _table(VOLUME_OPS, p.volume_edges,
+                                                 p.volume_scores), VOLUME_DEFAULT))
+    macd = np.append(np.asarray(p.macd_scores, float), MACD_DEFAULT)[cube.macd_class]
+    prox = ladder(cube.ma50_dist, _table(PROX_OPS, p.prox_edges, p.prox_scores),
+                  p.prox_default)
+    ma = np.where(cube.golden, p.golden_bonus, 0) + prox
+
+    teknik = p.w_rsi * rsi + p.w_macd * macd + p.w_volume * vol + p.w_atr * atr + p.w_ma * ma
+    temel = p.w_temel * fundamental_scores(np.nan, np.nan, np.nan, np.nan,
+                                           PB_SECTOR_FALLBACK, PE_SECTOR_FALLBACK)["temel"]
+    return np.minimum(temel, p.temel_cap) + np.minimum(teknik, p.teknik_cap)
+
+
+def evaluate(cube: IndicatorCube, params: list, folds: slice = slice(None)) -> np.ndarray:
+    """
+    Konfigürasyon grubunu yayınlayarak değerlendir.
+    Dönüş: (C, 3, H) → [sinyal sayısı, ort. getiri, isabet oranı].
+    """
+    scores = np.stack([cell_scores(cube, p) for p in params])          # (C, K)
+    thr = np.array([p.al_threshold for p in params])[:, None]
+    mask = (scores >= thr).astype(float)                               # (C, K)
+    n = cube.n[folds].sum(axis=0)                                       # (H, K)
+    sig = mask @ n.T                                                    # (C, H)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (mask @ cube.ret_sum[folds].sum(axis=0).T) / sig
+        hit = (mask @ cube.hit_sum[folds].sum(axis=0).T) / sig
+    return np.stack([sig, mean, hit], axis=1)
+
+
+_WORKER_CUBE: IndicatorCube | None = None
+
+
+def _init_worker(cube: IndicatorCube) -> None:
+    global _WORKER_CUBE
+    _WORKER_CUBE = cube
+
+
+def _evaluate_chunk(args) -> np.ndarray:
+    params, folds = args
+    return evaluate(_WORKER_CUBE, params, folds)
+
+
+def _evaluate_all(cube, params, folds, n_jobs, chunk_size) -> np.ndarray:
+    chunks = [params[i:i + chunk_size] for i in range(0, len(params), chunk_size)]
+    if n_jobs <= 1 or len(chunks) <= 1:
+        return np.concatenate([evaluate(cube, c, folds) for c in chunks])
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                             initargs=(cube,)) as pool:
+        return np.concatenate(list(pool.map(_evaluate_chunk,
+                                            [(c, folds) for c in chunks])))
+
+
+def expand_grid(grid: dict, base: ScoreParams | None = None) -> list:
+    """{"alan": [değerler]} ızgarasını ScoreParams listesine aç."""
+    base = base or ScoreParams()
+    valid = {f.name for f in fields(ScoreParams)}
+    unknown = set(grid) - valid
+    if unknown:
+        raise ValueError(f"Bilinmeyen parametre(ler): {', '.join(sorted(unknown))}")
+    names = list(grid)
+    return [replace(base, **{k: tuple(v) if isinstance(v, list) else v
+                             for k, v in zip(names, combo)})
+            for combo in itertools.product(*(grid[k] for k in names))]
+
+
+def run_sweep(obs: dict, params: list, horizon: int = 21, min_signals: int = 100,
+              keep: float = 0.2, n_jobs: int | None = None,
+              chunk_size: int = 256) -> pd.DataFrame:
+    """
+    Konfigürasyonları `horizon` günlük ortalama ileri getiriye göre sırala.
+    keep < 1 ise önce ilk zaman katında değerlendirilip en iyi `keep` oranı
+    tüm dönemde yeniden puanlanır (erken eleme). min_signals altındaki
+    konfigürasyonlar sıralamaya girmez.
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    cube = build_cube(obs, params)
+    hi = cube.horizons.index(horizon)
+
+    candidates = np.arange(len(params))
+    if keep < 1 and len(params) > 1:
+        first = _evaluate_all(cube, params, slice(0, 1), n_jobs, chunk_size)
+        objective = np.where(first[:, 0, hi] >= min_signals / 2, first[:, 1, hi], -np.inf)
+        n_keep = max(1, int(np.ceil(len(params) * keep)))
+        candidates = np.sort(np.argsort(-objective, kind="stable")[:n_keep])
+
+    survivors = [params[i] for i in candidates]
+    res = _evaluate_all(cube, survivors, slice(None), n_jobs, chunk_size)
+
+    rows = []
+    for p, r in zip(survivors, res):
+        row = {k: (list(v) if isinstance(v, tuple) else v) for k, v in asdict(p).items()}
+        for j, h in enumerate(cube.horizons):
+            row[f"Sinyal {h}g"] = int(r[0, j])
+            row[f"Ort. {h}g %"] = r[1, j] * 100
+            row[f"İsabet {h}g %"] = r[2, j] * 100
+        rows.append(row)
+    df = pd.DataFrame(rows)
+    df = df[df[f"Sinyal {horizon}g"] >= min_signals]
+    return df.sort_values(f"Ort. {horizon}g %", ascending=False).reset_index(drop=True)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# VARSAYILAN IZGARA (~8 bin konfigürasyon)
+# ─────────────────────────────────────────────────────────────────────────────
+
+def default_grid() -> dict:
+    base = ScoreParams()
+    return {
+        "rsi_edges":    [tuple(e + d for e in base.rsi_edges) for d in (-10, -5, 0, 5, 10)],
+        "atr_edges":    [tuple(round(e * s, 3) for e in base.atr_edges) for s in (0.75, 1, 1.25, 1.5)],
+        "volume_edges": [tuple(round(e * s, 3) for e in base.volume_edges) for s in (0.9, 1, 1.1)],
+        "teknik_cap":   [50, 60, 70],
+        "al_threshold": [60, 65, 70, 75, 80],
+        "w_rsi":        [0.5, 1.0, 1.5],
+        "w_macd":       [0.5, 1.0, 1.5],
+    }
+
+
+def main(argv: list | None = None) -> int:
+    from bist.store import OHLCVStore
+    from bist.universe import BIST_TICKERS, build_scan_list
+
+    p = argparse.ArgumentParser(prog="python -m bist.sweep",
+                                description="Eşik/ağırlık taraması")
+    p.add_argument("--period", default="2y", help="Değerlendirme penceresi")
+    p.add_argument("--horizon", type=int, default=21, choices=HORIZONS)
+    p.add_argument("--grid", default=None,
+                   help='JSON ızgara dosyası, ör. {"al_threshold": [65, 70, 75]}')
+    p.add_argument("--min-signals", type=int, default=100)
+    p.add_argument("--keep", type=float, default=0.2,
+                   help="Erken elemede tüm döneme geçecek oran (1 = eleme yok)")
+    p.add_argument("--jobs", type=int, default=None, help="İşlemci çekirdeği sayısı")
+    p.add_argument("--max-tickers", type=int, default=len(BIST_TICKERS))
+    p.add_argument("--offline", action="store_true")
+    p.add_argument("--top", type=int, default=20)
+    p.add_argument("--output", "-o", default=None, help="Sonuçları CSV'ye yaz")
+    args = p.parse_args(argv)
+
+    grid = default_grid()
+    if args.grid:
+        with open(args.grid, encoding="utf-8") as fh:
+            grid = json.load(fh)
+    params = expand_grid(grid)
+
+    tickers = build_scan_list(args.max_tickers)
+    total = _add_period(args.period, WARMUP_PERIOD)
+    store = OHLCVStore()
+    frames = (store.read_many(tickers, period_start(total)) if args.offline
+              else store.update(tickers, period=total))
+    if not frames:
+        print("Fiyat verisi bulunamadı.", file=sys.stderr)
+        return 1
+
+    t0 = time.perf_counter()
+    obs = observations(frames, start=period_start(args.period))
+    df = run_sweep(obs, params, args.horizon, args.min_signals, args.keep, args.jobs)
+    print(f"{len(params)} konfigürasyon, {obs['fwd'].shape[1]} gözlem, "
+          f"{time.perf_counter() - t0:.1f} sn", file=sys.stderr)
+
+    shown = list(grid) + [c for c in df.columns if c.startswith(("Sinyal", "Ort.", "İsabet"))]
+    with pd.option_context("display.width", 250, "display.max_columns", 40,
+                           "display.float_format", "{:.2f}".format):
+        print(df[shown].head(args.top))
+    if args.output:
+        df.to_csv(args.output, index=False, encoding="utf-8-sig")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Sayfalı Sonuç Tabloları
+=======================
+Sonuç tabloları sunucuda süzülür, sıralanır ve yalnızca görünen sayfa
+tarayıcıya gönderilir. Skor renklendirmesi hücre başına Python çağrısı
+(Styler.applymap) yerine sütun düzeyinde tek np.select kuralıdır ve yalnızca
+sayfa satırlarına uygulanır.
+"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from bist.results import NA_REP, display_formats
+
+PAGE_SIZES = (25, 50, 100, 250)
+
+# (alt sınır, hücre stili); ilk sağlanan eşiğin stili alınır
+SCORE_STYLES = (
+    (80, "background-color: #1a6b3c; color: white"),
+    (70, "background-color: #2d9e5f; color: white"),
+    (60, "background-color: #f4a83a"),
+)
+SEARCH_COLUMNS = ("Ticker", "Sektör")
+
+
+def score_styles(s: pd.Series) -> np.ndarray:
+    """Skor sütununun hücre stilleri (eksik değer = stil yok)."""
+    v = s.to_numpy(dtype=float, na_value=np.nan)
+    return np.select([v >= floor for floor, _ in SCORE_STYLES],
+                     [style for _, style in SCORE_STYLES], default="")
+
+
+@dataclass
+class Page:
+    """Sorgu sonucunun görünen sayfası."""
+    frame: pd.DataFrame
+    total: int      # süzgeçten geçen satır
+    page: int       # 1'den başlar
+    pages: int
+    start: int      # sayfanın ilk satırının sırası (0'dan)
+
+
+def _search_mask(df: pd.DataFrame, text: str) -> np.ndarray:
+    """Ticker / Sektör içinde büyük-küçük harf duyarsız arama."""
+    mask = np.zeros(len(df), dtype=bool)
+    needle = text.strip().casefold()
+    for col in SEARCH_COLUMNS:
+        if col not in df:
+            continue
+        s = df[col]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            # Eşleşme kategori başına bir kez aranır, satırlara kodlarla yayılır
+            hit = np.fromiter((needle in str(c).casefold() for c in s.cat.categories),
+                              dtype=bool, count=len(s.cat.categories))
+            codes = s.cat.codes.to_numpy()
+            mask |= (codes >= 0) & hit[np.maximum(codes, 0)]
+        else:
+            mask |= s.astype(str).str.casefold().str.contains(needle, regex=False).to_numpy()
+    return mask
+
+
+def query(df: pd.DataFrame, search: str = "", sort_by: str | None = None,
+          ascending: bool = False, page: int = 1, page_size: int = 50) -> Page:
+    """
+    Süz, sırala ve tek sayfayı döndür. Sıralama kararlıdır, eksik değerler
+    sonda; sayfa numarası geçerli aralığa çekilir.
+    """
+    if search.strip():
+        df = df[_search_mask(df, search)]
+    if sort_by in df:
+        df = df.sort_values(sort_by, ascending=ascending, kind="stable", na_position="last")
+    total = len(df)
+    pages = max(1, math.ceil(total / page_size))
+    page = min(max(1, int(page)), pages)
+    start = (page - 1) * page_size
+    return Page(df.iloc[start:start + page_size], total, page, pages, start)
+
+
+def style_page(frame: pd.DataFrame, score_column: str = "Toplam Skor"):
+    """Sayfa için Styler: gösterim biçimleri + skor renkleri."""
+    styler = frame.style.format(display_formats(frame.columns), na_rep=NA_REP)
+    if score_column in frame:
+        styler = styler.apply(score_styles, subset=[score_column])
+    return styler
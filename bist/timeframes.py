@@ -0,0 +1,87 @@
+"""
+Çoklu Zaman Dilimi
+==================
+Haftalık ve aylık barlar depodaki günlük barlardan yeniden örneklenir; ayrı
+bir 1wk / 1mo indirmesi yapılmaz. Hisseler tarih hizalı tek panelde birlikte
+örneklenir ve günlük taramadaki indikatör fonksiyonları (calculate_rsi,
+calculate_macd, calculate_atr) örneklenmiş panel üzerinde tek geçişte çalışır.
+
+Aylık barlardan yalnızca fiyat ve MA10 hesaplanır ("Aylık Trend" etiketi);
+1 yıllık pencerede ~12 aylık bar RSI(14) / MACD(26/9) için yetersizdir.
+
+Haftalık barlar cuma kapanışlıdır (W-FRI), aylık barlar ay sonu. İçinde
+bulunulan hafta / ay o ana kadarki günlerle kısmi bar olarak yer alır
+(yfinance'in 1wk aralığındaki gibi).
+"""
+
+import pandas as pd
+
+from bist.indicators import calculate_atr, calculate_macd, calculate_rsi
+from bist.panel import WEEKLY_FIELDS, Panel, build_panel
+
+OFF, WEEKLY, WEEKLY_MONTHLY = "off", "weekly", "weekly_monthly"
+TIMEFRAMES = (OFF, WEEKLY, WEEKLY_MONTHLY)
+TIMEFRAME_LABELS = {
+    OFF:            "Kapalı (yalnızca günlük)",
+    WEEKLY:         "Haftalık onay",
+    WEEKLY_MONTHLY: "Haftalık onay + aylık trend",
+}
+
+WEEK_RULE, MONTH_RULE = "W-FRI", "ME"
+# Haftalık MA10 / MA30 ≈ günlük MA50 / MA150; aylık trend için MA10
+MA_FAST, MA_SLOW = 10, 30
+
+
+def resample_panel(panel: Panel, rule: str) -> Panel:
+    """
+    Tarih hizalı paneli `rule` periyotlarına örnekle: kapanış son, yüksek en
+    yüksek, düşük en düşük, hacim toplam. Hiç barı olmayan periyotlar atılır.
+    """
+    close = panel.close.resample(rule).last()
+    keep = close.notna().any(axis=1)
+    return Panel(close[keep],
+                 panel.high.resample(rule).max()[keep],
+                 panel.low.resample(rule).min()[keep],
+                 panel.volume.resample(rule).sum(min_count=1)[keep])
+
+
+def _latest(panel: Panel, prefix: str) -> pd.DataFrame:
+    """Örneklenmiş panelde her hissenin son bar indikatörleri (prefix_ sütunlar)."""
+    close = panel.close
+    macd, signal, hist = calculate_macd(close)
+    ind = {
+        "price":   close,
+        "ma_fast": close.rolling(MA_FAST).mean(),
+        "ma_slow": close.rolling(MA_SLOW).mean(),
+        "rsi":     calculate_rsi(close, 14),
+        "macd":    macd,
+        "signal":  signal,
+        "hist":    hist,
+        "atr":     calculate_atr(panel.high, panel.low, close, 14),
+    }
+    out = {k: v.iloc[-1] for k, v in ind.items()}
+    for k in ("macd", "signal", "hist"):
+        out[f"{k}_prev"] = ind[k].iloc[-2]
+    return pd.DataFrame(out).add_prefix(prefix)
+
+
+def timeframe_values(frames: dict, mode: str = WEEKLY) -> pd.DataFrame | None:
+    """
+    {ticker: günlük OHLCV} → haftalık (w_*) ve isteğe bağlı aylık (m_*) son
+    değerler (index: ticker). mode=OFF ise None.
+    """
+    if mode not in TIMEFRAMES:
+        raise ValueError(f"Geçersiz zaman dilimi: {mode}")
+    if mode == OFF:
+        return None
+    # En az MIN_BARS günlük bar → en az 12 haftalık bar
+    panel = build_panel(frames, align="dates")
+    if panel.close.empty:
+        return pd.DataFrame(columns=[f"w_{k}" for k in (*WEEKLY_FIELDS, "atr")], dtype=float)
+    out = _latest(resample_panel(panel, WEEK_RULE), "w_")
+    if mode == WEEKLY_MONTHLY:
+        close = panel.close.resample(MONTH_RULE).last()
+        close = close[close.notna().any(axis=1)]
+        out = out.join(pd.DataFrame({"m_price":   close.iloc[-1],
+                                     "m_ma_fast": close.rolling(MA_FAST).mean().iloc[-1]}))
+    return out
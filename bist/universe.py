@@ -0,0 +1,33 @@
+"""
+Taranacak Hisse Evreni
+======================
+"""
+
+# ─────────────────────────────────────────────────────────────────────────────
+# BIST HİSSE LİSTESİ
+# Kaynak: BIST 500 bileşenleri (manuel liste – yfinance endeks listesi desteklemiyor)
+# .IS uzantısı yfinance için zorunlu
+# ─────────────────────────────────────────────────────────────────────────────
+BIST_TICKERS = [
+    "THYAO.IS","EREGL.IS","GARAN.IS","AKBNK.IS","YKBNK.IS","ISCTR.IS","KCHOL.IS",
+    "SASA.IS","BIMAS.IS","FROTO.IS","TUPRS.IS","ASELS.IS","TOASO.IS","PGSUS.IS",
+    "HALKB.IS","VAKBN.IS","TKFEN.IS","ENKAI.IS","KOZAL.IS","KRDMD.IS","PETKM.IS",
+    "TTKOM.IS","TAVHL.IS","OTKAR.IS","SAHOL.IS","ARCLK.IS","VESTL.IS","MGROS.IS",
+    "EKGYO.IS","ULKER.IS","TCELL.IS","SISE.IS","DOHOL.IS","AEFES.IS","LOGO.IS",
+    "MAVI.IS","NETAS.IS","KOZA1.IS","BRISA.IS","CCOLA.IS","IHLGM.IS","ALARK.IS",
+    "ZOREN.IS","AKSEN.IS","AYGAZ.IS","GOLTS.IS","TSKB.IS","KLNMA.IS","ISGYO.IS",
+]
+
+# Tekrar edenleri ve geçersizleri temizle
+BIST_TICKERS = list(dict.fromkeys(BIST_TICKERS))  # unique
+
+
+def parse_tickers(raw: str | list | None) -> list:
+    """Virgüllü metni ya da listeyi temizle: boşlukları at, büyük harf, tekrarsız."""
+    items = raw.split(",") if isinstance(raw, str) else (raw or [])
+    return list(dict.fromkeys(t.strip().upper() for t in items if t.strip()))
+
+
+def build_scan_list(max_tickers: int, extra_tickers: list | None = None) -> list:
+    """Manuel eklenen hisseler + BIST listesinin ilk max_tickers hissesi (tekrarsız)."""
+    return list(dict.fromkeys(parse_tickers(extra_tickers) + BIST_TICKERS[:max_tickers]))
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from bist.backtest import run_backtest
+
+DATES = pd.bdate_range("2025-01-01", periods=200)
+
+
+def _frame(step: float) -> pd.DataFrame:
+    close = 100 * (1 + step) ** np.arange(len(DATES))
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99,
+                         "Close": close, "Volume": 1e6}, index=DATES)
+
+
+def test_turnover_ignores_warmup_dates():
+    # İki hisse sürekli yükselir (hiç elenmez), ikisi sürekli düşer (hep elenir)
+    frames = {"UP1.IS": _frame(0.01), "UP2.IS": _frame(0.005),
+              "DN1.IS": _frame(-0.01), "DN2.IS": _frame(-0.005)}
+    start = DATES[100]
+    report = run_backtest(frames, threshold=0, start=start)
+
+    assert report.turnover["Ort. Liste Büyüklüğü"] == 2.0
+    assert report.turnover["Günlük Ort. Giriş"] == 0.0
+    assert report.scores.loc[:start].iloc[:-1].isna().all().all()
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from bist.actions import factor_after
+from bist.data import period_start
+from bist.store import OHLCVStore
+
+TICKER = "AAA.IS"
+DAYS = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=300)
+# %100 bedelsiz (2:1), Yahoo'da ex-date'ten 3 bar sonra görünür; temettü zamanında
+SPLIT_DATE, SPLIT_RATIO, SPLIT_REPORTED = DAYS[-20], 2.0, DAYS[-17]
+DIV_DATE, DIV_RAW = DAYS[-60], 2.0
+
+# İşlem gördüğü hâliyle (ham) barlar
+_close = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0.001, 0.01, len(DAYS))))
+_close[DAYS >= SPLIT_DATE] /= SPLIT_RATIO
+RAW = pd.DataFrame({"Open": _close, "High": _close * 1.01, "Low": _close * 0.99,
+                    "Close": _close, "Volume": 1e6}, index=DAYS)
+RAW.loc[DAYS >= SPLIT_DATE, "Volume"] *= SPLIT_RATIO
+
+
+class YahooLike:
+    """auto_adjust=False + actions=True çıktısı; `as_of` gününe kadar bildirilenlerle."""
+
+    def __init__(self, as_of: pd.Timestamp):
+        self.as_of = as_of
+
+    def download(self, tickers: tuple, period: str = "1y", start: str | None = None) -> tuple:
+        known = SPLIT_REPORTED <= self.as_of
+        ratio = factor_after(DAYS, [SPLIT_DATE] if known else [], [SPLIT_RATIO])
+        df = RAW.copy()
+        df[["Open", "High", "Low", "Close"]] = RAW[["Open", "High", "Low", "Close"]].div(
+            ratio, axis=0)
+        df["Volume"] = RAW["Volume"] * ratio
+        df["Dividends"] = np.where(DAYS == DIV_DATE, DIV_RAW / ratio, 0.0)
+        df["Stock Splits"] = np.where((DAYS == SPLIT_DATE) & known, SPLIT_RATIO, 0.0)
+        begin = pd.Timestamp(start) if start else period_start(period)
+        return {t: df[(df.index >= begin) & (df.index <= self.as_of)] for t in tickers}, {}
+
+
+def _expected_adjusted(raw: pd.DataFrame) -> pd.Series:
+    """Yahoo Adj Close: bölünme 1/r, temettü 1 − D/C (ex-date öncesi ham kapanış)."""
+    factor = np.ones(len(raw))
+    factor[raw.index < SPLIT_DATE] /= SPLIT_RATIO
+    prev = raw["Close"][raw.index < DIV_DATE].iloc[-1]
+    factor[raw.index < DIV_DATE] *= 1 - DIV_RAW / prev
+    return raw["Close"] * factor
+
+
+def _fresh(tmp_path) -> OHLCVStore:
+    store = OHLCVStore(tmp_path / "fresh.sqlite")
+    store.update([TICKER], provider=YahooLike(DAYS[-1]), refresh_after=0, read=False)
+    return store
+
+
+def test_fresh_download_matches_as_traded_and_adjusted(tmp_path):
+    store = _fresh(tmp_path)
+    raw = store.read(TICKER, adjusted=False)
+    pd.testing.assert_frame_equal(raw, RAW.loc[raw.index], check_names=False,
+                                  check_freq=False)
+    adjusted = store.read(TICKER)
+    np.testing.assert_allclose(adjusted["Close"], _expected_adjusted(raw), rtol=1e-9)
+    # Hacim yalnızca bölünmeye göre düzeltilir
+    before = adjusted.index < SPLIT_DATE
+    np.testing.assert_allclose(adjusted["Volume"][before],
+                               RAW.loc[adjusted.index[before], "Volume"] * SPLIT_RATIO)
+
+
+def test_daily_updates_match_fresh_download_with_late_split(tmp_path):
+    store = OHLCVStore(tmp_path / "inc.sqlite")
+    for as_of in DAYS[-70:]:
+        store.update([TICKER], provider=YahooLike(as_of), refresh_after=0, read=False)
+
+    fresh = _fresh(tmp_path)
+    for adjusted in (False, True):
+        pd.testing.assert_frame_equal(store.read(TICKER, adjusted=adjusted),
+                                      fresh.read(TICKER, adjusted=adjusted), rtol=1e-9)
+    kinds = store.actions([TICKER])["kind"].tolist()
+    assert sorted(kinds) == ["dividend", "split"]